@@ -0,0 +1,77 @@
+"""Startup time and memory of the mixer window with 200 simulated sessions.
+
+Builds AudioPilot on the simulated backend under the offscreen Qt platform
+and reports time until the strips are shown, live widget count and peak RSS. The eager
+mode reproduces the old behaviour for comparison: every strip realized and
+an EQ section built for each one. Each mode runs in its own process.
+
+    python benchmarks/bench_channel_strips.py [--sessions 200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def measure(mode, session_count):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, SRC)
+    import resource
+
+    from PyQt6.QtWidgets import QApplication
+
+    import channel_area
+    import main
+    from audio_manager import AudioManager
+    from backends.simulated import SimulatedBackend
+    from preset_store import PresetStore
+    from scenes import SceneStore
+
+    app = QApplication([])
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if mode == "eager":
+        channel_area.OVERSCAN = session_count  # Realize every strip
+
+    directory = tempfile.TemporaryDirectory()  # Removed when the process exits
+    manager = AudioManager(SimulatedBackend(session_count=session_count),
+                           preset_store=PresetStore(os.path.join(directory.name, "presets.json")),
+                           scene_store=SceneStore(os.path.join(directory.name, "scenes.json")))
+    start = time.perf_counter()
+    window = main.AudioPilot(manager)
+    window.show()
+    # Sessions are enumerated in the background; wait until the strips are in
+    while len(window.session_index) < session_count:
+        app.processEvents()
+    if mode == "eager":
+        # Keep the panels referenced so they stay alive like the old inline EQ sections
+        panels = [window.create_eq_panel(session) for session in window.session_index.values()]  # noqa: F841
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:>8} {elapsed * 1e3:>10.1f} {len(app.allWidgets()):>8} {window.channel_area.strip_count():>7} "
+          f"{(rss_after - rss_before) / 1024:>10.1f}")
+    window.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="simulated sessions")
+    parser.add_argument("--mode", choices=("virtual", "eager"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        measure(args.mode, args.sessions)
+        return
+
+    print(f"{'mode':>8} {'startup ms':>10} {'widgets':>8} {'strips':>7} {'rss MiB':>10}")
+    for mode in ("virtual", "eager"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--sessions", str(args.sessions)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Load test of the local control API with many concurrent meter subscribers.
+
+Starts a ControlServer on the simulated backend and checks batched
+commands end to end, including loudness readings of a synthetic -23 LUFS
+tone fed through the loopback capture path. Then it connects --subscribers clients streaming
+meters at --rate, plus --slow clients that subscribe at the maximum rate
+but never read, while a control client keeps sending batched volume
+writes. Reports meter frame delivery and latency, command round trips and
+what backpressure did to the slow clients. It exits non-zero if a check
+fails: a command misbehaves, a reading client gets less than 90% of its
+frames, or the server buffers more than its limit for the slow ones.
+
+    python benchmarks/bench_control_api.py [--subscribers 100] [--slow 5] [--rate 30] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from audio_manager import AudioManager  # noqa: E402
+from backends.simulated import SimulatedBackend  # noqa: E402
+from control_api import (  # noqa: E402
+    MAX_METER_RATE, METER_BUFFER_LIMIT, ControlClient, ControlServer, encode_json,
+)
+from eq_engine import EQ_BANDS  # noqa: E402
+from loudness import SyntheticSource  # noqa: E402
+from preset_store import PresetStore  # noqa: E402
+from scenes import SceneStore  # noqa: E402
+
+
+async def check_commands(port, backend, manager, failures):
+    client = await ControlClient.connect(port=port)
+    [listing] = await client.request({"op": "list_sessions"})
+    sessions = listing["sessions"]
+    writes = [{"op": "set_volume", "session": session["id"], "volume": (i * 7) % 101}
+              for i, session in enumerate(sessions)]
+    app = backend.list_sessions()[0].name
+    results = await client.request(
+        *writes,
+        {"op": "set_mute", "session": app, "muted": True},
+        {"op": "set_eq", "session": app, "gains": [3.0] * EQ_BANDS},
+        {"op": "set_volume", "session": 10 ** 9, "volume": 50},
+        {"op": "subscribe_meters", "rate": MAX_METER_RATE * 2},
+        {"op": "no_such_op"},
+    )
+    volumes = {session.pid: round(backend.get_session_volume(session) * 100) for session in backend.list_sessions()}
+    if any(volumes[session["pid"]] != (i * 7) % 101 for i, session in enumerate(sessions)):
+        failures.append("batched volume writes did not all land")
+    if not all(result["ok"] for result in results[:len(writes) + 2]):
+        failures.append("a valid command failed")
+    if any(result["ok"] for result in results[len(writes) + 2:]):
+        failures.append("an invalid command succeeded")
+    if not all(backend.get_session_mute(session) for session in backend.list_sessions() if session.name == app):
+        failures.append("mute by app name missed a session")
+    if not any(gains == [3.0] * EQ_BANDS for gains in manager.eq_settings.values()):
+        failures.append("EQ gains were not set")
+    await client.request({"op": "set_mute", "session": app, "muted": False})
+    await client.close()
+    print(f"batched commands: {len(writes)} volume writes and 5 other commands in one message")
+
+
+async def check_loudness(port, manager, failures):
+    client = await ControlClient.connect(port=port)
+    [unmeasured] = await client.request({"op": "get_loudness"})
+    if unmeasured["ok"]:
+        failures.append("get_loudness succeeded with no capture running")
+    # EBU Tech 3341 case 1: a -23 dBFS 1 kHz tone on both channels measures -23 LUFS
+    manager.start_capture(source=SyntheticSource([(-23, 5)]))
+    manager._capture_thread.join()
+    [loudness] = await client.request({"op": "get_loudness"})
+    manager.stop_capture()
+    if not loudness["ok"] or abs(loudness["integrated"] - -23.0) > 0.1:
+        failures.append(f"get_loudness reported {loudness}, expected -23 LUFS integrated")
+    [reset, silent] = await client.request({"op": "reset_loudness"}, {"op": "get_loudness"})
+    if not reset["ok"] or silent.get("integrated", 0.0) is not None:
+        failures.append(f"reset_loudness left {silent}")
+    await client.close()
+    print(f"loudness: {loudness.get('integrated')} LUFS integrated over the control API")
+
+
+async def subscriber(port, rate, seconds, server_started, received, latencies):
+    client = await ControlClient.connect(port=port)
+    await client.request({"op": "subscribe_meters", "rate": rate})
+    deadline = time.perf_counter() + seconds
+    count = 0
+    async for sequence, timestamp, ids, peaks in client.meters():
+        now = time.perf_counter()
+        latencies.append(now - server_started - timestamp)
+        count += 1
+        if now >= deadline:
+            break
+    received.append(count)
+    await client.close()
+
+
+def slow_client(port):
+    """A plain socket subscribed at the maximum rate that is never read from."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)  # Let the kernel buffers fill up quickly
+    sock.connect(("127.0.0.1", port))
+    sock.sendall(encode_json({"id": 1, "op": "subscribe_meters", "rate": MAX_METER_RATE}))
+    return sock
+
+
+async def commander(port, stop, round_trips):
+    client = await ControlClient.connect(port=port)
+    [listing] = await client.request({"op": "list_sessions"})
+    ids = [session["id"] for session in listing["sessions"]]
+    level = 0
+    while not stop.is_set():
+        level = (level + 13) % 101
+        start = time.perf_counter()
+        await client.request(*({"op": "set_volume", "session": session_id, "volume": level} for session_id in ids))
+        round_trips.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+    await client.close()
+
+
+async def load(args, server, failures):
+    slow_sockets = [slow_client(server.port) for _ in range(args.slow)]
+    received = []
+    latencies = []
+    round_trips = []
+    stop = asyncio.Event()
+    command_task = asyncio.create_task(commander(server.port, stop, round_trips))
+    await asyncio.gather(*(subscriber(server.port, args.rate, args.seconds, server.started, received, latencies)
+                           for _ in range(args.subscribers)))
+    stop.set()
+    await command_task
+
+    client = await ControlClient.connect(port=server.port)
+    [stats] = await client.request({"op": "stats"})
+    await client.close()
+    for sock in slow_sockets:
+        sock.close()
+
+    expected = args.rate * args.seconds
+    received = np.array(received)
+    latencies = np.array(latencies) * 1e3
+    round_trips = np.array(round_trips) * 1e3
+    print(f"{args.subscribers} subscribers at {args.rate:g} Hz for {args.seconds:g} s, {args.sessions} sessions")
+    print(f"  frames per subscriber: min {received.min()}, median {np.median(received):.0f} of {expected:.0f}")
+    print(f"  meter latency ms: p50 {np.percentile(latencies, 50):.2f}, p99 {np.percentile(latencies, 99):.2f}, "
+          f"max {latencies.max():.2f}")
+    print(f"  batched command ({args.sessions} volume writes) round trip ms: "
+          f"p50 {np.percentile(round_trips, 50):.2f}, p99 {np.percentile(round_trips, 99):.2f}")
+    print(f"  server: {stats['frames_encoded']} peak reads, {stats['frames_dropped']} frames skipped for "
+          f"{args.slow} slow clients, largest unsent buffer {stats['max_buffered']} bytes")
+
+    if received.min() < 0.9 * expected:
+        failures.append(f"a subscriber got {received.min()} of {expected:.0f} frames")
+    if args.slow and not stats["frames_dropped"]:
+        failures.append("slow clients never hit backpressure")
+    frame_bytes = 5 + 16 + 8 * args.sessions
+    if stats["max_buffered"] > METER_BUFFER_LIMIT + frame_bytes:
+        failures.append(f"the server buffered {stats['max_buffered']} bytes for a slow client")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=100, help="meter clients that keep up")
+    parser.add_argument("--slow", type=int, default=5, help="meter clients that never read")
+    parser.add_argument("--rate", type=float, default=30.0, help="meter frames per second per client")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of the load phase")
+    parser.add_argument("--sessions", type=int, default=50, help="simulated audio sessions")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SimulatedBackend(session_count=args.sessions)
+        manager = AudioManager(backend=backend, preset_store=PresetStore(os.path.join(directory, "presets.json")),
+                               scene_store=SceneStore(os.path.join(directory, "scenes.json")))
+        manager.start_notifications()
+        server = ControlServer(manager, port=0)
+        if not server.start():
+            sys.exit("The control server did not start")
+
+        try:
+            asyncio.run(check_commands(server.port, backend, manager, failures))
+            asyncio.run(check_loudness(server.port, manager, failures))
+            asyncio.run(load(args, server, failures))
+        finally:
+            server.stop()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
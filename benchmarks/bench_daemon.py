@@ -0,0 +1,72 @@
+"""Startup time and memory of the headless daemon against the mixer window.
+
+Runs `src/daemon.py --profile-startup` and `src/main.py --profile-startup`
+on the simulated backend (the window under the offscreen Qt platform)
+several times each, every run in a fresh interpreter, and reports the
+median import time, time until sessions are listed, peak memory and
+loaded module count of both. The daemon runs with a ducking rule and the
+control API on a spare port, as it would in use. Exits non-zero if the
+daemon loads any Qt module.
+
+    python benchmarks/bench_daemon.py [--runs 5] [--port 47699]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LINE = re.compile(r"^(?P<metric>[a-z ]+?)\s+(?P<value>[\d.]+)(?: (?P<unit>ms|MB))?")
+# The window's "sessions shown" and the daemon's "ready" both mean the sessions are listed
+READY = {"sessions shown": "ready"}
+
+
+def profile_once(command):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run([sys.executable] + command + ["--backend", "simulated", "--profile-startup",
+                                                              "--data-dir", directory],
+                                cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    result = {"qt loaded": "none"}
+    for line in output.splitlines():
+        if line.startswith("qt loaded"):
+            result["qt loaded"] = line.split(None, 2)[2]
+            continue
+        match = LINE.match(line)
+        if match:
+            result[READY.get(match["metric"], match["metric"])] = float(match["value"])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to start per mode")
+    parser.add_argument("--port", type=int, default=47699, help="control API port for the daemon")
+    args = parser.parse_args()
+
+    modes = {
+        "daemon": [os.path.join("src", "daemon.py"), "--duck", "discord:spotify", "--control-port", str(args.port)],
+        "window": [os.path.join("src", "main.py")],
+    }
+    runs = {mode: [profile_once(command) for _ in range(args.runs)] for mode, command in modes.items()}
+    rows = (("imports", "ms"), ("ready", "ms"), ("peak memory", "MB"), ("modules loaded", ""))
+
+    print(f"{'metric':>15} {'daemon':>10} {'window':>10} {'saved':>7}")
+    for metric, unit in rows:
+        if not all(metric in run for mode_runs in runs.values() for run in mode_runs):
+            print(f"{metric:>15} {'n/a':>10} {'n/a':>10}")
+            continue
+        daemon, window = (statistics.median(run[metric] for run in runs[mode]) for mode in modes)
+        print(f"{metric:>15} {daemon:>10.1f} {window:>10.1f} {(1 - daemon / window) * 100:>6.0f}%  {unit}")
+
+    leaked = sorted({run["qt loaded"] for run in runs["daemon"]} - {"none"})
+    if leaked:
+        print(f"FAIL: the daemon loaded Qt: {', '.join(leaked)}")
+    sys.exit(1 if leaked else 0)
+
+
+if __name__ == "__main__":
+    main()
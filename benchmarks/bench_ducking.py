@@ -0,0 +1,106 @@
+"""Reaction time of automatic ducking on the simulated backend.
+
+Runs the real control loop at several rates, raises the trigger's level
+at random moments and measures the end-to-end latency from the level
+change to the first applied volume write and to full depth, with a fixed
+per-write cost standing in for a SimpleAudioVolume call. The ramp shapes
+themselves are checked by tests/test_ducking.py.
+
+    python benchmarks/bench_ducking.py [--trials 20] [--write-ms 0.5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from backends.simulated import SimulatedBackend  # noqa: E402
+from ducking import DuckingEngine, DuckingRule  # noqa: E402
+
+RATES = (50, 200, 1000)
+LOUD = 0.1  # -20 dBFS, above the rule's -30 dBFS threshold
+BASE_VOLUME = 0.8
+
+
+class RecordingBackend(SimulatedBackend):
+    """Simulated backend that records when each volume write lands, with a fixed cost per write."""
+
+    def __init__(self, write_cost=0.0, **options):
+        super().__init__(write_cost=write_cost, **options)
+        self.volume_writes = []  # (time the write completed, session, level)
+
+    def set_session_volume(self, session, level):
+        super().set_session_volume(session, level)
+        self.volume_writes.append((time.perf_counter(), session, level))
+
+
+def setup(write_cost=0.0, rate=200):
+    backend = RecordingBackend(write_cost, session_count=0)
+    discord = backend.add_session("discord.exe")
+    spotify = backend.add_session("spotify.exe")
+    for _ in range(8):
+        backend.hold_level(backend.add_session("chrome.exe"), 0.5)  # Bystanders that must not move
+    backend.hold_level(discord, 0.0)
+    spotify.native.volume = BASE_VOLUME
+    engine = DuckingEngine(backend, rate=rate)
+    engine.set_sessions(backend.sessions)
+    engine.add_rule(DuckingRule("Discord", "Spotify", threshold_db=-30, depth_db=12, attack=0.05, release=0.5,
+                                hold=0.1))
+    return backend, engine, discord, spotify
+
+
+def realtime(rate, trials, write_cost, seed=0):
+    backend, engine, discord, spotify = setup(write_cost, rate=rate)
+    rng = random.Random(seed)
+    engine.start()
+    first_write = []
+    full_depth = []
+    full_depth_volume = BASE_VOLUME * 10 ** (-12 / 20)
+    try:
+        for _ in range(trials):
+            time.sleep(rng.uniform(0.0, 2.0 / rate))  # Land the onset anywhere within a control period
+            del backend.volume_writes[:]
+            backend.hold_level(discord, LOUD)
+            onset = time.perf_counter()
+            deadline = onset + 2.0
+            while time.perf_counter() < deadline:
+                writes = [(t, level) for t, session, level in list(backend.volume_writes) if session is spotify]
+                if writes and writes[-1][1] <= full_depth_volume + 1e-6:
+                    first_write.append(writes[0][0] - onset)
+                    full_depth.append(writes[-1][0] - onset)
+                    break
+                time.sleep(0.0005)
+            backend.hold_level(discord, 0.0)
+            while spotify.native.volume < BASE_VOLUME - 1e-6 and time.perf_counter() < deadline + 2.0:
+                time.sleep(0.005)
+    finally:
+        engine.stop()
+    return np.array(first_write), np.array(full_depth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20, help="trigger onsets per control rate")
+    parser.add_argument("--write-ms", type=float, default=0.5, help="simulated cost of one volume write")
+    args = parser.parse_args()
+
+    failed = False
+    print("latency from the trigger's level change, ms (50 ms attack)")
+    print(f"{'rate Hz':>8} {'first write p50':>16} {'p95':>7} {'max':>7} {'full depth p50':>15} {'p95':>7}")
+    for rate in RATES:
+        first_write, full_depth = realtime(rate, args.trials, args.write_ms / 1000)
+        if not len(first_write):
+            print(f"{rate:>8} no trial reached full depth")
+            failed = True
+            continue
+        print(f"{rate:>8} {np.median(first_write) * 1e3:>16.2f} {np.percentile(first_write, 95) * 1e3:>7.2f} "
+              f"{first_write.max() * 1e3:>7.2f} {np.median(full_depth) * 1e3:>15.2f} "
+              f"{np.percentile(full_depth, 95) * 1e3:>7.2f}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Offline throughput benchmark for the streaming EQ engine.
+
+Runs synthetic stereo noise through EqualizerEngine at 48 kHz for a range of
+block sizes and reports realtime multiples and per-block CPU load.
+
+    python benchmarks/bench_eq.py [--seconds 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from eq_engine import EqualizerEngine  # noqa: E402
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+BLOCK_SIZES = (64, 128, 256, 512, 1024)
+
+
+def run(block_size, seconds):
+    engine = EqualizerEngine(channels=CHANNELS, sample_rate=SAMPLE_RATE)
+    engine.set_gains([6, 4, 2, 0, -2, -4, -2, 0, 3, 5])
+
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, size=(int(seconds * SAMPLE_RATE), CHANNELS)).astype(np.float32)
+    block_times = []
+    for start in range(0, len(audio) - block_size + 1, block_size):
+        block = audio[start:start + block_size]
+        t0 = time.perf_counter()
+        engine.process(block)
+        block_times.append(time.perf_counter() - t0)
+
+    block_times = np.array(block_times)
+    block_seconds = block_size / SAMPLE_RATE
+    stats = engine.stats()
+    return {
+        "block": block_size,
+        "realtime": seconds / block_times.sum(),
+        "mean_us": block_times.mean() * 1e6,
+        "p99_us": np.percentile(block_times, 99) * 1e6,
+        "budget_us": engine.cpu_budget * block_seconds * 1e6,
+        "overruns": stats["overruns"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0, help="seconds of synthetic audio per block size")
+    args = parser.parse_args()
+
+    print(f"{'block':>6} {'realtime':>10} {'mean us':>9} {'p99 us':>9} {'budget us':>10} {'overruns':>9}")
+    for block_size in BLOCK_SIZES:
+        r = run(block_size, args.seconds)
+        print(f"{r['block']:>6} {r['realtime']:>9.1f}x {r['mean_us']:>9.1f} {r['p99_us']:>9.1f} "
+              f"{r['budget_us']:>10.1f} {r['overruns']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Replay an EQ slider drag against the streaming EQ engine.
+
+The drag below was captured from the 1kHz slider (one value per valueChanged
+tick, ~60 ticks/s). Each tick goes through the same path as
+AudioPilot.eq_slider_changed -> AudioManager.apply_eq, with audio blocks
+processed in between. The run is repeated with the coefficient cache
+disabled to show what the drag costs when every tick designs filters.
+
+    python benchmarks/bench_eq_drag.py [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from eq_engine import CoefficientCache, EqualizerEngine  # noqa: E402
+
+SAMPLE_RATE = 48000
+BLOCK_SIZE = 256
+BLOCKS_PER_TICK = 3  # 16 ms between ticks at 5.3 ms per block
+DRAG_BAND = 5
+DRAG = (
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 9, 10, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1, 0, -1, -2, -3,
+    -4, -5, -6, -6, -7, -6, -5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 4, 3, 2, 3, 4, 5, 6, 5,
+    4, 3, 3, 2, 1, 2, 3, 4, 5, 6, 7, 6, 5, 4, 3,
+)
+
+
+def replay(cache, repeat):
+    engine = EqualizerEngine(sample_rate=SAMPLE_RATE, cache=cache)
+    gains = [0] * 10
+    rng = np.random.default_rng(0)
+    source = rng.uniform(-0.5, 0.5, size=(BLOCK_SIZE, 2)).astype(np.float32)
+    block = np.empty_like(source)
+
+    tick_times = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for value in DRAG:
+            gains[DRAG_BAND] = value
+            t0 = time.perf_counter()
+            engine.set_gains(gains)
+            tick_times.append(time.perf_counter() - t0)
+            for _ in range(BLOCKS_PER_TICK):
+                np.copyto(block, source)
+                engine.process(block)
+    total = time.perf_counter() - start
+    return np.array(tick_times), total, engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="number of times to replay the drag")
+    args = parser.parse_args()
+
+    for label, cache in (("cached", CoefficientCache()), ("uncached", CoefficientCache(maxsize=0))):
+        tick_times, total, engine = replay(cache, args.repeat)
+        stats = cache.stats()
+        print(f"{label:>9}: tick mean {tick_times.mean() * 1e6:7.1f} us, p99 {np.percentile(tick_times, 99) * 1e6:7.1f} us, "
+              f"hits {stats['hits']}, misses {stats['misses']}, "
+              f"peak block load {engine.stats()['peak_load']:.2f}, total {total:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
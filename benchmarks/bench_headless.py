@@ -0,0 +1,68 @@
+"""Headless poll and meter loops on the simulated backend.
+
+Runs the work AudioPilot does on each timer tick - the check_new_sessions
+enumeration and reconcile, and the update_level_bars peak reads - without
+Qt widgets or Windows, and reports per-tick latency percentiles.
+
+    python benchmarks/bench_headless.py [--ticks 500] [--churn 0.1]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from audio_manager import AudioManager  # noqa: E402
+from backends.simulated import SimulatedBackend  # noqa: E402
+from preset_store import PresetStore  # noqa: E402
+from scenes import SceneStore  # noqa: E402
+from session_index import SessionIndex  # noqa: E402
+
+SESSION_COUNTS = (10, 100, 500)
+
+
+def percentiles(samples):
+    samples = np.array(samples) * 1e6
+    return np.percentile(samples, 50), np.percentile(samples, 95), np.percentile(samples, 99), samples.max()
+
+
+def run(session_count, ticks, churn, directory):
+    manager = AudioManager(backend=SimulatedBackend(session_count=session_count, churn=churn),
+                           preset_store=PresetStore(os.path.join(directory, "presets.json")),
+                           scene_store=SceneStore(os.path.join(directory, "scenes.json")))
+    index = SessionIndex()
+    index.reconcile(manager.get_audio_sessions())
+
+    poll_times = []
+    meter_times = []
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        index.reconcile(manager.get_audio_sessions())
+        t1 = time.perf_counter()
+        for session in index.values():
+            manager.get_session_level(session["session"])
+        t2 = time.perf_counter()
+        poll_times.append(t1 - t0)
+        meter_times.append(t2 - t1)
+    return percentiles(poll_times), percentiles(meter_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=500, help="ticks per session count")
+    parser.add_argument("--churn", type=float, default=0.1, help="sessions replaced per poll, on average")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'loop':>6} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'max us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in SESSION_COUNTS:
+            poll, meter = run(count, args.ticks, args.churn, directory)
+            for name, stats in (("poll", poll), ("meter", meter)):
+                print(f"{count:>8} {name:>6} " + " ".join(f"{value:>9.1f}" for value in stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Overhead of the hot-path instrumentation, and a stutter it should catch.
+
+Times a trivial function bare, decorated by instrumentation.timed() while
+recording is off (which returns the function itself), with recording on
+(with and without the trace buffer) and through the timing wrapper after
+recording is turned off again, as references taken while it was on see
+it. Then replays 33 ms meter ticks where one tick hits a slow icon
+extraction, and prints what the recorder reports about the overrun. Exits
+non-zero if the overrun or its slow child is missed.
+
+    python benchmarks/bench_instrumentation.py [--calls 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import instrumentation  # noqa: E402
+
+
+def work(x):
+    return x + 1
+
+
+@instrumentation.timed("work")
+def timed_work(x):
+    return x + 1
+
+
+def per_call(function, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        function(i)
+    return (time.perf_counter() - start) / calls
+
+
+@instrumentation.timed("extract_icon_image")
+def extract_icon(slow):
+    time.sleep(0.040 if slow else 0.0002)
+
+
+@instrumentation.timed("update_level_bars", budget_ms=33)
+def meter_tick(slow_icon):
+    with instrumentation.span("setLevel"):
+        time.sleep(0.001)
+    extract_icon(slow_icon)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000, help="calls per overhead measurement")
+    args = parser.parse_args()
+
+    bare = per_call(work, args.calls)
+    disabled = per_call(timed_work, args.calls)
+    instrumentation.enable(trace=False)  # Binds the timing wrapper in place of timed_work
+    histograms_only = per_call(timed_work, args.calls)
+    instrumentation.enable(trace=True)
+    traced = per_call(timed_work, args.calls)
+    wrapper = timed_work
+    instrumentation.disable()
+    wrapper_off = per_call(wrapper, args.calls)
+
+    print(f"{'mode':>24} {'ns/call':>8} {'overhead ns':>12}")
+    for mode, seconds in (("bare", bare), ("timed, off", disabled), ("timed, histograms", histograms_only),
+                          ("timed, histograms+trace", traced), ("wrapper, off", wrapper_off)):
+        print(f"{mode:>24} {seconds * 1e9:>8.0f} {(seconds - bare) * 1e9:>12.0f}")
+
+    recorder = instrumentation.enable()
+    for tick in range(30):
+        meter_tick(slow_icon=tick == 17)
+    print()
+    summary = recorder.snapshot()["update_level_bars"]
+    print(f"update_level_bars: {summary['count']} ticks, p50 {summary['p50'] * 1e3:.1f} ms, "
+          f"max {summary['max'] * 1e3:.1f} ms, {summary['overruns']} over the 33 ms budget")
+    slow_calls = recorder.slow()
+    for slow in slow_calls:
+        print(f"  overrun at {slow['at'] * 1e3:.0f} ms: {slow['duration'] * 1e3:.1f} ms, slowest part "
+              f"{slow['slowest_child']} ({slow['child_duration'] * 1e3:.1f} ms)")
+    instrumentation.disable()
+    if not any(slow["slowest_child"] == "extract_icon_image" for slow in slow_calls):
+        print("FAIL: the slow icon extraction was not reported")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Level meter repaint cost with 100 meters updating at 60 Hz.
+
+Compares the painted LevelMeter against the QProgressBar meters the mixer
+used before: a stylesheet per bar on every tick and a QPropertyAnimation
+per bar. Runs under the offscreen Qt platform.
+
+    python benchmarks/bench_level_meter.py [--meters 100] [--seconds 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+from PyQt6.QtCore import QPropertyAnimation, Qt  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QProgressBar, QWidget  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from level_meter import LevelMeter  # noqa: E402
+
+FRAME_INTERVAL = 1 / 60
+LEGACY_STYLE = """
+    QProgressBar {{
+        border: 1px solid #666;
+        background: #222;
+        border-radius: 3px;
+    }}
+    QProgressBar::chunk {{
+        border-radius: 3px;
+        background-color: {color};
+    }}
+"""
+
+
+def make_legacy_bar():
+    bar = QProgressBar()
+    bar.setOrientation(Qt.Orientation.Vertical)
+    bar.setRange(0, 100)
+    bar.setFixedWidth(8)
+    bar.setTextVisible(False)
+    bar.animation = QPropertyAnimation(bar, b"value")
+    bar.animation.setDuration(150)
+    return bar
+
+
+def update_legacy(bar, level, hold):
+    value = int(level * 100)
+    bar.animation.stop()
+    bar.animation.setStartValue(bar.value())
+    bar.animation.setEndValue(value)
+    bar.animation.start()
+    color = "red" if value > 90 else "yellow" if value > 70 else "green"
+    bar.setStyleSheet(LEGACY_STYLE.format(color=color))
+
+
+def update_painted(meter, level, hold):
+    meter.setLevel(level, hold)
+
+
+def run(app, factory, update, meter_count, seconds):
+    window = QWidget()
+    layout = QHBoxLayout(window)
+    meters = [factory() for _ in range(meter_count)]
+    for meter in meters:
+        layout.addWidget(meter)
+    window.resize(meter_count * 12, 200)
+    window.show()
+    app.processEvents()
+
+    rng = np.random.default_rng(0)
+    frame_times = []
+    end = time.perf_counter() + seconds
+    next_frame = time.perf_counter()
+    while time.perf_counter() < end:
+        levels = rng.uniform(0.0, 1.0, meter_count)
+        t0 = time.perf_counter()
+        for meter, level in zip(meters, levels):
+            update(meter, float(level), float(min(level + 0.1, 1.0)))
+        app.processEvents()
+        frame_times.append(time.perf_counter() - t0)
+
+        next_frame += FRAME_INTERVAL
+        while time.perf_counter() < next_frame:
+            app.processEvents()  # Let animations run between frames, as the event loop would
+
+    window.close()
+    frame_times = np.array(frame_times) * 1e3
+    return frame_times.mean(), np.percentile(frame_times, 99), len(frame_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meters", type=int, default=100, help="number of meters")
+    parser.add_argument("--seconds", type=float, default=3.0, help="run time per meter type")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    print(f"{'meter':>12} {'frame ms':>9} {'p99 ms':>7} {'frames':>7}")
+    for name, factory, update in (("progressbar", make_legacy_bar, update_legacy),
+                                  ("painted", LevelMeter, update_painted)):
+        mean, p99, frames = run(app, factory, update, args.meters, args.seconds)
+        print(f"{name:>12} {mean:>9.2f} {p99:>7.2f} {frames:>7}")
+
+
+if __name__ == "__main__":
+    main()
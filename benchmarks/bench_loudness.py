@@ -0,0 +1,53 @@
+"""Throughput of the streaming loudness meter.
+
+Times process() on stereo noise for several block sizes, and compares the
+per-block cost at the start and the end of a long stream, which should
+not grow with stream length. The EBU Tech 3341 reference cases are checked
+in tests/test_loudness.py.
+
+    python benchmarks/bench_loudness.py [--seconds 600]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from loudness import LoudnessMeter  # noqa: E402
+
+SAMPLE_RATE = 48000
+BLOCK_SIZES = (64, 256, 1024, 4096)
+
+def throughput(block_size, seconds):
+    rng = np.random.default_rng(0)
+    noise = (0.1 * rng.standard_normal((SAMPLE_RATE, 2))).astype(np.float32)
+    blocks = [noise[start:start + block_size] for start in range(0, len(noise) - block_size + 1, block_size)]
+    meter = LoudnessMeter(sample_rate=SAMPLE_RATE)
+    count = int(seconds * SAMPLE_RATE / block_size)
+    times = np.empty(count)
+    for i in range(count):
+        t0 = time.perf_counter()
+        meter.process(blocks[i % len(blocks)])
+        times[i] = time.perf_counter() - t0
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=600.0, help="stream length for the throughput runs")
+    args = parser.parse_args()
+
+    print(f"{'block':>6} {'us/block':>9} {'ns/frame':>9} {'x realtime':>11} {'first 10% us':>13} {'last 10% us':>12}")
+    for block_size in BLOCK_SIZES:
+        times = throughput(block_size, args.seconds)
+        tenth = max(len(times) // 10, 1)
+        per_block = np.median(times)
+        print(f"{block_size:>6} {per_block * 1e6:>9.1f} {per_block / block_size * 1e9:>9.1f} "
+              f"{block_size / SAMPLE_RATE / per_block:>11.0f} {np.median(times[:tenth]) * 1e6:>13.1f} "
+              f"{np.median(times[-tenth:]) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Peak sampler jitter and GUI-thread read cost against sampling rate.
+
+Runs PeakSampler on the simulated backend at several rates. For each rate it
+reports sampler jitter and the cost of the GUI-side read that
+update_level_bars does on every repaint (latest() plus a row lookup per
+session). The read cost should stay flat as the sampling rate goes up.
+
+Timer wakeups alone jitter by milliseconds on a loaded machine, so each
+rate gets --trials runs. A run passes when all of these hold for it:
+
+- the mean sample interval is at most 10% over the period (no samples lost),
+- the p95 deviation of the sample interval is under half a period,
+- the worst deviation is under --max-worst-periods periods, and
+- the p99 GUI read is under --read-budget-us.
+
+The script exits non-zero if no run at some rate passes, or if the median
+GUI read of the reported run at the highest rate is more than twice that
+at the lowest. The figures printed are those of one run: the first that
+passed, or the one with the lowest p95 jitter if none did.
+
+    python benchmarks/bench_peak_sampler.py [--sessions 50] [--seconds 1.5] [--trials 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from backends.simulated import SimulatedBackend  # noqa: E402
+from peak_sampler import PeakSampler  # noqa: E402
+
+RATES = (60, 100, 150, 200)
+REPAINT_INTERVAL = 1 / 30
+READ_SLACK_US = 20.0  # Absolute allowance on the flatness check, for reads too fast to compare as a ratio
+
+
+def run(rate, session_count, seconds):
+    backend = SimulatedBackend(session_count=session_count)
+    sampler = PeakSampler(backend, rate=rate)
+    for session in backend.sessions:
+        sampler.add_session(session)
+    keys = [session.key for session in backend.sessions]
+    sampler.start()
+
+    read_times = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        levels, holds = sampler.latest()
+        for key in keys:
+            row = sampler.row(key)
+            int(levels[row] * 100), int(holds[row] * 100)
+        read_times.append(time.perf_counter() - t0)
+        time.sleep(REPAINT_INTERVAL)
+    sampler.stop()
+    return sampler.intervals(), np.array(read_times)
+
+
+def judge(rate, intervals, reads, args):
+    """Metrics of one run and the bounds it missed."""
+    period = 1.0 / rate
+    deviation = np.abs(intervals - period)
+    metrics = {
+        "mean": intervals.mean(),
+        "p95": np.percentile(deviation, 95),
+        "worst": deviation.max(),
+        "read_mean": reads.mean(),
+        "read_p99": np.percentile(reads, 99),
+        "read_median": np.median(reads),
+    }
+    misses = []
+    if metrics["mean"] > 1.1 * period:
+        misses.append(f"mean interval {metrics['mean'] * 1e3:.2f} ms for a {period * 1e3:.2f} ms period")
+    if metrics["p95"] > 0.5 * period:
+        misses.append(f"p95 jitter {metrics['p95'] * 1e3:.2f} ms, over half the period")
+    if metrics["worst"] > args.max_worst_periods * period:
+        misses.append(f"worst jitter {metrics['worst'] * 1e3:.2f} ms, over {args.max_worst_periods:g} periods")
+    if metrics["read_p99"] * 1e6 > args.read_budget_us:
+        misses.append(f"GUI read p99 {metrics['read_p99'] * 1e6:.0f} us, over {args.read_budget_us:g} us")
+    return metrics, misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="simulated sessions")
+    parser.add_argument("--seconds", type=float, default=1.5, help="run time per rate and trial")
+    parser.add_argument("--trials", type=int, default=5, help="runs per rate; one of them must pass")
+    parser.add_argument("--max-worst-periods", type=float, default=2.0,
+                        help="bound on the worst sample interval deviation, in periods")
+    parser.add_argument("--read-budget-us", type=float, default=1000.0,
+                        help="bound on the p99 GUI read for --sessions sessions")
+    args = parser.parse_args()
+
+    failures = []
+    read_medians = {}
+    print(f"{'rate':>5} {'mean ms':>8} {'p95 ms':>7} {'worst ms':>9} {'gui read us':>12} {'p99 us':>7} {'passed':>7}")
+    for rate in RATES:
+        period = 1.0 / rate
+        runs = [judge(rate, *run(rate, args.sessions, args.seconds), args) for _ in range(args.trials)]
+        passed = [metrics for metrics, misses in runs if not misses]
+        if passed:
+            metrics = passed[0]
+        else:
+            metrics, misses = min(runs, key=lambda outcome: outcome[0]["p95"])
+            failures.extend(f"{rate} Hz: {miss}" for miss in misses)
+        read_medians[rate] = metrics["read_median"] * 1e6
+        print(f"{rate:>5} {(metrics['mean'] - period) * 1e3:>8.3f} {metrics['p95'] * 1e3:>7.3f} "
+              f"{metrics['worst'] * 1e3:>9.3f} {metrics['read_mean'] * 1e6:>12.1f} {metrics['read_p99'] * 1e6:>7.1f} "
+              f"{len(passed):>4}/{args.trials}")
+
+    slowest, fastest = read_medians[RATES[0]], read_medians[RATES[-1]]
+    if fastest > 2 * slowest + READ_SLACK_US:
+        failures.append(f"GUI read grew from {slowest:.1f} us at {RATES[0]} Hz to {fastest:.1f} us at {RATES[-1]} Hz")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
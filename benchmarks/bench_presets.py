@@ -0,0 +1,81 @@
+"""List and load times with 10k EQ presets: indexed store vs per-file .eq presets.
+
+Writes the same presets both as legacy {session}_{preset}.eq files and into
+a PresetStore in a temporary directory, then times opening the store,
+listing one session's presets and loading a preset. The legacy list scans
+the directory and prefix-matches like the old AudioManager.list_presets,
+so its false matches (Spotify vs SpotifyBeta) are reported too.
+
+    python benchmarks/bench_presets.py [--presets 10000] [--sessions 500]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from preset_store import PresetStore  # noqa: E402
+
+
+def legacy_list(directory, session_name):
+    return [file[len(session_name) + 1:-3] for file in os.listdir(directory)
+            if file.startswith(session_name) and file.endswith(".eq")]
+
+
+def legacy_load(directory, session_name, preset_name):
+    with open(os.path.join(directory, f"{session_name}_{preset_name}.eq"), "r") as f:
+        return list(map(int, f.read().split(",")))
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presets", type=int, default=10000, help="total presets")
+    parser.add_argument("--sessions", type=int, default=500, help="sessions the presets are spread over")
+    parser.add_argument("--repeat", type=int, default=50, help="repetitions per timed operation")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sessions = ["Spotify", "SpotifyBeta"] + [f"App{i}" for i in range(args.sessions - 2)]
+    presets = [(sessions[i % len(sessions)], f"Preset{i}", [rng.randint(-10, 10) for _ in range(10)])
+               for i in range(args.presets)]
+    session_name, preset_name = presets[0][0], presets[0][1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_dir = os.path.join(directory, "legacy")
+        os.mkdir(legacy_dir)
+        for name, preset, gains in presets:
+            with open(os.path.join(legacy_dir, f"{name}_{preset}.eq"), "w") as f:
+                f.write(",".join(map(str, gains)))
+
+        store_path = os.path.join(directory, "presets.json")
+        start = time.perf_counter()
+        imported = PresetStore(store_path, legacy_dir=legacy_dir).import_legacy(legacy_dir)
+        import_time = time.perf_counter() - start
+        open_time, store = timed(lambda: PresetStore(store_path), 5)
+
+        legacy_list_time, legacy_names = timed(lambda: legacy_list(legacy_dir, session_name), args.repeat)
+        legacy_load_time, _ = timed(lambda: legacy_load(legacy_dir, session_name, preset_name), args.repeat)
+        store_list_time, store_names = timed(lambda: store.list(session_name), args.repeat)
+        store_load_time, _ = timed(lambda: store.get(session_name, preset_name), args.repeat)
+
+        print(f"{len(presets)} presets over {len(sessions)} sessions, "
+              f"store file {os.path.getsize(store_path) / 1024:.0f} KiB")
+        print(f"first-run import {import_time * 1e3:.1f} ms (re-import added {imported}), "
+              f"store open {open_time * 1e3:.1f} ms")
+        print(f"{'':>8} {'list us':>10} {'load us':>10} {'listed':>7}")
+        print(f"{'legacy':>8} {legacy_list_time * 1e6:>10.1f} {legacy_load_time * 1e6:>10.1f} "
+              f"{len(legacy_names):>7}  ({len(legacy_names) - len(store_names)} from other sessions)")
+        print(f"{'store':>8} {store_list_time * 1e6:>10.1f} {store_load_time * 1e6:>10.1f} {len(store_names):>7}")
+
+
+if __name__ == "__main__":
+    main()
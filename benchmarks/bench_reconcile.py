@@ -0,0 +1,83 @@
+"""Session reconcile cost against session count.
+
+Each tick one session closes and another opens. The legacy diff is the
+nested name comparison check_new_sessions used before SessionIndex, which
+then rebuilt every strip; the keyed index touches only the changed strips.
+
+    python benchmarks/bench_reconcile.py [--ticks 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from session_index import SessionIndex  # noqa: E402
+
+SESSION_COUNTS = (10, 100, 500)
+
+
+def make_session(pid):
+    return {"name": f"App {pid}", "key": (pid, f"instance-{pid}"), "volume": 100.0, "icon": None}
+
+
+def legacy_diff(previous, current):
+    new_sessions = [
+        session for session in current
+        if session["name"].lower() not in [s["name"].lower() for s in previous]
+    ]
+    closed_sessions = [
+        session for session in previous
+        if session["name"].lower() not in [s["name"].lower() for s in current]
+    ]
+    return new_sessions, closed_sessions
+
+
+def churn(count, ticks):
+    """Yield successive enumerations where one session is replaced per tick."""
+    sessions = [make_session(pid) for pid in range(count)]
+    next_pid = count
+    for _ in range(ticks):
+        sessions = sessions[1:] + [make_session(next_pid)]
+        next_pid += 1
+        yield list(sessions)
+
+
+def bench(count, ticks):
+    previous = [make_session(pid) for pid in range(count)]
+    legacy_time = 0.0
+    legacy_rebuilt = 0
+    for current in churn(count, ticks):
+        t0 = time.perf_counter()
+        new_sessions, closed_sessions = legacy_diff(previous, current)
+        legacy_time += time.perf_counter() - t0
+        if new_sessions or closed_sessions:
+            legacy_rebuilt += len(current)
+        previous = current
+
+    index = SessionIndex()
+    index.reconcile([make_session(pid) for pid in range(count)])
+    keyed_time = 0.0
+    keyed_rebuilt = 0
+    for current in churn(count, ticks):
+        t0 = time.perf_counter()
+        added, removed = index.reconcile(current)
+        keyed_time += time.perf_counter() - t0
+        keyed_rebuilt += len(added)
+
+    return legacy_time / ticks, legacy_rebuilt / ticks, keyed_time / ticks, keyed_rebuilt / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=200, help="poll ticks per session count")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'legacy us':>10} {'strips':>7} {'keyed us':>9} {'strips':>7}")
+    for count in SESSION_COUNTS:
+        legacy_us, legacy_strips, keyed_us, keyed_strips = bench(count, args.ticks)
+        print(f"{count:>8} {legacy_us * 1e6:>10.1f} {legacy_strips:>7.0f} {keyed_us * 1e6:>9.1f} {keyed_strips:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Scene recall time and write count, diffed against writing every value.
+
+Builds a mixer of N simulated sessions, each its own app, saves two
+scenes that differ in --changed apps and recalls them alternately. It
+does this once with the diff-based recall and once writing every value
+("naive"). Session reads and writes spend --read-cost-us and
+--write-cost-us on the simulated backend. It also times a recall through
+AudioManager.recall_scene, from the call to its done callback on the
+writer thread, for a scene that changes everything, and checks that two
+sessions of one app (two vlc.exe players) keep their own volume and mute.
+
+Exits non-zero if a recall does not reproduce its scene, the diff writes
+more than it has to, or the worst-case recall takes longer than --budget-ms.
+
+    python benchmarks/bench_scenes.py [--recalls 50] [--changed 4] [--write-cost-us 300] [--budget-ms 100]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from audio_manager import AudioManager  # noqa: E402
+from backends.simulated import SimulatedBackend  # noqa: E402
+from eq_engine import EQ_BANDS  # noqa: E402
+from preset_store import PresetStore  # noqa: E402
+from scenes import VOLUME_TOLERANCE, SceneStore, apply_scene, capture_scene  # noqa: E402
+
+SESSION_COUNTS = (8, 32, 64)
+
+
+def make_mixer(session_count, args, directory):
+    backend = SimulatedBackend(session_count=0, read_cost=args.read_cost_us / 1e6,
+                               write_cost=args.write_cost_us / 1e6)
+    for i in range(session_count):
+        backend.add_session(name=f"app{i}.exe")
+    manager = AudioManager(backend, preset_store=PresetStore(os.path.join(directory, "presets.json")),
+                           scene_store=SceneStore(os.path.join(directory, "scenes.json")))
+    return backend, manager
+
+
+def randomize(manager, rng, names):
+    """Give the named apps a new random volume, mute and EQ."""
+    sessions = {session["name"]: session["session"] for session in manager.get_audio_sessions()}
+    for name in names:
+        manager.set_session_volume(sessions[name], rng.randrange(101))
+        manager.set_session_mute(sessions[name], rng.random() < 0.3)
+        manager.set_eq_gains(name, [float(rng.randrange(-12, 13)) for _ in range(EQ_BANDS)])
+
+
+def matches(manager, scene):
+    live = capture_scene(manager)
+    return (abs(live["master"] - scene["master"]) <= VOLUME_TOLERANCE
+            and all(len(live["apps"][name]) == len(states)
+                    and all(abs(live_state["volume"] - state["volume"]) <= VOLUME_TOLERANCE
+                            and live_state["muted"] == state["muted"]
+                            for live_state, state in zip(live["apps"][name], states))
+                    for name, states in scene["apps"].items())
+            and all(manager.get_eq(name) == gains for name, gains in scene["eq"].items()))
+
+
+def run(session_count, args, naive, directory, failures):
+    rng = random.Random(session_count)
+    backend, manager = make_mixer(session_count, args, directory)
+    names = [session["name"] for session in manager.get_audio_sessions()]
+    randomize(manager, rng, names)
+    scenes = [capture_scene(manager)]
+    randomize(manager, rng, rng.sample(names, min(args.changed, len(names))))
+    scenes.append(capture_scene(manager))
+
+    times = np.empty(args.recalls)
+    writes = np.empty(args.recalls)
+    reads = np.empty(args.recalls)
+    for recall in range(args.recalls):
+        scene = scenes[recall % 2]
+        backend.reads = backend.writes = 0
+        result = apply_scene(manager, scene, naive=naive)
+        times[recall] = result["seconds"]
+        writes[recall] = backend.writes
+        reads[recall] = backend.reads
+        if not matches(manager, scene):
+            failures.append(f"{session_count} sessions: a {'naive' if naive else 'diff'} recall missed its scene")
+            break
+    return times, writes, reads
+
+
+def worst_case(session_count, args, directory, failures):
+    """Recall through AudioManager, off the calling thread, of a scene that changes every app."""
+    rng = random.Random(0)
+    backend, manager = make_mixer(session_count, args, directory)
+    names = [session["name"] for session in manager.get_audio_sessions()]
+    randomize(manager, rng, names)
+    saved = threading.Event()
+    manager.save_scene("everything", done=lambda scene: saved.set())
+    if not saved.wait(timeout=10):
+        failures.append(f"{session_count} sessions: the scene was never saved")
+        return None
+    randomize(manager, rng, names)
+
+    done = threading.Event()
+    results = []
+    started = time.perf_counter()
+    manager.recall_scene("everything", done=lambda result: (results.append(result), done.set()))
+    if not done.wait(timeout=10):
+        failures.append(f"{session_count} sessions: the scene recall never finished")
+        return None
+    elapsed = time.perf_counter() - started
+    manager.volume_writer.stop()
+    if not matches(manager, manager.scene_store.get("everything")):
+        failures.append(f"{session_count} sessions: the threaded recall missed its scene")
+    return elapsed, results[0]["writes"]
+
+
+def duplicate_names(args, directory, failures):
+    """Two sessions of one app at different volumes and mutes must each get their own back."""
+    backend, manager = make_mixer(0, args, directory)
+    players = [backend.add_session(name="vlc.exe"), backend.add_session(name="vlc.exe")]
+    for player, volume, muted in zip(players, (30, 80), (False, True)):
+        manager.set_session_volume(player, volume)
+        manager.set_session_mute(player, muted)
+    scene = capture_scene(manager)
+
+    backend.writes = 0
+    apply_scene(manager, scene)
+    if backend.writes:
+        failures.append(f"duplicate names: recalling the live state wrote {backend.writes} values")
+
+    for player in players:
+        manager.set_session_volume(player, 50)
+        manager.set_session_mute(player, False)
+    result = apply_scene(manager, scene)
+    live = [(round(backend.get_session_volume(player) * 100), backend.get_session_mute(player)) for player in players]
+    if live != [(30, False), (80, True)]:
+        failures.append(f"duplicate names: two vlc.exe sessions came back as {live}, not [(30, False), (80, True)]")
+    print(f"two vlc.exe sessions: recalled as {live} with {result['writes']} writes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recalls", type=int, default=50, help="recalls per session count and method")
+    parser.add_argument("--changed", type=int, default=4, help="apps that differ between the two scenes")
+    parser.add_argument("--read-cost-us", type=float, default=20.0, help="simulated cost of a session read")
+    parser.add_argument("--write-cost-us", type=float, default=300.0, help="simulated cost of a session write")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="bound on the worst-case recall")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'sessions':>8} {'recall':>6} {'p50 ms':>8} {'max ms':>8} {'writes':>7} {'reads':>6}")
+        for session_count in SESSION_COUNTS:
+            medians = {}
+            for naive in (True, False):
+                times, writes, reads = run(session_count, args, naive, directory, failures)
+                medians[naive] = (np.median(times), np.median(writes))
+                print(f"{session_count:>8} {'naive' if naive else 'diff':>6} {np.median(times) * 1e3:>8.2f} "
+                      f"{times.max() * 1e3:>8.2f} {np.median(writes):>7.0f} {np.median(reads):>6.0f}")
+            # Each changed app needs at most a volume and a mute write
+            if medians[False][1] > 2 * args.changed:
+                failures.append(f"{session_count} sessions: the diff recall wrote {medians[False][1]:.0f} values")
+            print(f"{'':>8} {'saved':>6} {(1 - medians[False][0] / medians[True][0]) * 100:>7.0f}% of the time, "
+                  f"{medians[True][1] - medians[False][1]:.0f} writes")
+
+        print()
+        duplicate_names(args, directory, failures)
+        for session_count in SESSION_COUNTS:
+            outcome = worst_case(session_count, args, directory, failures)
+            if outcome is None:
+                continue
+            elapsed, writes = outcome
+            print(f"recall changing all {session_count} apps from the writer thread: {elapsed * 1e3:.2f} ms, "
+                  f"{writes} writes")
+            if elapsed * 1e3 > args.budget_ms:
+                failures.append(f"{session_count} sessions: recall took {elapsed * 1e3:.1f} ms, "
+                                f"over the {args.budget_ms:g} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
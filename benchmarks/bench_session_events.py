@@ -0,0 +1,110 @@
+"""How long pushed session events take to show in the mixer window.
+
+Builds AudioPilot on the simulated backend under the offscreen Qt platform
+and drives SESSION_CREATED, SESSION_EXPIRED, VOLUME_CHANGED and
+MUTE_CHANGED through the backend's notification sink, as the Windows
+session callbacks would. After each event it waits for the strip, slider,
+label or mute button to catch up and reports how long that took. Events
+that never show are counted as timeouts; tests/test_session_events.py
+checks the behaviour itself.
+
+    python benchmarks/bench_session_events.py [--sessions 40] [--rounds 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from audio_manager import AudioManager  # noqa: E402
+from backends.simulated import SimulatedBackend  # noqa: E402
+from main import AudioPilot  # noqa: E402
+from preset_store import PresetStore  # noqa: E402
+from scenes import SceneStore  # noqa: E402
+
+TIMEOUT_S = 5.0
+
+
+def wait_for(app, condition, timeout=TIMEOUT_S):
+    """Process events until condition() holds; returns the seconds it took, or None on timeout."""
+    started = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - started > timeout:
+            return None
+        app.processEvents()
+    return time.perf_counter() - started
+
+
+def strip_keys(window):
+    return {session["key"] for session in window.channel_area.sessions()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=40, help="simulated sessions at startup")
+    parser.add_argument("--rounds", type=int, default=20, help="times to run each event")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    timings = {"created": [], "expired": [], "volume": [], "mute": []}
+    timeouts = {name: 0 for name in timings}
+
+    def timed_wait(name, condition):
+        elapsed = wait_for(app, condition)
+        if elapsed is None:
+            timeouts[name] += 1
+        else:
+            timings[name].append(elapsed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SimulatedBackend(session_count=0)
+        for _ in range(args.sessions):
+            backend.add_session()
+        manager = AudioManager(backend, preset_store=PresetStore(os.path.join(directory, "presets.json")),
+                               scene_store=SceneStore(os.path.join(directory, "scenes.json")))
+        window = AudioPilot(manager)
+        window.show()
+        if wait_for(app, lambda: len(window.session_index) == args.sessions) is None:
+            print("the first enumeration never showed the sessions")
+            sys.exit(1)
+
+        for round_ in range(args.rounds):
+            source = backend.add_session(name="eventcheck.exe")
+            timed_wait("created", lambda: source.key in strip_keys(window))
+            session = window.session_index.get(source.key)
+            if session is None:
+                break
+            # New sessions go last; scroll there so the strip is built
+            scroll_bar = window.channel_area.horizontalScrollBar()
+            if wait_for(app, lambda: scroll_bar.setValue(scroll_bar.maximum()) or "volume_slider" in session) is None:
+                break
+
+            volume = (round_ * 7) % 101
+            backend.set_session_volume(session["session"], volume / 100)
+            timed_wait("volume", lambda: session["volume_slider"].value() == volume
+                       and session["volume_label"].text() == f"{volume}%")
+
+            for muted in (True, False):
+                backend.set_session_mute(session["session"], muted)
+                timed_wait("mute", lambda: session["mute_button"].isChecked() == muted)
+
+            backend.remove_session(source)
+            timed_wait("expired", lambda: source.key not in window.session_index
+                       and source.key not in strip_keys(window))
+        window.close()
+
+    print(f"{'event':>8} {'count':>6} {'p50 ms':>8} {'max ms':>8} {'timeouts':>9}")
+    for name, samples in timings.items():
+        samples = np.array(samples or [np.nan]) * 1e3
+        print(f"{name:>8} {len(timings[name]):>6} {np.median(samples):>8.2f} {samples.max():>8.2f} "
+              f"{timeouts[name]:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Per-tick cost of the session poll and peak reads with and without cached session handles.
+
+Runs the check_new_sessions enumeration and reconcile and one batched
+peak read per tick on the simulated backend, once with the session
+registry caching process metadata and interfaces and once re-acquiring
+them on every call, as the backends used to. Each acquisition spins for
+--acquire-cost-us, standing in for a process query or QueryInterface.
+Reports per-tick latency and acquisitions per tick, and exits non-zero if
+caching changes any reading or does not reduce acquisitions.
+
+    python benchmarks/bench_session_registry.py [--ticks 300] [--churn 0.1] [--acquire-cost-us 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from audio_manager import AudioManager  # noqa: E402
+from backends.simulated import SimulatedBackend  # noqa: E402
+from preset_store import PresetStore  # noqa: E402
+from scenes import SceneStore  # noqa: E402
+from session_index import SessionIndex  # noqa: E402
+
+SESSION_COUNTS = (10, 100, 500)
+
+
+def run(session_count, ticks, churn, acquire_cost, cache_handles, directory):
+    backend = SimulatedBackend(session_count=session_count, churn=churn, cache_handles=cache_handles,
+                               acquire_cost=acquire_cost)
+    manager = AudioManager(backend=backend, preset_store=PresetStore(os.path.join(directory, "presets.json")),
+                           scene_store=SceneStore(os.path.join(directory, "scenes.json")))
+    index = SessionIndex()
+    index.reconcile(manager.get_audio_sessions())
+    before = sum(backend.registry.acquisitions.values())
+
+    poll_times = np.empty(ticks)
+    meter_times = np.empty(ticks)
+    for tick in range(ticks):
+        t0 = time.perf_counter()
+        index.reconcile(manager.get_audio_sessions())
+        t1 = time.perf_counter()
+        backend.get_session_peaks([session["session"] for session in index.values()])
+        t2 = time.perf_counter()
+        poll_times[tick] = t1 - t0
+        meter_times[tick] = t2 - t1
+    acquisitions = (sum(backend.registry.acquisitions.values()) - before) / ticks
+    return poll_times, meter_times, acquisitions
+
+
+def readings(cache_handles):
+    """Volumes and peaks of every session after some churn, read at a fixed time."""
+    backend = SimulatedBackend(session_count=50, churn=2.0, clock=lambda: 1.0, cache_handles=cache_handles)
+    for _ in range(10):
+        sessions = backend.list_sessions()
+    backend.set_session_volume(sessions[3], 0.25)
+    backend.set_session_mute(sessions[7], True)
+    sessions = backend.list_sessions()
+    return ([session.key for session in sessions], [backend.get_session_volume(session) for session in sessions],
+            backend.get_session_peaks(sessions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=300, help="ticks per session count")
+    parser.add_argument("--churn", type=float, default=0.1, help="sessions replaced per poll, on average")
+    parser.add_argument("--acquire-cost-us", type=float, default=20.0, help="simulated cost of one acquisition")
+    args = parser.parse_args()
+
+    failures = []
+    if readings(cache_handles=True) != readings(cache_handles=False):
+        failures.append("cached handles changed the sessions, volumes or peaks read")
+
+    print(f"{'sessions':>8} {'handles':>8} {'poll p50 us':>12} {'meter p50 us':>13} {'tick p95 us':>12} "
+          f"{'acq/tick':>9}")
+    for count in SESSION_COUNTS:
+        results = {}
+        for cache_handles in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                poll, meter, acquisitions = run(count, args.ticks, args.churn, args.acquire_cost_us / 1e6,
+                                                cache_handles, directory)
+            results[cache_handles] = (np.median(poll + meter), acquisitions)
+            print(f"{count:>8} {'cached' if cache_handles else 'fresh':>8} {np.median(poll) * 1e6:>12.1f} "
+                  f"{np.median(meter) * 1e6:>13.1f} {np.percentile(poll + meter, 95) * 1e6:>12.1f} "
+                  f"{acquisitions:>9.1f}")
+        (fresh_tick, fresh_acquisitions), (cached_tick, cached_acquisitions) = results[False], results[True]
+        print(f"{'':>8} {'saved':>8} {(1 - cached_tick / fresh_tick) * 100:>11.0f}% of the median tick, "
+              f"{fresh_acquisitions - cached_acquisitions:.1f} acquisitions per tick")
+        if cached_acquisitions >= fresh_acquisitions:
+            failures.append(f"{count} sessions: caching did not reduce acquisitions")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""CPU per 60 fps frame of the spectrum analyzer and its painted view.
+
+Each frame feeds every session 1/60 s of stereo audio, runs analyze() and
+repaints its SpectrumView; the views share one window under the offscreen
+Qt platform. Reports the engine and paint time per frame against the
+16.7 ms budget, and the memory the engine allocates per frame (measured in
+a separate pass, as tracing slows everything down), which should be zero.
+
+    python benchmarks/bench_spectrum.py [--frames 600] [--resolution octave|third]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from PyQt6.QtWidgets import QApplication, QVBoxLayout, QWidget  # noqa: E402
+
+from spectrum import OCTAVE, THIRD_OCTAVE, SpectrumAnalyzer  # noqa: E402
+from spectrum_view import SpectrumView  # noqa: E402
+
+SAMPLE_RATE = 48000
+FPS = 60
+SESSION_COUNTS = (1, 4, 8, 16)
+
+
+def run(session_count, frames, resolution):
+    block_size = SAMPLE_RATE // FPS
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal((SAMPLE_RATE, 2))).astype(np.float32)
+    analyzers = [SpectrumAnalyzer(sample_rate=SAMPLE_RATE, resolution=resolution) for _ in range(session_count)]
+    # All views in one window, as in the mixer, so a frame is one backing store flush
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    views = []
+    for analyzer in analyzers:
+        view = SpectrumView(floor_db=analyzer.floor_db)
+        view.setBands(analyzer.frequencies)
+        view.setFixedSize(400, 120)
+        layout.addWidget(view)
+        views.append(view)
+    window.show()
+    QApplication.processEvents()
+
+    def blocks(count):
+        for frame in range(count):
+            start = (frame * block_size) % (len(audio) - block_size)
+            yield audio[start:start + block_size]
+
+    engine_times = np.empty(frames)
+    paint_times = np.empty(frames)
+    for frame, block in enumerate(blocks(frames)):
+        t0 = time.process_time()
+        for analyzer in analyzers:
+            analyzer.process(block)
+            analyzer.analyze(1 / FPS)
+        t1 = time.process_time()
+        for analyzer, view in zip(analyzers, views):
+            view.setLevels(analyzer.levels)
+        QApplication.processEvents()
+        t2 = time.process_time()
+        engine_times[frame] = t1 - t0
+        paint_times[frame] = t2 - t1
+    window.close()
+
+    allocated = 0
+    tracemalloc.start()
+    for block in blocks(FPS):
+        before = tracemalloc.get_traced_memory()[0]
+        for analyzer in analyzers:
+            analyzer.process(block)
+            analyzer.analyze(1 / FPS)
+        allocated += max(tracemalloc.get_traced_memory()[0] - before, 0)
+    tracemalloc.stop()
+    return engine_times, paint_times, allocated / FPS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600, help="frames per session count")
+    parser.add_argument("--resolution", choices=(OCTAVE, THIRD_OCTAVE), default=OCTAVE)
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+    budget = 1.0 / FPS
+    print(f"{'sessions':>8} {'engine ms':>10} {'paint ms':>9} {'total ms':>9} {'p99 ms':>7} "
+          f"{'budget %':>9} {'bytes/frame':>12}")
+    for session_count in SESSION_COUNTS:
+        engine, paint, allocated = run(session_count, args.frames, args.resolution)
+        total = engine + paint
+        print(f"{session_count:>8} {engine.mean() * 1e3:>10.3f} {paint.mean() * 1e3:>9.3f} "
+              f"{total.mean() * 1e3:>9.3f} {np.percentile(total, 99) * 1e3:>7.3f} "
+              f"{total.mean() / budget * 100:>9.1f} {allocated:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Cold start regression check for the mixer window.
+
+Runs `src/main.py --profile-startup` on the simulated backend under the
+offscreen Qt platform several times, each in a fresh interpreter, and
+reports the median import time, time to first paint and time until the
+channel strips are populated. Save a baseline once, then compare later
+runs against it; the script exits non-zero when a median regresses by
+more than the tolerance or a deferred module is loaded during startup.
+
+    python benchmarks/bench_startup.py [--runs 5] [--save-baseline startup.json]
+    python benchmarks/bench_startup.py --baseline startup.json [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+METRICS = ("imports", "window built", "first paint", "sessions shown")
+LINE = re.compile(r"^(?P<metric>[a-z ]+?)\s+(?P<ms>[\d.]+) ms")
+
+
+def profile_once():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run([sys.executable, os.path.join("src", "main.py"), "--backend", "simulated",
+                                 "--profile-startup", "--data-dir", directory], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+    result = {"deferred loaded": "none"}
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match and match["metric"] in METRICS:
+            result[match["metric"]] = float(match["ms"])
+        elif line.startswith("deferred loaded"):
+            result["deferred loaded"] = line.split(None, 2)[2]
+    return result
+
+
+def eager_import_ms():
+    """What importing scipy.signal at startup used to cost on top of everything else."""
+    code = "import time; t = time.perf_counter(); import scipy.signal; print((time.perf_counter() - t) * 1e3)"
+    return float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--baseline", help="JSON file of medians to compare against")
+    parser.add_argument("--save-baseline", help="write the medians of this run to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    runs = [profile_once() for _ in range(args.runs)]
+    medians = {metric: statistics.median(run[metric] for run in runs) for metric in METRICS}
+    leaked = sorted({run["deferred loaded"] for run in runs} - {"none"})
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    failed = bool(leaked)
+    print(f"{'metric':>15} {'median ms':>10} {'baseline':>10}")
+    for metric in METRICS:
+        line = f"{metric:>15} {medians[metric]:>10.1f}"
+        if baseline and metric in baseline:
+            line += f" {baseline[metric]:>10.1f}"
+            if medians[metric] > baseline[metric] * (1 + args.tolerance):
+                line += "  REGRESSION"
+                failed = True
+        print(line)
+    print(f"scipy.signal alone would add {eager_import_ms():.1f} ms if imported eagerly")
+    if leaked:
+        print(f"deferred modules loaded during startup: {', '.join(leaked)}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(medians, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
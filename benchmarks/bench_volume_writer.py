@@ -0,0 +1,102 @@
+"""Synthetic slider drag through the coalescing volume writer.
+
+Replays a fast drag (one valueChanged per few milliseconds) against the
+simulated backend with a fixed per-write cost standing in for a COM call.
+Reports how long the GUI thread is blocked and writes requested vs
+issued. Exits non-zero if the last value of the drag is not the one
+applied, or if the coalesced run issues more writes than --max-rate
+allows over the drag plus the final flush.
+
+    python benchmarks/bench_volume_writer.py [--ticks 300] [--write-ms 2]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from backends.simulated import SimulatedBackend  # noqa: E402
+from volume_writer import VolumeWriter  # noqa: E402
+
+TICK_INTERVAL = 0.003
+
+
+class SlowBackend(SimulatedBackend):
+    """Simulated backend whose volume writes take as long as a COM round trip."""
+
+    def __init__(self, write_cost, **options):
+        super().__init__(write_cost=write_cost, **options)
+        self.write_times = []
+
+    def set_session_volume(self, session, level):
+        super().set_session_volume(session, level)
+        self.write_times.append(time.perf_counter())
+
+
+def drag_values(ticks):
+    """Slider positions of a drag from 0 up to 100 and back down to 37."""
+    up = [round(100 * i / (ticks // 2)) for i in range(ticks // 2)]
+    down = [round(100 - 63 * i / (ticks - ticks // 2 - 1)) for i in range(ticks - ticks // 2)]
+    return up + down
+
+
+def run_sync(values, write_cost):
+    backend = SlowBackend(write_cost, session_count=1)
+    session = backend.sessions[0]
+    blocked = 0.0
+    for value in values:
+        t0 = time.perf_counter()
+        backend.set_session_volume(session, value / 100)
+        blocked += time.perf_counter() - t0
+        time.sleep(TICK_INTERVAL)
+    return blocked, len(values), len(backend.write_times), session.native.volume, None
+
+
+def run_coalesced(values, write_cost, max_rate):
+    backend = SlowBackend(write_cost, session_count=1)
+    session = backend.sessions[0]
+    writer = VolumeWriter(backend, max_rate=max_rate)
+    writer.start()
+    started = time.perf_counter()
+    blocked = 0.0
+    for value in values:
+        t0 = time.perf_counter()
+        writer.set_session_volume(session, value / 100)
+        blocked += time.perf_counter() - t0
+        time.sleep(TICK_INTERVAL)
+    writer.stop()
+    # One flush per interval, plus the one at the start and the final flush on stop
+    allowed = math.ceil((time.perf_counter() - started) * max_rate) + 2
+    stats = writer.stats()
+    return blocked, stats["requested"], stats["issued"], session.native.volume, allowed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=300, help="valueChanged ticks in the drag")
+    parser.add_argument("--write-ms", type=float, default=2.0, help="simulated cost of one volume write")
+    parser.add_argument("--max-rate", type=int, default=30, help="coalesced flushes per second")
+    args = parser.parse_args()
+
+    values = drag_values(args.ticks)
+    failures = []
+    print(f"{'mode':>10} {'gui blocked ms':>15} {'requested':>10} {'issued':>7} {'final':>6}")
+    for mode, (blocked, requested, issued, final, allowed) in (
+        ("sync", run_sync(values, args.write_ms / 1000)),
+        ("coalesced", run_coalesced(values, args.write_ms / 1000, args.max_rate)),
+    ):
+        ok = "ok" if round(final * 100) == values[-1] else f"LOST (wanted {values[-1]})"
+        print(f"{mode:>10} {blocked * 1e3:>15.1f} {requested:>10} {issued:>7} {round(final * 100):>6} {ok}")
+        if round(final * 100) != values[-1]:
+            failures.append(f"{mode}: the drag ended on {values[-1]} but {round(final * 100)} was applied")
+        if allowed is not None and issued > allowed:
+            failures.append(f"{mode}: issued {issued} writes, the rate cap allows {allowed}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
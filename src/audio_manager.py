@@ -1,127 +1,163 @@
 import os
-import ctypes
-from ctypes import wintypes
-import win32gui
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume, ISimpleAudioVolume, IAudioMeterInformation
-from comtypes import CLSCTX_ALL
-from PyQt6.QtGui import QPixmap, QImage
-import numpy as np
-import sounddevice as sd
-import scipy.signal
+import threading
+from backends import VOLUME_CHANGED
+from ducking import DuckingEngine, DuckingRule
+from eq_engine import EqualizerEngine
+from instrumentation import timed
+from loudness import LoudnessMeter
+from preset_store import PresetStore
+from scenes import SceneStore, apply_scene, capture_scene
+from spectrum import SpectrumAnalyzer
+from volume_writer import VolumeWriter
 
 
 class AudioManager:
-    def __init__(self):
-        self.devices = AudioUtilities.GetSpeakers()
-        interface = self.devices.Activate(
-            IAudioEndpointVolume._iid_, CLSCTX_ALL, None
-        )
-        self.volume = interface.QueryInterface(IAudioEndpointVolume)
+    def __init__(self, backend=None, preset_store=None, scene_store=None):
+        if backend is None:
+            from backends import create_backend
+            backend = create_backend("pycaw")
+        self.backend = backend
+        # Presets used to live as .eq files in the working directory; they are imported on first run
+        self.preset_store = preset_store or PresetStore(legacy_dir=os.getcwd())
+        self.scene_store = scene_store or SceneStore()
         self.eq_settings = {}  # Store EQ settings for each session
+        self.eq_engines = {}  # Streaming EQ engine for each session
+        self.eq_routes = {}  # Audio routed through a session's EQ engine, the only place it is heard
+        self.loudness_meter = None  # Loudness of the system mix, while the loopback capture runs
+        self.spectrum_analyzer = None  # Spectrum of the system mix shown in the EQ panel, while capturing
+        self.volume_writer = VolumeWriter(self.backend)
+        self.ducking = DuckingEngine(self.backend)
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        self._capture_source = None
+        self._capture_thread = None
+        self._capture_lock = threading.Lock()
 
     def set_master_volume(self, level):
         """Set the master volume."""
-        self.volume.SetMasterVolumeLevelScalar(level / 100, None)
+        self.backend.set_master_volume(level / 100)
 
     def get_master_volume(self):
         """Get the master volume."""
-        return self.volume.GetMasterVolumeLevelScalar() * 100
+        return self.backend.get_master_volume() * 100
 
+    def queue_master_volume(self, level):
+        """Set the master volume from the writer thread; rapid calls are coalesced."""
+        self.volume_writer.start()
+        self.volume_writer.set_master_volume(level / 100)
+
+    @timed()
     def get_audio_sessions(self):
-        """Retrieve audio sessions for active processes."""
-        sessions = AudioUtilities.GetAllSessions()
+        """Retrieve audio sessions for active processes.
+
+        Safe to call from any thread that did backend.thread_init(). Icons
+        are the GUI's business; it looks them up from session.exe_path.
+        """
+        sessions = self.backend.list_sessions()
+        self.ducking.set_sessions(sessions)
         return [
             {
-                "name": self.capitalize_name(os.path.splitext(session.Process.name())[0])
-                if session.Process else "System Sounds",
-                "volume": session.SimpleAudioVolume.GetMasterVolume() * 100,
+                "name": self.capitalize_name(os.path.splitext(session.name)[0]),
+                "volume": self.backend.get_session_volume(session) * 100,
+                "key": session.key,
                 "session": session,
-                "icon": self.get_process_icon(session.Process)
             }
-            for session in sessions if session.Process
+            for session in sessions
         ]
-    
+
+    def set_session_volume(self, session, level):
+        """Set the volume of a session."""
+        if not self.ducking.set_base_volume(session, level / 100):
+            self.backend.set_session_volume(session, level / 100)
+
+    def set_session_volumes(self, writes):
+        """Set the volumes of several sessions, given as (session, level) pairs, in one backend batch."""
+        batch = [(session, level / 100) for session, level in writes
+                 if not self.ducking.set_base_volume(session, level / 100)]
+        self.backend.set_session_volumes(batch)
+
+    def queue_session_volume(self, session, level):
+        """Set the volume of a session from the writer thread; rapid calls are coalesced."""
+        if self.ducking.set_base_volume(session, level / 100):
+            return  # Ducked: the engine applies the new base on its next tick
+        self.volume_writer.start()
+        self.volume_writer.set_session_volume(session, level / 100)
+
+    def add_ducking_rule(self, trigger, target, **options):
+        """Duck the target app while the trigger app is loud; see DuckingRule for the options."""
+        rule = self.ducking.add_rule(DuckingRule(trigger, target, **options))
+        self.ducking.start()
+        return rule
+
+    def remove_ducking_rule(self, rule):
+        self.ducking.remove_rule(rule)
+
+    def get_session_mute(self, session):
+        """Get whether a session is muted."""
+        return self.backend.get_session_mute(session)
+
+    def set_session_mute(self, session, muted):
+        """Mute or unmute a session."""
+        self.backend.set_session_mute(session, muted)
+
+    @timed()
     def get_session_level(self, session):
         """Get the current audio level (peak) of a session."""
         try:
-            meter = session._ctl.QueryInterface(IAudioMeterInformation)
-            peak = meter.GetPeakValue()  
-            return int(peak * 100)  
+            return int(self.backend.get_session_peak(session) * 100)
         except Exception as e:
-            print(f"Failed to get session level for {session.Process.name()}: {e}")
+            print(f"Failed to get session level for {session.name}: {e}")
             return 0
 
+    def subscribe(self, callback):
+        """Call callback(event, key, value) for every session event.
+
+        Events are the backends.SESSION_CREATED, SESSION_EXPIRED,
+        VOLUME_CHANGED (value is the new volume, 0-100) and MUTE_CHANGED
+        (value is the new mute state) constants. Callbacks may run on a
+        backend thread.
+        """
+        with self._subscribers_lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop delivering session events to a callback."""
+        with self._subscribers_lock:
+            self._subscribers.remove(callback)
+
+    def start_notifications(self):
+        """Start push notifications; returns False if the backend has to be polled instead."""
+        return self.backend.start_notifications(self._dispatch_event)
+
+    def stop_notifications(self):
+        """Stop push notifications."""
+        self.backend.stop_notifications()
+
+    def _dispatch_event(self, event, key, value):
+        if event == VOLUME_CHANGED:
+            self.ducking.on_volume_changed(key, value)
+            value = value * 100
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event, key, value)
+
     def capitalize_name(self, name):
         """Capitalize the name of the application."""
         return " ".join(word.capitalize() for word in name.split())
 
-    def get_process_icon(self, process):
-        """Retrieve the process icon."""
-        try:
-            exe_path = process.exe()
-            large, _ = win32gui.ExtractIconEx(exe_path, 0)
-            if large:
-                hicon = large[0]
-                pixmap = self.hicon_to_pixmap(hicon)
-                win32gui.DestroyIcon(hicon)
-                return pixmap
-        except Exception as e:
-            print(f"Failed to get icon for {process.name()}: {e}")
-        return None
-
-    def hicon_to_pixmap(self, hicon):
-        """Convert HICON to QPixmap."""
-        hdc = ctypes.windll.user32.GetDC(0)
-        memdc = ctypes.windll.gdi32.CreateCompatibleDC(hdc)
-        bmp = ctypes.windll.gdi32.CreateCompatibleBitmap(hdc, 256, 256)
-        ctypes.windll.gdi32.SelectObject(memdc, bmp)
-
-        # Draw icon on memory DC
-        ctypes.windll.user32.DrawIconEx(memdc, 0, 0, hicon, 256, 256, 0, 0, 3)
-
-        # Convert bitmap to QPixmap
-        class BITMAPINFOHEADER(ctypes.Structure):
-            _fields_ = [
-                ("biSize", wintypes.DWORD),
-                ("biWidth", wintypes.LONG),
-                ("biHeight", wintypes.LONG),
-                ("biPlanes", wintypes.WORD),
-                ("biBitCount", wintypes.WORD),
-                ("biCompression", wintypes.DWORD),
-                ("biSizeImage", wintypes.DWORD),
-                ("biXPelsPerMeter", wintypes.LONG),
-                ("biYPelsPerMeter", wintypes.LONG),
-                ("biClrUsed", wintypes.DWORD),
-                ("biClrImportant", wintypes.DWORD),
-            ]
-
-        bmpinfo = BITMAPINFOHEADER()
-        bmpinfo.biSize = ctypes.sizeof(BITMAPINFOHEADER)
-        bmpinfo.biWidth = 256
-        bmpinfo.biHeight = -256
-        bmpinfo.biPlanes = 1
-        bmpinfo.biBitCount = 32
-        bmpinfo.biCompression = 0
-
-        buffer_len = 256 * 256 * 4
-        buffer = ctypes.create_string_buffer(buffer_len)
-        ctypes.windll.gdi32.GetDIBits(memdc, bmp, 0, 256, buffer, ctypes.byref(bmpinfo), 0)
-
-        image = QImage(buffer, 256, 256, QImage.Format.Format_ARGB32)
-        pixmap = QPixmap.fromImage(image)
-
-        ctypes.windll.gdi32.DeleteObject(bmp)
-        ctypes.windll.gdi32.DeleteDC(memdc)
-        ctypes.windll.user32.ReleaseDC(0, hdc)
-
-        return pixmap
-
     def set_eq(self, session_name, band, value):
         """Set the EQ value for a specific band."""
         if session_name not in self.eq_settings:
             self.eq_settings[session_name] = [0] * 10  # Initialize 10 bands
         self.eq_settings[session_name][band] = value
 
+    def set_eq_gains(self, session_name, gains):
+        """Set all EQ bands of a session at once; a running EQ engine picks them up."""
+        self.eq_settings[session_name] = list(gains)
+        if session_name in self.eq_engines:
+            self.apply_eq(session_name)
+
     def get_eq(self, session_name):
         """Get the EQ settings for a session."""
         return self.eq_settings.get(session_name, [0] * 10)
@@ -129,45 +165,186 @@ class AudioManager:
     def save_preset(self, session_name, preset_name):
         """Save the current EQ settings as a preset."""
         if session_name in self.eq_settings:
-            with open(f"{session_name}_{preset_name}.eq", "w") as f:
-                f.write(",".join(map(str, self.eq_settings[session_name])))
+            self.preset_store.save(session_name, preset_name, self.eq_settings[session_name])
 
     def load_preset(self, session_name, preset_name):
         """Load an EQ preset."""
-        try:
-            with open(f"{session_name}_{preset_name}.eq", "r") as f:
-                self.eq_settings[session_name] = list(map(int, f.read().split(",")))
-        except FileNotFoundError:
+        preset = self.preset_store.get(session_name, preset_name)
+        if preset is None:
             print(f"Preset {preset_name} not found for session {session_name}")
+            return
+        self.eq_settings[session_name] = list(preset["gains"])
 
     def list_presets(self, session_name):
         """List available presets for a session."""
-        presets = []
-        for file in os.listdir():
-            if file.startswith(session_name) and file.endswith(".eq"):
-                presets.append(file[len(session_name) + 1:-3])  # Extract preset name
-        return presets
+        return self.preset_store.list(session_name)
+
+    def save_scene(self, scene_name, done=None):
+        """Save the live mixer - master, session volumes and mutes, EQ - as a named scene, from the writer thread.
+
+        Capturing enumerates and reads every session, so like a recall it
+        runs on the writer thread, after the writes already queued there.
+        done, if given, is called on the writer thread with the scene, or
+        with None if it could not be captured.
+        """
+        def save(scene_name):
+            try:
+                scene = capture_scene(self)
+                self.scene_store.save(scene_name, scene)
+            except Exception as e:
+                print(f"Failed to save scene {scene_name}: {e}")
+                scene = None
+            if done is not None:
+                done(scene)
+
+        self.volume_writer.start()
+        self.volume_writer.submit(("save scene", scene_name), save, scene_name)
+
+    def recall_scene(self, scene_name, done=None):
+        """Bring the mixer to a saved scene from the writer thread; returns False if there is no such scene.
+
+        Only values that differ from the live state are written. done, if
+        given, is called on the writer thread with what apply_scene did.
+        Recalling again before a recall ran replaces it.
+        """
+        scene = self.scene_store.get(scene_name)
+        if scene is None:
+            print(f"Scene {scene_name} not found")
+            return False
+
+        def recall(scene):
+            result = apply_scene(self, scene)
+            if done is not None:
+                done(result)
+
+        self.volume_writer.start()
+        self.volume_writer.submit("scene", recall, scene)
+        return True
+
+    def list_scenes(self):
+        return self.scene_store.list()
+
+    def delete_scene(self, scene_name):
+        return self.scene_store.delete(scene_name)
+
+    def preload_eq(self):
+        """Import the EQ's DSP dependencies on a worker thread, ahead of the first slider move."""
+        threading.Thread(target=lambda: __import__("scipy.signal"), name="eq-preload", daemon=True).start()
+
+    def get_eq_engine(self, session_name):
+        """Get the streaming EQ engine for a session, creating it on first use."""
+        if session_name not in self.eq_engines:
+            engine = EqualizerEngine()
+            engine.set_gains(self.get_eq(session_name))
+            self.eq_engines[session_name] = engine
+        return self.eq_engines[session_name]
 
     def apply_eq(self, session_name):
-        """Apply the EQ settings to the audio output."""
-        eq_values = self.get_eq(session_name)
-        session = next((s for s in self.get_audio_sessions() if s["name"] == session_name), None)
-        if not session:
+        """Apply the EQ settings to the session's EQ engine."""
+        self.get_eq_engine(session_name).set_gains(self.get_eq(session_name))
+
+    def process_eq_block(self, session_name, block):
+        """Run an interleaved float32 block of the session's audio through its EQ, in place."""
+        self.get_eq_engine(session_name).process(block)
+        return block
+
+    def start_eq_route(self, session_name, input_device, output_device=None):
+        """Play an input device through the session's EQ to an output device. Returns False if it failed.
+
+        Windows does not let AudioPilot filter an app's own stream, so the
+        EQ is only applied to audio routed this way (see EqRoute).
+        """
+        if session_name in self.eq_routes:
+            return True
+        try:
+            from eq_route import EqRoute
+            self.eq_routes[session_name] = EqRoute(self.get_eq_engine(session_name), input_device, output_device)
+        except Exception as e:
+            print(f"Failed to route {session_name} through its EQ: {e}")
+            return False
+        return True
+
+    def stop_eq_routes(self):
+        """Stop every EQ route."""
+        for route in self.eq_routes.values():
+            route.close()
+        self.eq_routes.clear()
+
+    def is_eq_applied(self, session_name):
+        """Whether the session's EQ settings are heard, i.e. its audio is routed through the EQ."""
+        return session_name in self.eq_routes
+
+    def start_capture(self, device=None, source=None):
+        """Meter the loudness and spectrum of the system mix from a loopback device. Returns False if it failed.
+
+        Windows does not expose one app's output, so both are measured on
+        what all of them play together. device is a sounddevice index or
+        name, by default the first loopback device found; source replaces
+        the device with any iterable of blocks that has channels and
+        sample_rate, such as a SyntheticSource.
+        """
+        if self._capture_thread is not None:
+            return True
+        try:
+            if source is None:
+                from loudness import CaptureSource, find_loopback_device
+                if device is None:
+                    device = find_loopback_device()
+                    if device is None:
+                        raise RuntimeError("no loopback or Stereo Mix input device found")
+                source = CaptureSource(device=device, sample_rate=None)
+            self.loudness_meter = LoudnessMeter(source.channels, source.sample_rate)
+            self.spectrum_analyzer = SpectrumAnalyzer(sample_rate=source.sample_rate, channels=source.channels)
+        except Exception as e:
+            print(f"Failed to start the loopback capture: {e}")
+            return False
+        self._capture_source = source
+        self._capture_thread = threading.Thread(target=self._run_capture, args=(source,),
+                                                name="loopback-capture", daemon=True)
+        self._capture_thread.start()
+        return True
+
+    def _run_capture(self, source):
+        try:
+            for block in source:
+                with self._capture_lock:
+                    self.loudness_meter.process(block)
+                    self.spectrum_analyzer.process(block)
+        except Exception as e:
+            print(f"Loopback capture stopped: {e}")
+
+    def stop_capture(self):
+        """Stop the loopback capture; the last readings stay available."""
+        if self._capture_thread is None:
             return
+        if hasattr(self._capture_source, "close"):
+            self._capture_source.close()
+        self._capture_thread.join(timeout=1.0)
+        self._capture_source = None
+        self._capture_thread = None
+
+    def get_loudness(self):
+        """Momentary, short-term and integrated LUFS, RMS and true peak of the system mix, or None if unmeasured."""
+        if self.loudness_meter is None:
+            return None
+        with self._capture_lock:
+            return self.loudness_meter.readings()
+
+    def get_spectrum(self, dt):
+        """Smoothed band levels of the system mix in dB, dt seconds after the last call, or None if unmeasured."""
+        if self.spectrum_analyzer is None:
+            return None
+        with self._capture_lock:
+            return self.spectrum_analyzer.analyze(dt).copy()
+
+    def set_spectrum_resolution(self, resolution):
+        """Switch the spectrum between octave and third-octave bands."""
+        if self.spectrum_analyzer is not None:
+            with self._capture_lock:
+                self.spectrum_analyzer.set_resolution(resolution)
 
-        # Apply EQ settings directly to the session
-        def apply_band_pass_filter(audio_data, lowcut, highcut, fs, order=5):
-            nyquist = 0.5 * fs
-            low = lowcut / nyquist
-            high = highcut / nyquist
-            b, a = scipy.signal.butter(order, [low, high], btype='band')
-            y = scipy.signal.lfilter(b, a, audio_data)
-            return y
-
-        # Placeholder for actual EQ application logic
-        # Modify the audio data of the session directly using the appropriate audio APIs
-        # Example placeholder code:
-        # session["session"].SimpleAudioVolume.SetMasterVolume(eq_values[0] / 10.0, None)
-
-        # Note: The actual implementation will depend on the audio APIs you are using
-        # and how you can modify the audio data of the session directly
+    def reset_loudness(self):
+        """Start the integrated loudness and the peaks over."""
+        if self.loudness_meter is not None:
+            with self._capture_lock:
+                self.loudness_meter.reset()
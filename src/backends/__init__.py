@@ -0,0 +1,20 @@
+from backends.base import (
+    MUTE_CHANGED, SESSION_CREATED, SESSION_EXPIRED, VOLUME_CHANGED, AudioBackend, BackendSession,
+)
+
+
+def create_backend(name="pycaw", **options):
+    """Create an audio backend by name. Backends are imported on demand."""
+    if name == "pycaw":
+        from backends.pycaw_backend import PycawBackend
+        return PycawBackend(**options)
+    if name == "simulated":
+        from backends.simulated import SimulatedBackend
+        return SimulatedBackend(**options)
+    raise ValueError(f"Unknown audio backend: {name}")
+
+
+__all__ = [
+    "AudioBackend", "BackendSession", "create_backend",
+    "SESSION_CREATED", "SESSION_EXPIRED", "VOLUME_CHANGED", "MUTE_CHANGED",
+]
@@ -0,0 +1,97 @@
+# Events a backend reports through the sink passed to start_notifications
+SESSION_CREATED = "session_created"
+SESSION_EXPIRED = "session_expired"
+VOLUME_CHANGED = "volume_changed"
+MUTE_CHANGED = "mute_changed"
+
+
+class BackendSession:
+    """One audio session as reported by a backend.
+
+    key is the stable identity used to track the session across polls;
+    native holds whatever object the backend needs to talk to the session
+    and handles the interfaces it has acquired for it (see SessionRegistry).
+    """
+
+    def __init__(self, key, pid, name, exe_path=None, native=None):
+        self.key = key
+        self.pid = pid
+        self.name = name
+        self.exe_path = exe_path
+        self.native = native
+        self.handles = {}
+
+    def __repr__(self):
+        return f"BackendSession(pid={self.pid}, name={self.name!r})"
+
+
+class AudioBackend:
+    """Access to the endpoint and per-session controls of an audio system.
+
+    Volumes and peaks are scalars in the 0.0-1.0 range.
+    """
+
+    registry = None  # SessionRegistry of backends that keep sessions and their interfaces across polls
+
+    def get_master_volume(self):
+        raise NotImplementedError
+
+    def set_master_volume(self, level):
+        raise NotImplementedError
+
+    def list_sessions(self):
+        """Return a BackendSession for every session that belongs to a process."""
+        raise NotImplementedError
+
+    def get_session_volume(self, session):
+        raise NotImplementedError
+
+    def set_session_volume(self, session, level):
+        raise NotImplementedError
+
+    def get_session_mute(self, session):
+        raise NotImplementedError
+
+    def set_session_mute(self, session, muted):
+        raise NotImplementedError
+
+    def get_session_peak(self, session):
+        """Return the current peak meter value of a session."""
+        raise NotImplementedError
+
+    def get_session_peaks(self, sessions):
+        """Return the peak meter values of several sessions; unreadable ones read 0.0."""
+        peaks = []
+        for session in sessions:
+            try:
+                peaks.append(self.get_session_peak(session))
+            except Exception:
+                peaks.append(0.0)
+        return peaks
+
+    def set_session_volumes(self, writes):
+        """Apply (session, level) volume writes in one batch; failed writes are reported and skipped."""
+        for session, level in writes:
+            try:
+                self.set_session_volume(session, level)
+            except Exception as e:
+                print(f"Failed to set volume for {session.name}: {e}")
+
+    def thread_init(self):
+        """Prepare the calling worker thread to use this backend."""
+
+    def thread_exit(self):
+        """Release what thread_init set up on the calling thread."""
+
+    def start_notifications(self, sink):
+        """Start pushing session events as sink(event, key, value).
+
+        value is the new volume scalar for VOLUME_CHANGED, the new mute
+        state for MUTE_CHANGED and None otherwise. The sink may be called
+        from any thread. Returns False if the backend cannot push events,
+        in which case callers have to poll.
+        """
+        return False
+
+    def stop_notifications(self):
+        pass
@@ -0,0 +1,215 @@
+import queue
+import threading
+
+import comtypes
+from comtypes import CLSCTX_ALL
+from pycaw.callbacks import AudioSessionEvents, AudioSessionNotification
+from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume, IAudioMeterInformation, ISimpleAudioVolume
+
+from backends.base import (
+    MUTE_CHANGED, SESSION_CREATED, SESSION_EXPIRED, VOLUME_CHANGED, AudioBackend, BackendSession,
+)
+from backends.registry import SessionRegistry
+from instrumentation import timed
+
+
+class _SessionCreatedCallback(AudioSessionNotification):
+    """Forwards new sessions to the notification thread."""
+
+    def __init__(self, requests):
+        super().__init__()
+        self.requests = requests
+
+    def on_session_created(self, new_session):
+        # Registering session events from inside the callback is not allowed,
+        # so the notification thread picks the session up from the queue
+        self.requests.put(("created", new_session))
+
+
+class _SessionEventsCallback(AudioSessionEvents):
+    """Turns the events of one session into backend notifications."""
+
+    def __init__(self, key, muted, sink, requests):
+        super().__init__()
+        self.key = key
+        self.muted = muted
+        self.sink = sink
+        self.requests = requests
+
+    def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+        self.sink(VOLUME_CHANGED, self.key, new_volume)
+        if bool(new_mute) != self.muted:
+            self.muted = bool(new_mute)
+            self.sink(MUTE_CHANGED, self.key, self.muted)
+
+    def on_state_changed(self, new_state, new_state_id):
+        if new_state == "Expired":
+            self.requests.put(("expired", self.key))
+
+    def on_session_disconnected(self, disconnect_reason, disconnect_reason_id):
+        self.requests.put(("expired", self.key))
+
+
+class PycawBackend(AudioBackend):
+    """Windows Core Audio through pycaw and comtypes.
+
+    Sessions, their process metadata and their meter and volume interfaces
+    are kept in a SessionRegistry until Windows reports the session expired
+    or it drops out of an enumeration. cache_handles=False re-acquires them
+    on every call instead, for comparison.
+    """
+
+    def __init__(self, cache_handles=True):
+        self.registry = SessionRegistry(cache=cache_handles)
+        self.devices = AudioUtilities.GetSpeakers()
+        interface = self.devices.Activate(
+            IAudioEndpointVolume._iid_, CLSCTX_ALL, None
+        )
+        self.volume = interface.QueryInterface(IAudioEndpointVolume)
+        self._notification_thread = None
+        self._requests = queue.Queue()
+
+    @timed("com.get_master_volume")
+    def get_master_volume(self):
+        return self.volume.GetMasterVolumeLevelScalar()
+
+    @timed("com.set_master_volume")
+    def set_master_volume(self, level):
+        self.volume.SetMasterVolumeLevelScalar(level, None)
+
+    @timed("com.list_sessions")
+    def list_sessions(self):
+        sessions = []
+        keys = []
+        for native in AudioUtilities.GetAllSessions():
+            if not native.ProcessId:
+                continue  # System sounds
+            key = (native.ProcessId, native.InstanceIdentifier)
+            keys.append(key)
+            session = self.registry.session(key, lambda: self._create_session(key, native))
+            if session is not None:
+                sessions.append(session)
+        self.registry.retain(keys)
+        return sessions
+
+    def _create_session(self, key, native):
+        process = native.Process
+        if not process:
+            return None
+        try:
+            exe_path = process.exe()
+        except Exception:
+            exe_path = None  # Protected processes refuse to report their image path
+        return BackendSession(key=key, pid=native.ProcessId, name=process.name(), exe_path=exe_path, native=native)
+
+    def _volume(self, session):
+        return self.registry.handle(
+            session, "volume", lambda: session.native._ctl.QueryInterface(ISimpleAudioVolume)
+        )
+
+    def _meter(self, session):
+        return self.registry.handle(
+            session, "meter", lambda: session.native._ctl.QueryInterface(IAudioMeterInformation)
+        )
+
+    @timed("com.get_session_volume")
+    def get_session_volume(self, session):
+        return self._volume(session).GetMasterVolume()
+
+    @timed("com.set_session_volume")
+    def set_session_volume(self, session, level):
+        self._volume(session).SetMasterVolume(level, None)
+
+    @timed("com.get_session_mute")
+    def get_session_mute(self, session):
+        return bool(self._volume(session).GetMute())
+
+    @timed("com.set_session_mute")
+    def set_session_mute(self, session, muted):
+        self._volume(session).SetMute(int(muted), None)
+
+    @timed("com.get_session_peak")
+    def get_session_peak(self, session):
+        return self._meter(session).GetPeakValue()
+
+    @timed("com.get_session_peaks")
+    def get_session_peaks(self, sessions):
+        peaks = []
+        for session in sessions:
+            try:
+                peaks.append(self._meter(session).GetPeakValue())
+            except Exception:
+                self.registry.release(session, "meter")  # Reacquire next time, e.g. after a device change
+                peaks.append(0.0)
+        return peaks
+
+    def thread_init(self):
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+    def thread_exit(self):
+        comtypes.CoUninitialize()
+
+    def start_notifications(self, sink):
+        if self._notification_thread is None:
+            self._notification_thread = threading.Thread(
+                target=self._watch_sessions, args=(sink,), name="session-notifications", daemon=True
+            )
+            self._notification_thread.start()
+        return True
+
+    def stop_notifications(self):
+        if self._notification_thread is not None:
+            self._requests.put(("stop", None))
+            self._notification_thread.join(timeout=1.0)
+            self._notification_thread = None
+
+    def _watch_sessions(self, sink):
+        """Notification thread: register for session events and service the request queue.
+
+        Windows only delivers session notifications to callbacks registered
+        from a multithreaded apartment, which the GUI thread cannot be.
+        """
+        self.thread_init()
+        try:
+            manager = AudioUtilities.GetAudioSessionManager()
+            created_callback = _SessionCreatedCallback(self._requests)
+            manager.RegisterSessionNotification(created_callback)
+            manager.GetSessionEnumerator()  # Creation callbacks only start after a first enumeration
+
+            watched = {}
+            for session in AudioUtilities.GetAllSessions():
+                self._watch_session(session, watched, sink)
+
+            while True:
+                request, item = self._requests.get()
+                if request == "stop":
+                    break
+                if request == "created":
+                    key = self._watch_session(item, watched, sink)
+                    if key is not None:
+                        sink(SESSION_CREATED, key, None)
+                elif request == "expired":
+                    self.registry.expire(item)
+                    session = watched.pop(item, None)
+                    if session is not None:
+                        session.unregister_notification()
+                        sink(SESSION_EXPIRED, item, None)
+
+            manager.UnregisterSessionNotification(created_callback)
+            for session in watched.values():
+                session.unregister_notification()
+        except Exception as e:
+            print(f"Session notifications stopped: {e}")
+        finally:
+            self.thread_exit()
+
+    def _watch_session(self, session, watched, sink):
+        if not session.ProcessId:
+            return None  # System sounds, which list_sessions skips as well
+        key = (session.ProcessId, session.InstanceIdentifier)
+        if key in watched:
+            return None
+        muted = bool(session.SimpleAudioVolume.GetMute())
+        session.register_notification(_SessionEventsCallback(key, muted, sink, self._requests))
+        watched[key] = session
+        return key
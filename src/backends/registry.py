@@ -0,0 +1,73 @@
+import collections
+import threading
+
+
+class SessionRegistry:
+    """Backend sessions by key, with their native interfaces, kept for the session's lifetime.
+
+    A backend builds a session - reading its process name and image path -
+    the first time an enumeration reports it, and acquires each interface
+    it needs (meter, volume control) on first use. Both are reused until
+    the session drops out of an enumeration or is reported expired.
+    acquisitions counts every build and acquisition by kind, so the
+    savings can be measured. With cache=False nothing is kept and every
+    call acquires again, which is how the backends used to behave.
+    """
+
+    def __init__(self, cache=True):
+        self.cache = cache
+        self.acquisitions = collections.Counter()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, key, create):
+        """The registered session for key, built with create() if the key is new.
+
+        create() may return None for a session that cannot be built (its
+        process exited); nothing is registered then.
+        """
+        session = self._sessions.get(key)
+        if session is None:
+            session = create()
+            with self._lock:
+                self.acquisitions["process"] += 1
+                if self.cache and session is not None:
+                    session = self._sessions.setdefault(key, session)
+        return session
+
+    def handle(self, session, kind, acquire):
+        """The session's interface of the given kind, acquired with acquire() on first use."""
+        handle = session.handles.get(kind)
+        if handle is None:
+            handle = acquire()
+            with self._lock:
+                self.acquisitions[kind] += 1
+            if self.cache:
+                session.handles[kind] = handle
+        return handle
+
+    def release(self, session, kind):
+        """Drop one cached interface, e.g. after a call on it failed; the next use acquires it again."""
+        session.handles.pop(kind, None)
+
+    def retain(self, keys):
+        """Forget every session whose key is not in keys, e.g. after a full enumeration."""
+        keys = set(keys)
+        with self._lock:
+            for key in [key for key in self._sessions if key not in keys]:
+                self._sessions.pop(key).handles.clear()
+
+    def expire(self, key):
+        """Forget a session and release its interfaces."""
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            session.handles.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        """Registered session count and acquisitions so far by kind."""
+        with self._lock:
+            return {"sessions": len(self._sessions), "acquisitions": dict(self.acquisitions)}
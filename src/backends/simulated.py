@@ -0,0 +1,197 @@
+import itertools
+import math
+import random
+import time
+
+from backends.base import (
+    MUTE_CHANGED, SESSION_CREATED, SESSION_EXPIRED, VOLUME_CHANGED, AudioBackend, BackendSession,
+)
+from backends.registry import SessionRegistry
+
+APP_NAMES = (
+    "spotify.exe", "discord.exe", "chrome.exe", "firefox.exe", "vlc.exe",
+    "obs64.exe", "steam.exe", "teams.exe", "zoom.exe", "msedge.exe",
+)
+
+
+class SimulatedState:
+    """Mutable state behind one simulated session."""
+
+    def __init__(self, level, rate, phase):
+        self.volume = 1.0
+        self.muted = False
+        self.level = level  # Peak of the synthetic signal before volume
+        self.rate = rate  # Bursts per second
+        self.phase = phase
+
+
+class SimulatedBackend(AudioBackend):
+    """Synthetic sessions for headless benchmarks and tests.
+
+    session_count sessions exist from the start. churn is the mean number of
+    sessions that close, each replaced by a new one, per list_sessions call.
+    Peaks follow a per-session burst pattern scaled by volume and mute, read
+    against clock so tests can drive time explicitly.
+
+    Once notifications are started every change - including churn and the
+    add_session/remove_session helpers - is pushed synchronously to the sink,
+    standing in for the Windows session callbacks.
+
+    Like the pycaw backend, list_sessions builds its sessions through a
+    SessionRegistry and peak and volume calls go through per-session
+    interfaces it caches. acquire_cost seconds are spent on every build or
+    acquisition, standing in for the process queries and QueryInterface
+    calls, so the effect of cache_handles shows up in timings as well as in
+    registry.acquisitions. Likewise read_cost and write_cost are spent on
+    every session volume or mute read and write; writes are the dearer
+    ones on Windows, where each one is also fanned out to every client
+    registered for the session's events. reads and writes count the calls.
+    """
+
+    def __init__(self, session_count=10, churn=0.0, seed=0, clock=time.monotonic,
+                 cache_handles=True, acquire_cost=0.0, read_cost=0.0, write_cost=0.0):
+        self.churn = churn
+        self.clock = clock
+        self.acquire_cost = acquire_cost
+        self.read_cost = read_cost
+        self.write_cost = write_cost
+        self.reads = 0
+        self.writes = 0
+        self.registry = SessionRegistry(cache=cache_handles)
+        self.master_volume = 1.0
+        self._sink = None
+        self._rng = random.Random(seed)
+        self._pids = itertools.count(1000)
+        self.sessions = []
+        for _ in range(session_count):
+            self.add_session()
+
+    def add_session(self, name=None, level=None, exe_path=None):
+        """Start a new simulated session and return it.
+
+        The returned session shares its state with the ones list_sessions
+        reports for it, so hold_level and remove_session accept either.
+        """
+        pid = next(self._pids)
+        state = SimulatedState(
+            level=self._rng.uniform(0.2, 1.0) if level is None else level,
+            rate=self._rng.uniform(0.5, 4.0),
+            phase=self._rng.uniform(0.0, 2 * math.pi),
+        )
+        session = BackendSession(
+            key=(pid, f"simulated-{pid}"),
+            pid=pid,
+            name=name or self._rng.choice(APP_NAMES),
+            exe_path=exe_path,
+            native=state,
+        )
+        self.sessions.append(session)
+        self._notify(SESSION_CREATED, session.key, None)
+        return session
+
+    def hold_level(self, session, level):
+        """Make a session's peak a constant level (before volume), for deterministic tests."""
+        session.native.level = level
+        session.native.rate = 0.0
+        session.native.phase = math.pi / 2
+
+    def remove_session(self, session):
+        """Expire a simulated session."""
+        self.sessions = [source for source in self.sessions if source.key != session.key]
+        self.registry.expire(session.key)
+        self._notify(SESSION_EXPIRED, session.key, None)
+
+    def _spend(self, seconds):
+        if seconds:
+            # Spin rather than sleep, a sleep is far coarser than the cost it stands in for
+            until = time.perf_counter() + seconds
+            while time.perf_counter() < until:
+                pass
+
+    def _acquire(self, value):
+        self._spend(self.acquire_cost)
+        return value
+
+    def _read(self, session):
+        self.reads += 1
+        self._spend(self.read_cost)
+        return self._volume(session)
+
+    def _write(self, session):
+        self.writes += 1
+        self._spend(self.write_cost)
+        return self._volume(session)
+
+    def _create_session(self, source):
+        return self._acquire(BackendSession(
+            key=source.key, pid=source.pid, name=source.name, exe_path=source.exe_path, native=source.native,
+        ))
+
+    def _meter(self, session):
+        return self.registry.handle(session, "meter", lambda: self._acquire(session.native))
+
+    def _volume(self, session):
+        return self.registry.handle(session, "volume", lambda: self._acquire(session.native))
+
+    def _notify(self, event, key, value):
+        if self._sink is not None:
+            self._sink(event, key, value)
+
+    def _apply_churn(self):
+        replaced = int(self.churn)
+        if self._rng.random() < self.churn - replaced:
+            replaced += 1
+        for _ in range(min(replaced, len(self.sessions))):
+            self.remove_session(self._rng.choice(self.sessions))
+            self.add_session()
+
+    def get_master_volume(self):
+        return self.master_volume
+
+    def set_master_volume(self, level):
+        self.writes += 1
+        self._spend(self.write_cost)
+        self.master_volume = level
+
+    def list_sessions(self):
+        self._apply_churn()
+        sessions = [self.registry.session(source.key, lambda: self._create_session(source))
+                    for source in self.sessions]
+        self.registry.retain(source.key for source in self.sessions)
+        return sessions
+
+    def get_session_volume(self, session):
+        return self._read(session).volume
+
+    def set_session_volume(self, session, level):
+        self._write(session).volume = level
+        self._notify(VOLUME_CHANGED, session.key, level)
+
+    def get_session_mute(self, session):
+        return self._read(session).muted
+
+    def set_session_mute(self, session, muted):
+        state = self._write(session)
+        if state.muted != bool(muted):
+            state.muted = bool(muted)
+            self._notify(MUTE_CHANGED, session.key, state.muted)
+
+    def get_session_peak(self, session):
+        return self._peak(self._meter(session), self.clock())
+
+    def get_session_peaks(self, sessions):
+        now = self.clock()  # One reading time for the whole batch
+        return [self._peak(self._meter(session), now) for session in sessions]
+
+    def _peak(self, state, now):
+        if state.muted:
+            return 0.0
+        burst = 0.5 + 0.5 * math.sin(2 * math.pi * state.rate * now + state.phase)
+        return state.level * burst * state.volume
+
+    def start_notifications(self, sink):
+        self._sink = sink
+        return True
+
+    def stop_notifications(self):
+        self._sink = None
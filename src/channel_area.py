@@ -0,0 +1,87 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QScrollArea, QWidget
+
+STRIP_WIDTH = 110
+STRIP_HEIGHT = 360
+OVERSCAN = 1  # Strips realized beyond each edge of the viewport, so scrolling doesn't flash
+
+
+class ChannelArea(QScrollArea):
+    """Horizontally scrolling row of channel strips that only realizes what is in view.
+
+    Every session gets a fixed-width slot, but a strip widget exists only for
+    slots inside the viewport (plus OVERSCAN on each side). build_strip(session)
+    creates a strip when its slot scrolls into view and release_strip(session)
+    is called before the strip is deleted, so off-screen sessions cost no
+    widgets.
+    """
+
+    def __init__(self, build_strip, release_strip, parent=None):
+        super().__init__(parent)
+        self.build_strip = build_strip
+        self.release_strip = release_strip
+        self._sessions = []
+        self._strips = {}  # Session key -> (session, strip widget)
+
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setWidgetResizable(False)
+        self.setFrameShape(QScrollArea.Shape.NoFrame)
+        self._content = QWidget()
+        self.setWidget(self._content)
+        self.setMinimumHeight(STRIP_HEIGHT)
+        self.horizontalScrollBar().valueChanged.connect(lambda _: self._realize_visible())
+
+    def set_sessions(self, sessions):
+        """Show these sessions, in order, keeping strips that already exist."""
+        self._sessions = list(sessions)
+        keys = {session["key"] for session in self._sessions}
+        for key in [key for key in self._strips if key not in keys]:
+            self._release(key)
+        self._resize_content()
+        self._realize_visible()
+
+    def sessions(self):
+        return self._sessions
+
+    def strip_count(self):
+        """Number of strips currently realized."""
+        return len(self._strips)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._resize_content()
+        self._realize_visible()
+
+    def _resize_content(self):
+        self._content.resize(max(len(self._sessions) * STRIP_WIDTH, 1), self.viewport().height())
+
+    def _visible_range(self):
+        offset = self.horizontalScrollBar().value()
+        first = max(offset // STRIP_WIDTH - OVERSCAN, 0)
+        last = min((offset + self.viewport().width()) // STRIP_WIDTH + OVERSCAN, len(self._sessions) - 1)
+        return first, last
+
+    def _realize_visible(self):
+        first, last = self._visible_range()
+        wanted = {}
+        for index in range(first, last + 1):
+            wanted[self._sessions[index]["key"]] = index
+
+        for key in [key for key in self._strips if key not in wanted]:
+            self._release(key)
+
+        height = self.viewport().height()
+        for key, index in wanted.items():
+            if key not in self._strips:
+                session = self._sessions[index]
+                strip = self.build_strip(session)
+                strip.setParent(self._content)
+                strip.show()
+                self._strips[key] = (session, strip)
+            self._strips[key][1].setGeometry(index * STRIP_WIDTH, 0, STRIP_WIDTH, height)
+
+    def _release(self, key):
+        session, strip = self._strips.pop(key)
+        self.release_strip(session)
+        strip.deleteLater()
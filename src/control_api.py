@@ -0,0 +1,559 @@
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import math
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from backends import SESSION_CREATED, SESSION_EXPIRED
+from ducking import app_name
+from eq_engine import EQ_BANDS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47613
+FRAME_HEADER = struct.Struct("<BI")  # Frame kind, payload length
+METER_HEADER = struct.Struct("<IdI")  # Sequence number, server time in seconds, session count
+KIND_JSON = 1
+KIND_METERS = 2
+MAX_MESSAGE_BYTES = 1 << 20  # Larger client messages close the connection
+MAX_METER_RATE = 240.0  # Frames per second a client may ask for
+METER_BUFFER_LIMIT = 64 * 1024  # Meter frames are skipped for a client with more than this unsent
+SOCKET_SEND_BUFFER = 64 * 1024  # Kernel buffering per client, which bounds how stale a slow client's meters get
+METER_POLL_S = 0.05  # Longest the meter task sleeps, so new subscribers start promptly
+COINCIDENT_S = 0.002  # Subscribers due within this window share one peak read
+SESSION_REFRESH_S = 2.0  # Re-enumerate sessions at least this often
+REFRESH_MIN_INTERVAL_S = 0.1  # Bursts of session events cause one re-enumeration
+SCENE_SAVE_TIMEOUT_S = 5.0
+
+
+def encode_frame(kind, payload):
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+
+def encode_json(message):
+    return encode_frame(KIND_JSON, json.dumps(message, separators=(",", ":")).encode())
+
+
+async def read_frame(reader, limit=MAX_MESSAGE_BYTES):
+    """Read one frame as (kind, payload); None if the stream ended cleanly between frames."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise
+        return None
+    kind, length = FRAME_HEADER.unpack(header)
+    if length > limit:
+        raise ValueError(f"Frame of {length} bytes exceeds the {limit} byte limit")
+    return kind, await reader.readexactly(length)
+
+
+def decode_meters(payload):
+    """(sequence, timestamp, ids, peaks) of a meter frame; ids and peaks are numpy arrays."""
+    sequence, timestamp, count = METER_HEADER.unpack_from(payload)
+    ids = np.frombuffer(payload, dtype="<u4", count=count, offset=METER_HEADER.size)
+    peaks = np.frombuffer(payload, dtype="<f4", count=count, offset=METER_HEADER.size + 4 * count)
+    return sequence, timestamp, ids, peaks
+
+
+class _Client:
+    """Connection state of one control client."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.period = 0.0  # Seconds between meter frames, 0 when not subscribed
+        self.next_due = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+
+class ControlServer:
+    """Local control API on top of AudioManager, for scripts, stream decks and OBS plugins.
+
+    Listens on a localhost TCP socket. Every frame is a FRAME_HEADER
+    followed by its payload. Clients send JSON messages of the form
+    {"id": ..., "commands": [{"op": ..., ...}, ...]} and get back
+    {"id": ..., "results": [...]}, one result per command. Volume writes of
+    one message go to the backend as a single batch. Sessions are addressed
+    by "session": the numeric id list_sessions reports, an app name such as
+    "spotify" (every session of that app) or a list of either.
+
+    Ops: list_sessions, set_volume (volume 0-100), set_mute (muted),
+    set_eq (gains, one per band), load_preset (preset), get_master_volume,
+    set_master_volume, list_scenes, save_scene (name), recall_scene (name),
+    subscribe_meters (rate in Hz), unsubscribe_meters, get_loudness,
+    reset_loudness and stats. get_loudness reports the system mix in LUFS
+    and dBFS while the loopback capture runs, with null for silence.
+
+    Subscribers receive KIND_METERS frames at their own rate: a
+    METER_HEADER, then the session ids as little-endian uint32 and their
+    peaks (0.0-1.0) as float32. Peaks are read once for all subscribers
+    that are due together. A client whose socket has more than
+    METER_BUFFER_LIMIT bytes unsent skips frames instead of queueing them,
+    so slow readers cannot grow the server's memory or hold up others. The
+    kernel send buffer is capped as well, or a stalled client would be
+    handed megabytes of stale meters before backpressure kicked in.
+
+    The event loop thread only decodes, encodes and writes. Commands and
+    session enumeration run on one worker thread and peak reads on another,
+    both set up with backend.thread_init(), so a slow backend call delays
+    its own reply or frame but never the loop.
+    """
+
+    def __init__(self, audio_manager, host=DEFAULT_HOST, port=DEFAULT_PORT, clock=time.perf_counter):
+        self.audio_manager = audio_manager
+        self.host = host
+        self.port = port  # Replaced by the bound port once listening, so 0 picks a free one
+        self.clock = clock
+        self.started = clock()
+        self.clients = set()
+        self.frames_encoded = 0
+        self._sessions = {}  # Id -> session dict from AudioManager.get_audio_sessions
+        self._ids = {}  # Session key -> id
+        self._id_counter = itertools.count(1)
+        self._meter_sessions = ([], b"")  # Sessions to meter and their ids as uint32 bytes, replaced together
+        self._sequence = 0
+        self._last_refresh = None
+        self._handlers = {
+            "list_sessions": self._list_sessions,
+            "set_volume": self._set_volume,
+            "set_mute": self._set_mute,
+            "set_eq": self._set_eq,
+            "load_preset": self._load_preset,
+            "get_master_volume": self._get_master_volume,
+            "set_master_volume": self._set_master_volume,
+            "list_scenes": self._list_scenes,
+            "save_scene": self._save_scene,
+            "recall_scene": self._recall_scene,
+            "subscribe_meters": self._subscribe_meters,
+            "unsubscribe_meters": self._unsubscribe_meters,
+            "get_loudness": self._get_loudness,
+            "reset_loudness": self._reset_loudness,
+            "stats": self._stats,
+        }
+        self._loop = None
+        self._stopping = None
+        self._refresh_needed = None
+        self._meters_wake = None
+        self._commands = None  # Worker for commands and enumeration
+        self._peaks = None  # Worker for meter peak reads
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Serve from a background thread. Returns True once listening, False if the server failed."""
+        if self._thread is None:
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+            self._thread.start()
+        self._ready.wait(timeout=5.0)
+        return self._loop is not None
+
+    def stop(self):
+        """Close every connection and stop the background thread."""
+        if self._thread is not None:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self):
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            print(f"Control server failed: {e}")
+        finally:
+            self._loop = None
+            self._ready.set()
+
+    async def serve(self):
+        """Serve on the running event loop until stop() is called."""
+        self._stopping = asyncio.Event()
+        self._refresh_needed = asyncio.Event()
+        self._meters_wake = asyncio.Event()
+        self._commands = self._backend_worker("control-commands")
+        self._peaks = self._backend_worker("control-peaks")
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._commands, self.refresh_sessions)
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        except Exception:
+            self._stop_workers()
+            raise
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop = loop
+        self.audio_manager.subscribe(self._on_session_event)
+        tasks = [asyncio.create_task(self._stream_meters()), asyncio.create_task(self._refresh_sessions())]
+        self._ready.set()
+        try:
+            await self._stopping.wait()
+        finally:
+            self.audio_manager.unsubscribe(self._on_session_event)
+            for task in tasks:
+                task.cancel()
+            server.close()
+            for client in list(self.clients):
+                client.writer.close()
+            await server.wait_closed()
+            self._stop_workers()
+
+    def _backend_worker(self, name):
+        return concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=name,
+                                                     initializer=self.audio_manager.backend.thread_init)
+
+    def _stop_workers(self):
+        for worker in (self._commands, self._peaks):
+            worker.submit(self.audio_manager.backend.thread_exit)  # Runs on the worker, after what is queued
+            worker.shutdown(wait=False)
+
+    def _on_session_event(self, event, key, value):
+        # Called from backend threads, or from this one for synchronous backends
+        if event in (SESSION_CREATED, SESSION_EXPIRED) and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._refresh_needed.set)
+            except RuntimeError:
+                pass  # The loop closed while the event was in flight
+
+    def refresh_sessions(self):
+        """Re-enumerate sessions, keeping the ids of the ones still alive."""
+        sessions = self.audio_manager.get_audio_sessions()
+        self._last_refresh = self.clock()
+        ids = {}
+        current = {}
+        for session in sessions:
+            session_id = self._ids.get(session["key"]) or next(self._id_counter)
+            ids[session["key"]] = session_id
+            current[session_id] = session
+        self._ids = ids
+        self._sessions = current
+        self._meter_sessions = ([session["session"] for session in current.values()],
+                                np.fromiter(current, dtype="<u4", count=len(current)).tobytes())
+
+    async def _refresh_sessions(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_needed.wait(), SESSION_REFRESH_S)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(max(self._last_refresh + REFRESH_MIN_INTERVAL_S - self.clock(), 0.0))
+            self._refresh_needed.clear()
+            try:
+                await self._loop.run_in_executor(self._commands, self.refresh_sessions)
+            except Exception as e:
+                print(f"Control server failed to enumerate sessions: {e}")
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(writer)
+        writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SEND_BUFFER)
+        writer.transport.set_write_buffer_limits(high=METER_BUFFER_LIMIT)
+        self.clients.add(client)
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                kind, payload = frame
+                if kind != KIND_JSON:
+                    raise ValueError(f"Unexpected frame kind {kind}")
+                response = await self._loop.run_in_executor(self._commands, self._respond, client, payload)
+                writer.write(encode_json(response))
+                await writer.drain()  # A client that does not read its replies stops being served
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            print(f"Dropped control client: {e}")
+        except ConnectionError:
+            pass  # The client went away
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def _respond(self, client, payload):
+        try:
+            return self.handle_message(client, json.loads(payload))
+        except (TypeError, ValueError) as e:
+            return {"id": None, "error": f"Malformed message: {e}"}
+
+    def handle_message(self, client, message):
+        """Run the commands of one decoded message and return the response.
+
+        Makes backend calls, so the server runs it on its command worker.
+        """
+        if not isinstance(message, dict):
+            raise ValueError("expected a JSON object")
+        commands = message["commands"] if "commands" in message else [message]
+        if not isinstance(commands, list) or not all(isinstance(command, dict) for command in commands):
+            raise ValueError("commands must be a list of JSON objects")
+        writes = {}  # Session key -> (session, level); the last write to a session wins
+        results = [self._run_command(client, command, writes) for command in commands]
+        if writes:
+            self.audio_manager.set_session_volumes(list(writes.values()))
+        return {"id": message.get("id"), "results": results}
+
+    def _run_command(self, client, command, writes):
+        try:
+            handler = self._handlers[command["op"]]
+        except (KeyError, TypeError):
+            return {"ok": False, "error": f"Unknown command: {command!r}"}
+        try:
+            result = handler(client, command, writes)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            print(f"Control command {command['op']} failed: {e}")
+            return {"ok": False, "error": str(e)}
+        return dict(result or {}, ok=True)
+
+    def _targets(self, command):
+        targets = command.get("session")
+        if not isinstance(targets, list):
+            targets = [targets]
+        sessions = {}
+        for target in targets:
+            if isinstance(target, int) and not isinstance(target, bool):
+                if target not in self._sessions:
+                    raise KeyError(f"No session with id {target}")
+                sessions[target] = self._sessions[target]
+            elif isinstance(target, str):
+                name = os.path.splitext(target)[0].lower()
+                matches = {session_id: session for session_id, session in self._sessions.items()
+                           if app_name(session["session"]) == name}
+                if not matches:
+                    raise KeyError(f"No session for {target!r}")
+                sessions.update(matches)
+            else:
+                raise ValueError("Commands need a session id, an app name or a list of them")
+        return list(sessions.values())
+
+    def _list_sessions(self, client, command, writes):
+        backend = self.audio_manager.backend
+        return {"sessions": [
+            {
+                "id": session_id,
+                "name": session["name"],
+                "pid": session["session"].pid,
+                "volume": backend.get_session_volume(session["session"]) * 100,
+                "muted": backend.get_session_mute(session["session"]),
+            }
+            for session_id, session in self._sessions.items()
+        ]}
+
+    def _set_volume(self, client, command, writes):
+        level = float(command["volume"])
+        if not 0.0 <= level <= 100.0:
+            raise ValueError(f"Volume {level} is outside 0-100")
+        sessions = self._targets(command)
+        for session in sessions:
+            writes[session["key"]] = (session["session"], level)
+        return {"sessions": len(sessions)}
+
+    def _set_mute(self, client, command, writes):
+        sessions = self._targets(command)
+        for session in sessions:
+            self.audio_manager.set_session_mute(session["session"], bool(command["muted"]))
+        return {"sessions": len(sessions)}
+
+    def _set_eq(self, client, command, writes):
+        gains = [float(gain) for gain in command["gains"]]
+        if len(gains) != EQ_BANDS:
+            raise ValueError(f"Expected {EQ_BANDS} gains, got {len(gains)}")
+        names = {session["name"] for session in self._targets(command)}  # EQ settings are kept per app
+        for name in names:
+            self.audio_manager.set_eq_gains(name, gains)
+        return {"sessions": len(names)}
+
+    def _load_preset(self, client, command, writes):
+        names = {session["name"] for session in self._targets(command)}
+        for name in names:
+            preset = self.audio_manager.preset_store.get(name, command["preset"])
+            if preset is None:
+                raise KeyError(f"No preset {command['preset']!r} for {name}")
+            self.audio_manager.set_eq_gains(name, preset["gains"])
+        return {"sessions": len(names)}
+
+    def _get_master_volume(self, client, command, writes):
+        return {"volume": self.audio_manager.get_master_volume()}
+
+    def _set_master_volume(self, client, command, writes):
+        level = float(command["volume"])
+        if not 0.0 <= level <= 100.0:
+            raise ValueError(f"Volume {level} is outside 0-100")
+        self.audio_manager.set_master_volume(level)
+
+    def _list_scenes(self, client, command, writes):
+        return {"scenes": self.audio_manager.list_scenes()}
+
+    def _save_scene(self, client, command, writes):
+        # Captured on the volume writer thread; wait, so a list_scenes sent after this sees the scene
+        saved = []
+        done = threading.Event()
+        self.audio_manager.save_scene(str(command["name"]), done=lambda scene: (saved.append(scene), done.set()))
+        if not done.wait(SCENE_SAVE_TIMEOUT_S) or saved[0] is None:
+            raise ValueError(f"Scene {command['name']!r} could not be saved")
+
+    def _recall_scene(self, client, command, writes):
+        # Applied on the volume writer thread, in order with the writes already queued there
+        if not self.audio_manager.recall_scene(str(command["name"])):
+            raise KeyError(f"No scene {command['name']!r}")
+
+    def _subscribe_meters(self, client, command, writes):
+        rate = float(command.get("rate", 30.0))
+        if not 0.0 < rate <= MAX_METER_RATE:
+            raise ValueError(f"Meter rate must be above 0 and at most {MAX_METER_RATE:g} Hz")
+        client.period = 1.0 / rate
+        client.next_due = self.clock()
+        self._loop.call_soon_threadsafe(self._meters_wake.set)
+        return {"rate": rate}
+
+    def _unsubscribe_meters(self, client, command, writes):
+        client.period = 0.0
+
+    def _get_loudness(self, client, command, writes):
+        readings = self.audio_manager.get_loudness()
+        if readings is None:
+            raise ValueError("Loudness is not being measured")
+        # JSON has no -Infinity; silence reads as null
+        return {name: value if math.isfinite(value) else None for name, value in readings.items()}
+
+    def _reset_loudness(self, client, command, writes):
+        if self.audio_manager.get_loudness() is None:
+            raise ValueError("Loudness is not being measured")
+        self.audio_manager.reset_loudness()
+
+    def _stats(self, client, command, writes):
+        return {
+            "sessions": len(self._sessions),
+            "clients": len(self.clients),
+            "subscribers": sum(1 for other in self.clients if other.period),
+            "frames_encoded": self.frames_encoded,
+            "frames_sent": sum(other.sent for other in self.clients),
+            "frames_dropped": sum(other.dropped for other in self.clients),
+            "max_buffered": max((other.writer.transport.get_write_buffer_size() for other in self.clients),
+                                default=0),
+        }
+
+    async def _stream_meters(self):
+        while True:
+            subscribers = [client for client in self.clients if client.period]
+            if not subscribers:
+                self._meters_wake.clear()
+                await self._meters_wake.wait()
+                continue
+            now = self.clock()
+            wait = min(client.next_due for client in subscribers) - now
+            if wait > 0:
+                await asyncio.sleep(min(wait, METER_POLL_S))
+                continue
+
+            sessions, ids = self._meter_sessions
+            peaks = await self._loop.run_in_executor(self._peaks, self._read_peaks, sessions)
+            frame = self._meter_frame(now, ids, peaks)
+            for client in subscribers:
+                if client.next_due > now + COINCIDENT_S:
+                    continue
+                client.next_due += client.period
+                if client.next_due < now:
+                    client.next_due = now + client.period  # Fell behind; skip rather than burst
+                transport = client.writer.transport
+                if transport.is_closing():
+                    continue
+                if transport.get_write_buffer_size() > METER_BUFFER_LIMIT:
+                    client.dropped += 1
+                else:
+                    transport.write(frame)
+                    client.sent += 1
+
+    def _read_peaks(self, sessions):
+        try:
+            return self.audio_manager.backend.get_session_peaks(sessions)
+        except Exception as e:
+            print(f"Control server failed to read peaks: {e}")
+            return [0.0] * len(sessions)
+
+    def _meter_frame(self, now, ids, peaks):
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        self.frames_encoded += 1
+        header = METER_HEADER.pack(self._sequence, now - self.started, len(peaks))
+        return encode_frame(KIND_METERS, header + ids + np.asarray(peaks, dtype="<f4").tobytes())
+
+
+class ControlClient:
+    """asyncio client for ControlServer.
+
+    request() sends one batched message and waits for its results; meters()
+    yields decoded meter frames. Frames the caller does not consume in time
+    are dropped oldest first, keeping only the latest meter_backlog frames.
+    """
+
+    def __init__(self, reader, writer, meter_backlog=8):
+        self.reader = reader
+        self.writer = writer
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._meters = asyncio.Queue(maxsize=meter_backlog)
+        self.meters_dropped = 0
+        self._reader_task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, **options)
+
+    async def request(self, *commands):
+        """Send commands as one message; returns their results, in order."""
+        message_id = next(self._ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = reply
+        self.writer.write(encode_json({"id": message_id, "commands": list(commands)}))
+        await self.writer.drain()
+        response = await reply
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["results"]
+
+    async def meters(self):
+        """Yield (sequence, timestamp, ids, peaks) for every meter frame received."""
+        while True:
+            frame = await self._meters.get()
+            if frame is None:
+                return
+            yield decode_meters(frame)
+
+    async def close(self):
+        self.writer.close()
+        self._reader_task.cancel()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def _read(self):
+        try:
+            while True:
+                frame = await read_frame(self.reader)
+                if frame is None:
+                    break
+                kind, payload = frame
+                if kind == KIND_METERS:
+                    if self._meters.full():
+                        self._meters.get_nowait()
+                        self.meters_dropped += 1
+                    self._meters.put_nowait(payload)
+                elif kind == KIND_JSON:
+                    response = json.loads(payload)
+                    reply = self._pending.pop(response.get("id"), None)
+                    if reply is not None and not reply.done():
+                        reply.set_result(response)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for reply in self._pending.values():
+                if not reply.done():
+                    reply.set_exception(ConnectionError("Control server closed the connection"))
+            if self._meters.full():
+                self._meters.get_nowait()
+            self._meters.put_nowait(None)
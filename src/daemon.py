@@ -0,0 +1,181 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()  # For --profile-startup
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+
+from audio_manager import AudioManager  # noqa: E402
+from backends import SESSION_CREATED, SESSION_EXPIRED, create_backend  # noqa: E402
+from eq_route import parse_route  # noqa: E402
+import instrumentation  # noqa: E402
+
+IMPORTS_DONE = time.perf_counter()
+
+SESSION_POLL_S = 2.0  # Re-enumerate at least this often; session events trigger it sooner
+
+
+def parse_rule(spec):
+    """TRIGGER:TARGET[:THRESHOLD_DB[:DEPTH_DB]] as DuckingRule arguments."""
+    parts = spec.split(":")
+    if not 2 <= len(parts) <= 4 or not all(parts[:2]):
+        raise argparse.ArgumentTypeError(f"expected TRIGGER:TARGET[:THRESHOLD_DB[:DEPTH_DB]], got {spec!r}")
+    options = {}
+    try:
+        if len(parts) > 2:
+            options["threshold_db"] = float(parts[2])
+        if len(parts) > 3:
+            options["depth_db"] = float(parts[3])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"bad number in {spec!r}: {e}")
+    return parts[0], parts[1], options
+
+
+def parse_preset(spec):
+    """APP=PRESET as (app, preset)."""
+    app, _, preset = spec.partition("=")
+    if not app or not preset:
+        raise argparse.ArgumentTypeError(f"expected APP=PRESET, got {spec!r}")
+    return app, preset
+
+
+class Daemon:
+    """AudioPilot without a window: ducking rules, presets, scenes, loudness and the control API.
+
+    Nothing here imports Qt. The session list is kept current so ducking
+    rules follow apps as they come and go: by the control server's own
+    refresh when it runs, otherwise from run(), which re-enumerates on
+    session events and every SESSION_POLL_S. Meters are streamed to
+    control API subscribers.
+    """
+
+    def __init__(self, audio_manager, control_port=None):
+        self.audio_manager = audio_manager
+        self.control_server = None
+        if control_port is not None:
+            from control_api import ControlServer
+            self.control_server = ControlServer(audio_manager, port=control_port)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.sessions = []
+
+    def start(self):
+        """Enumerate sessions and start notifications and the control server. Returns False if it failed."""
+        self.audio_manager.subscribe(self.on_session_event)
+        self.audio_manager.start_notifications()
+        self.refresh()
+        if self.control_server is not None and not self.control_server.start():
+            return False
+        return True
+
+    def refresh(self):
+        try:
+            self.sessions = self.audio_manager.get_audio_sessions()
+        except Exception as e:
+            print(f"Failed to enumerate audio sessions: {e}")
+
+    def on_session_event(self, event, key, value):
+        if event in (SESSION_CREATED, SESSION_EXPIRED):
+            self._wake.set()
+
+    def run(self):
+        """Serve until stop() is called or the process is interrupted."""
+        try:
+            while not self._stop.is_set():
+                if self.control_server is not None:
+                    self._stop.wait(SESSION_POLL_S)  # The control server keeps the sessions current
+                    continue
+                self._wake.wait(SESSION_POLL_S)
+                self._wake.clear()
+                self.refresh()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        """Stop everything and give ducked sessions their volume back."""
+        if self.control_server is not None:
+            self.control_server.stop()
+        self.audio_manager.unsubscribe(self.on_session_event)
+        self.audio_manager.stop_notifications()
+        self.audio_manager.stop_capture()
+        self.audio_manager.stop_eq_routes()
+        self.audio_manager.ducking.stop()
+        self.audio_manager.volume_writer.stop()
+
+
+def report_startup(ready, session_count):
+    def since_start(mark):
+        return f"{(mark - IMPORT_STARTED) * 1e3:8.1f} ms"
+
+    print(f"imports         {since_start(IMPORTS_DONE)}")
+    print(f"ready           {since_start(ready)} ({session_count} sessions)")
+    memory = instrumentation.peak_memory_bytes()
+    print(f"peak memory     {memory / 2 ** 20:8.1f} MB" if memory else "peak memory          n/a")
+    print(f"modules loaded  {len(sys.modules):8d}")
+    qt_modules = [name for name in sys.modules if name.split(".")[0] in ("PyQt6", "sip")]
+    print(f"qt loaded       {', '.join(sorted(qt_modules)) or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AudioPilot headless daemon")
+    parser.add_argument("--backend", choices=("pycaw", "simulated"), default="pycaw", help="audio backend")
+    parser.add_argument("--duck", type=parse_rule, action="append", default=[],
+                        metavar="TRIGGER:TARGET[:THRESHOLD_DB[:DEPTH_DB]]",
+                        help="duck the target app while the trigger app is loud; repeatable")
+    parser.add_argument("--preset", type=parse_preset, action="append", default=[], metavar="APP=PRESET",
+                        help="load an EQ preset for an app; repeatable")
+    parser.add_argument("--eq-route", type=parse_route, action="append", default=[], metavar="APP=INPUT[:OUTPUT]",
+                        help="play an input device, such as a virtual cable APP outputs to, through APP's EQ "
+                             "to an output device (the default one if omitted)")
+    parser.add_argument("--scene", help="recall a saved scene once sessions are listed")
+    parser.add_argument("--control-port", type=int, metavar="PORT",
+                        help="control API port (default 47613)")
+    parser.add_argument("--no-control", action="store_true", help="do not serve the control API")
+    parser.add_argument("--loudness", nargs="?", const="", metavar="DEVICE",
+                        help="measure the loudness of the system mix from a loopback device, "
+                             "by default the first one found; read it through the control API")
+    parser.add_argument("--data-dir", metavar="DIR",
+                        help="keep presets and scenes in DIR instead of the user data directory")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import time, time until ready and memory, then exit")
+    args = parser.parse_args()
+
+    stores = {}
+    if args.data_dir:
+        from preset_store import PresetStore
+        from scenes import SceneStore
+        stores = {"preset_store": PresetStore(os.path.join(args.data_dir, "presets.json")),
+                  "scene_store": SceneStore(os.path.join(args.data_dir, "scenes.json"))}
+    audio_manager = AudioManager(create_backend(args.backend), **stores)
+    control_port = None
+    if not args.no_control:
+        from control_api import DEFAULT_PORT
+        control_port = DEFAULT_PORT if args.control_port is None else args.control_port
+    daemon = Daemon(audio_manager, control_port=control_port)
+    if not daemon.start():
+        sys.exit(1)
+
+    if args.loudness is not None:
+        from loudness import parse_device
+        audio_manager.start_capture(parse_device(args.loudness))
+    for app, preset in args.preset:
+        audio_manager.load_preset(audio_manager.capitalize_name(app), preset)
+    for app, input_device, output_device in args.eq_route:
+        audio_manager.start_eq_route(audio_manager.capitalize_name(app), input_device, output_device)
+    if args.scene:
+        audio_manager.recall_scene(args.scene)
+    for trigger, target, options in args.duck:
+        audio_manager.add_ducking_rule(trigger, target, **options)
+
+    if args.profile_startup:
+        report_startup(time.perf_counter(), len(daemon.sessions))
+        daemon.shutdown()
+    else:
+        daemon.run()
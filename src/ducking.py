@@ -0,0 +1,283 @@
+import collections
+import math
+import os
+import threading
+import time
+
+import instrumentation
+
+
+def app_name(session):
+    """Lower-case executable name of a backend session without its extension, e.g. "discord"."""
+    return os.path.splitext(session.name)[0].lower()
+
+
+class DuckingRule:
+    """When the trigger app's peak exceeds threshold_db, lower the target app by depth_db.
+
+    trigger and target are app names as shown in the mixer ("Discord",
+    "Spotify") and match every session of that app. The gain ramps down
+    over attack seconds, stays down for hold seconds after the trigger
+    falls below the threshold, then ramps back up over release seconds.
+    """
+
+    def __init__(self, trigger, target, threshold_db=-30.0, depth_db=12.0, attack=0.05, release=0.5, hold=0.1):
+        self.trigger = trigger.lower()
+        self.target = target.lower()
+        self.threshold_db = threshold_db
+        self.threshold = 10 ** (threshold_db / 20)
+        self.depth_db = depth_db
+        self.attack = attack
+        self.release = release
+        self.hold = hold
+        self.gain_db = 0.0  # Gain this rule currently applies to its target, 0 or below
+        self.active = False
+        self.engaged_at = None  # Control tick that saw the trigger cross the threshold
+        self._last_above = None
+
+    def update(self, level, now, dt):
+        """Advance the rule by one control tick given the trigger's peak; returns True if it just engaged."""
+        engaged = False
+        if level > self.threshold:
+            self._last_above = now
+            if not self.active:
+                self.active = engaged = True
+                self.engaged_at = now
+        elif self.active and now - self._last_above >= self.hold:
+            self.active = False
+
+        # Ramp linearly in dB, so attack and release are the times to cover the full depth
+        if self.active:
+            step = self.depth_db * dt / self.attack if self.attack > 0 else self.depth_db
+            self.gain_db = max(self.gain_db - step, -self.depth_db)
+        else:
+            step = self.depth_db * dt / self.release if self.release > 0 else self.depth_db
+            self.gain_db = min(self.gain_db + step, 0.0)
+        return engaged
+
+    def __repr__(self):
+        return (f"DuckingRule({self.trigger!r} > {self.threshold_db} dBFS ducks {self.target!r} "
+                f"by {self.depth_db} dB)")
+
+
+class DuckingEngine:
+    """Applies ducking rules from a fixed-rate control loop.
+
+    Every tick reads the peaks of all trigger sessions in one batch, moves
+    each rule's gain along its attack/release ramp and issues one batched
+    volume write per target session whose volume changed. A target's
+    volume before ducking is kept as its base and restored on release;
+    volume changes made while it is ducked move the base instead (see
+    set_base_volume). Any other volume that lands on a ducked session, such
+    as a write queued before the duck began, is overwritten on the next
+    tick once on_volume_changed reports it.
+
+    Latency is recorded per engagement: from the tick that detected the
+    trigger to the end of the first write that lowered the target, and to
+    the write that reached full depth. Detection itself adds up to one
+    control period on top.
+    """
+
+    def __init__(self, backend, rate=200, clock=time.perf_counter):
+        self.backend = backend
+        self.rate = rate
+        self.clock = clock
+        self.rules = []
+        self._sessions = []
+        self._bases = {}  # Target session key -> volume before ducking
+        self._applied = {}  # Target session key -> last volume written
+        self._awaiting_write = []  # Rules engaged but not yet applied
+        self._awaiting_depth = []  # Rules applied but not yet at full depth
+        self.write_latencies = collections.deque(maxlen=1024)
+        self.depth_latencies = collections.deque(maxlen=1024)
+        self.ticks = 0
+        self.writes = 0
+        self._last_tick = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_rule(self, rule):
+        with self._lock:
+            self.rules.append(rule)
+        return rule
+
+    def remove_rule(self, rule):
+        """Remove a rule; its target is restored on the next tick."""
+        with self._lock:
+            self.rules.remove(rule)
+
+    def set_sessions(self, sessions):
+        """Replace the backend sessions the rules are matched against."""
+        with self._lock:
+            self._sessions = list(sessions)
+            keys = {session.key for session in self._sessions}
+            for key in [key for key in self._bases if key not in keys]:
+                del self._bases[key]
+                self._applied.pop(key, None)
+
+    def set_base_volume(self, session, level):
+        """Set the volume a ducked session returns to.
+
+        Returns False if the session is not ducked right now, in which case
+        the caller should write the volume itself.
+        """
+        with self._lock:
+            if session.key not in self._bases:
+                return False
+            self._bases[session.key] = level
+            self._applied.pop(session.key, None)  # Rewrite it on the next tick
+            return True
+
+    def on_volume_changed(self, key, level):
+        """Volume event for a session (level 0.0-1.0); a ducked session that moved is rewritten on the next tick."""
+        with self._lock:
+            applied = self._applied.get(key)
+            if applied is not None and not math.isclose(level, applied, abs_tol=1e-4):
+                del self._applied[key]
+
+    def base_volume(self, key):
+        """Volume a ducked session returns to (0.0-1.0), or None if it is not ducked."""
+        with self._lock:
+            return self._bases.get(key)
+
+    def step(self, now=None):
+        """Run one control tick. Tests call this directly with their own clock."""
+        now = self.clock() if now is None else now
+        dt = 0.0 if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        self.ticks += 1
+
+        with self._lock:
+            rules = list(self.rules)
+            sessions = self._sessions
+
+        by_app = collections.defaultdict(list)
+        for session in sessions:
+            by_app[app_name(session)].append(session)
+
+        triggers = list({session.key: session for rule in rules for session in by_app.get(rule.trigger, ())}.values())
+        peaks = dict(zip((session.key for session in triggers), self.backend.get_session_peaks(triggers)))
+
+        gains = {}  # Target session key -> (session, deepest gain of the rules ducking it)
+        for rule in rules:
+            level = max((peaks[session.key] for session in by_app.get(rule.trigger, ())), default=0.0)
+            if rule.update(level, now, dt):
+                self._awaiting_write.append(rule)
+            for session in by_app.get(rule.target, ()):
+                deepest = gains.get(session.key, (session, 0.0))[1]
+                gains[session.key] = (session, min(deepest, rule.gain_db))
+
+        # Read the volumes of newly ducked sessions before taking the lock, they can be slow COM calls
+        with self._lock:
+            starting = [session for key, (session, gain_db) in gains.items()
+                        if gain_db < 0.0 and key not in self._bases]
+        fresh = {session.key: self.backend.get_session_volume(session) for session in starting}
+
+        writes = []
+        with self._lock:
+            # Sessions no rule ducks any more still need their base volume back
+            by_key = {session.key: session for session in sessions}
+            for key in self._bases:
+                if key not in gains and key in by_key:
+                    gains[key] = (by_key[key], 0.0)
+
+            for key, (session, gain_db) in gains.items():
+                if key not in self._bases:
+                    if gain_db >= 0.0 or key not in fresh:
+                        continue
+                    self._bases[key] = fresh[key]
+                base = self._bases[key]
+                if gain_db >= 0.0:
+                    # Fully released, the session is the user's again
+                    writes.append((session, base))
+                    del self._bases[key]
+                    self._applied.pop(key, None)
+                    continue
+                volume = base * 10 ** (gain_db / 20)
+                applied = self._applied.get(key)
+                if applied is None or not math.isclose(volume, applied, abs_tol=1e-4):
+                    writes.append((session, volume))
+                    self._applied[key] = volume
+
+        if writes:
+            self.backend.set_session_volumes(writes)
+            self.writes += len(writes)
+        self._record_latency(rules, writes, self.clock() if writes else now)
+
+    def _record_latency(self, rules, writes, written_at):
+        written = {app_name(session) for session, _ in writes}
+        for rule in list(self._awaiting_write):
+            if not rule.active or rule not in rules:
+                self._awaiting_write.remove(rule)
+            elif rule.target in written and rule.gain_db < 0.0:
+                self.write_latencies.append(written_at - rule.engaged_at)
+                self._awaiting_write.remove(rule)
+                self._awaiting_depth.append(rule)
+        for rule in list(self._awaiting_depth):
+            if not rule.active or rule not in rules:
+                self._awaiting_depth.remove(rule)
+            elif rule.gain_db <= -rule.depth_db:
+                self.depth_latencies.append(written_at - rule.engaged_at)
+                self._awaiting_depth.remove(rule)
+
+    def start(self):
+        """Start the control loop thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ducking", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the control loop and give ducked sessions their volume back."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._lock:
+            restores = [(session, self._bases[session.key]) for session in self._sessions
+                        if session.key in self._bases]
+            self._bases.clear()
+            self._applied.clear()
+        self.backend.set_session_volumes(restores)
+
+    def _run(self):
+        self.backend.thread_init()
+        try:
+            period = 1.0 / self.rate
+            deadline = time.perf_counter()
+            while not self._stop.is_set():
+                try:
+                    with instrumentation.span("DuckingEngine.step", 1000 * period):
+                        self.step()
+                except Exception as e:
+                    print(f"Ducking tick failed: {e}")
+
+                # Same absolute-deadline scheduling as the peak sampler
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    deadline = time.perf_counter()
+        finally:
+            self.backend.thread_exit()
+
+    def stats(self):
+        """Tick and write counts and latency percentiles in seconds."""
+        def percentiles(samples):
+            samples = sorted(samples)
+            if not samples:
+                return None
+            return {
+                "p50": samples[len(samples) // 2],
+                "p95": samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+                "max": samples[-1],
+            }
+
+        return {
+            "ticks": self.ticks,
+            "writes": self.writes,
+            "write_latency": percentiles(list(self.write_latencies)),
+            "depth_latency": percentiles(list(self.depth_latencies)),
+        }
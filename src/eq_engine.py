@@ -0,0 +1,207 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Centre frequencies of the 10 bands shown in the mixer UI
+EQ_FREQUENCIES = (32, 64, 125, 250, 500, 1000, 2000, 4000, 8000, 16000)
+EQ_LABELS = ("32Hz", "64Hz", "125Hz", "250Hz", "500Hz", "1kHz", "2kHz", "4kHz", "8kHz", "16kHz")
+EQ_BANDS = len(EQ_FREQUENCIES)
+
+DEFAULT_Q = 1.41  # Roughly one octave per peaking band
+SHELF_Q = 1 / math.sqrt(2)  # Maximally flat shelves for the outer bands
+INTERPOLATION_STEPS = 8  # Sub-blocks used to glide from old to new coefficients
+
+
+def design_band(band, gain_db, q, sample_rate):
+    """Design one EQ band as a normalized second-order section [b0, b1, b2, 1, a1, a2]."""
+    freq = min(EQ_FREQUENCIES[band], 0.45 * sample_rate)  # Keep the band below Nyquist
+    a = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * freq / sample_rate
+    cos_w0 = math.cos(w0)
+
+    if band == 0 or band == EQ_BANDS - 1:
+        # Low shelf for the bottom band, high shelf for the top band
+        alpha = math.sin(w0) / (2 * SHELF_Q)
+        beta = 2 * math.sqrt(a) * alpha
+        sign = 1 if band == 0 else -1
+        b0 = a * ((a + 1) - sign * (a - 1) * cos_w0 + beta)
+        b1 = sign * 2 * a * ((a - 1) - sign * (a + 1) * cos_w0)
+        b2 = a * ((a + 1) - sign * (a - 1) * cos_w0 - beta)
+        a0 = (a + 1) + sign * (a - 1) * cos_w0 + beta
+        a1 = -sign * 2 * ((a - 1) + sign * (a + 1) * cos_w0)
+        a2 = (a + 1) + sign * (a - 1) * cos_w0 - beta
+    else:
+        alpha = math.sin(w0) / (2 * q)
+        b0 = 1 + alpha * a
+        b1 = -2 * cos_w0
+        b2 = 1 - alpha * a
+        a0 = 1 + alpha / a
+        a1 = -2 * cos_w0
+        a2 = 1 - alpha / a
+
+    return np.array([b0 / a0, b1 / a0, b2 / a0, 1.0, a1 / a0, a2 / a0])
+
+
+class CoefficientCache:
+    """LRU cache of designed band sections keyed by (band, gain, Q, sample rate).
+
+    Engines set gains from the GUI and control server threads, so the
+    entries and counters are locked; sections are designed outside the lock.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, band, gain_db, q, sample_rate):
+        """Return the section for a band setting, designing it only on a miss."""
+        key = (band, gain_db, q, sample_rate)
+        with self._lock:
+            sos = self._entries.get(key)
+            if sos is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return sos
+            self.misses += 1
+
+        sos = design_band(band, gain_db, q, sample_rate)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = sos
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return sos
+
+    def clear(self):
+        """Drop all cached sections and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return the hit/miss counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+# Shared by every engine, since sessions usually sit on the same few settings
+coefficient_cache = CoefficientCache()
+
+
+class EqualizerEngine:
+    """Streaming 10-band equalizer for interleaved float32 audio blocks."""
+
+    def __init__(self, channels=2, sample_rate=48000, q=DEFAULT_Q, cpu_budget=0.25, cache=None):
+        # scipy.signal takes longer to import than the whole mixer window takes to
+        # show, so it is only loaded once an engine is actually needed
+        from scipy.signal import sosfilt
+        self._sosfilt = sosfilt
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.q = q
+        self.cpu_budget = cpu_budget  # Fraction of each block's duration the EQ may use
+        self.cache = cache if cache is not None else coefficient_cache
+        self.gains = [0.0] * EQ_BANDS
+        self._sos = np.array([self.cache.get(band, 0.0, q, sample_rate) for band in range(EQ_BANDS)])
+        self._target_sos = self._sos.copy()
+        self._pending = False  # True while _sos is gliding towards _target_sos
+        self._zi = np.zeros((EQ_BANDS, 2, channels))
+        self._flat = True
+        self._settled = True
+        self.reset_stats()
+
+    def set_gains(self, gains):
+        """Set the gain in dB of every band."""
+        for band, gain in enumerate(gains):
+            self.set_band(band, gain)
+
+    def set_band(self, band, gain_db):
+        """Set the gain in dB of a single band."""
+        gain_db = float(gain_db)
+        if gain_db == self.gains[band]:
+            return
+        self.gains[band] = gain_db
+        self._target_sos[band] = self.cache.get(band, gain_db, self.q, self.sample_rate)
+        self._pending = True
+        self._flat = not any(self.gains)
+        self._settled = False
+
+    def reset(self):
+        """Clear the filter state, e.g. when the stream restarts."""
+        self._sos = self._target_sos.copy()
+        self._pending = False
+        self._zi.fill(0.0)
+        self._settled = True
+
+    def process(self, block):
+        """Equalize a block in place.
+
+        The block is either a (frames, channels) array or a flat interleaved
+        buffer of frames * channels samples. Filter state carries over from
+        the previous call, so consecutive blocks join without clicks. After a
+        gain change the coefficients glide to the new setting across the
+        block, which keeps slider drags free of zipper noise.
+        """
+        start = time.perf_counter()
+        frames = block.reshape(-1, self.channels)
+        if self._pending:
+            self._interpolate(frames)
+        # All bands at 0 dB with settled state is an identity, so skip the filter
+        elif not (self._flat and self._settled):
+            filtered, self._zi = self._sosfilt(self._sos, frames, axis=0, zi=self._zi)
+            frames[...] = filtered
+            if self._flat and np.abs(self._zi).max() < 1e-9:
+                self._zi.fill(0.0)
+                self._settled = True
+        self._account(len(frames), time.perf_counter() - start)
+        return block
+
+    def _interpolate(self, frames):
+        start_sos = self._sos
+        delta = self._target_sos - start_sos
+        bounds = np.linspace(0, len(frames), INTERPOLATION_STEPS + 1).astype(int)
+        for step in range(INTERPOLATION_STEPS):
+            segment = frames[bounds[step]:bounds[step + 1]]
+            if len(segment):
+                sos = start_sos + delta * ((step + 1) / INTERPOLATION_STEPS)
+                filtered, self._zi = self._sosfilt(sos, segment, axis=0, zi=self._zi)
+                segment[...] = filtered
+        self._sos = self._target_sos.copy()
+        self._pending = False
+
+    def _account(self, frame_count, elapsed):
+        budget = self.cpu_budget * frame_count / self.sample_rate
+        load = elapsed / budget if budget else 0.0
+        self.blocks += 1
+        self.busy_time += elapsed
+        self.audio_time += frame_count / self.sample_rate
+        self.last_load = load
+        self.peak_load = max(self.peak_load, load)
+        if load > 1.0:
+            self.overruns += 1
+
+    def reset_stats(self):
+        """Reset the per-block CPU accounting."""
+        self.blocks = 0
+        self.overruns = 0
+        self.busy_time = 0.0
+        self.audio_time = 0.0
+        self.last_load = 0.0
+        self.peak_load = 0.0
+
+    def stats(self):
+        """Return the CPU accounting gathered since the last reset."""
+        return {
+            "blocks": self.blocks,
+            "overruns": self.overruns,
+            "last_load": self.last_load,
+            "peak_load": self.peak_load,
+            "realtime_factor": self.audio_time / self.busy_time if self.busy_time else float("inf"),
+        }
@@ -0,0 +1,49 @@
+import argparse
+
+
+def parse_route(spec):
+    """APP=INPUT[:OUTPUT] as (app, input device, output device), devices as sounddevice indexes or names."""
+    app, _, devices = spec.partition("=")
+    input_device, _, output_device = devices.partition(":")
+    if not app or not input_device:
+        raise argparse.ArgumentTypeError(f"expected APP=INPUT[:OUTPUT], got {spec!r}")
+
+    def device(name):
+        return int(name) if name.isdigit() else name or None
+
+    return app, device(input_device), device(output_device)
+
+
+class EqRoute:
+    """Plays an input device through one session's EQ to an output device.
+
+    Windows gives no access to a single application's audio stream, so the
+    EQ can only be heard on audio routed through AudioPilot: set the app's
+    output to a virtual cable (such as VB-CABLE) in the Windows per-app
+    sound settings and route the cable's recording side here. The EQ
+    settings of the session apply live; output None is the default device.
+    """
+
+    def __init__(self, engine, input_device, output_device=None, block_size=512):
+        import sounddevice
+        self.engine = engine
+        self.underruns = 0
+        self._stream = sounddevice.Stream(
+            device=(input_device, output_device), channels=engine.channels, samplerate=engine.sample_rate,
+            blocksize=block_size, dtype="float32", callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, indata, outdata, frames, time_info, status):
+        if status:
+            self.underruns += 1
+        self.process(indata, outdata)
+
+    def process(self, indata, outdata):
+        """Equalize one block from the input into the output buffer."""
+        outdata[:] = indata
+        self.engine.process(outdata)
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
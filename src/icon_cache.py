@@ -0,0 +1,168 @@
+import ctypes
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import wintypes
+
+from PyQt6.QtGui import QImage, QPixmap
+
+from instrumentation import timed
+
+ICON_SIZE = 32  # Size the mixer displays icons at
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+def default_cache_dir():
+    """Per-user directory for rendered icons."""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "AudioPilot", "icons")
+
+
+@timed()
+def hicon_to_image(hicon, size=ICON_SIZE):
+    """Render an HICON at the given size straight into a new QImage."""
+    image = QImage(size, size, QImage.Format.Format_ARGB32)
+
+    hdc = ctypes.windll.user32.GetDC(0)
+    memdc = ctypes.windll.gdi32.CreateCompatibleDC(hdc)
+    bmp = ctypes.windll.gdi32.CreateCompatibleBitmap(hdc, size, size)
+    old_bmp = ctypes.windll.gdi32.SelectObject(memdc, bmp)
+    try:
+        ctypes.windll.user32.DrawIconEx(memdc, 0, 0, hicon, size, size, 0, 0, 3)
+
+        bmpinfo = BITMAPINFOHEADER()
+        bmpinfo.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmpinfo.biWidth = size
+        bmpinfo.biHeight = -size  # Top-down rows, matching QImage
+        bmpinfo.biPlanes = 1
+        bmpinfo.biBitCount = 32
+        bmpinfo.biCompression = 0
+
+        # GetDIBits writes the pixels directly into the QImage's own buffer
+        bits = image.bits()
+        bits.setsize(image.sizeInBytes())
+        ctypes.windll.gdi32.SelectObject(memdc, old_bmp)
+        ctypes.windll.gdi32.GetDIBits(memdc, bmp, 0, size, ctypes.c_void_p(int(bits)), ctypes.byref(bmpinfo), 0)
+    finally:
+        ctypes.windll.gdi32.DeleteObject(bmp)
+        ctypes.windll.gdi32.DeleteDC(memdc)
+        ctypes.windll.user32.ReleaseDC(0, hdc)
+
+    return image
+
+
+@timed()
+def extract_icon_image(exe_path, size=ICON_SIZE):
+    """Extract the first icon of an executable as a QImage, or None."""
+    import win32gui  # Windows only, so the cache itself loads on any platform
+
+    large, small = win32gui.ExtractIconEx(exe_path, 0)
+    try:
+        if large:
+            return hicon_to_image(large[0], size)
+    finally:
+        for hicon in large + small:
+            win32gui.DestroyIcon(hicon)
+    return None
+
+
+class IconCache:
+    """Process icons keyed by exe path and mtime, rendered at display size.
+
+    Pixmaps live in an in-memory LRU and rendered icons are written to disk,
+    so they survive restarts. Extraction runs on a worker thread: get() never
+    blocks, it returns None until the icon is ready and a later call picks
+    it up.
+    """
+
+    def __init__(self, size=ICON_SIZE, maxsize=256, cache_dir=None):
+        self.size = size
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+        self._pixmaps = OrderedDict()
+        self._ready = {}  # QImages finished by the worker, waiting for the GUI thread
+        self._pending = set()
+        self._failed = set()  # Executables without a usable icon, not retried
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="icon-cache")
+
+    @timed()
+    def get(self, exe_path):
+        """Return the icon pixmap for an executable, or None if it is not ready yet."""
+        try:
+            key = (exe_path, os.stat(exe_path).st_mtime_ns)
+        except OSError:
+            return None
+
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+        with self._lock:
+            image = self._ready.pop(key, None)
+            if image is None:
+                if key not in self._pending and key not in self._failed:
+                    self.misses += 1
+                    self._pending.add(key)
+                    self._executor.submit(self._load, key)
+                return None
+
+        # QPixmap may only be created on the GUI thread, which is the caller here
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[key] = pixmap
+        if len(self._pixmaps) > self.maxsize:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(f"{key[0]}|{key[1]}|{self.size}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    @timed()
+    def _load(self, key):
+        path = self._disk_path(key)
+        image = QImage(path) if os.path.exists(path) else None
+        if image is None or image.isNull():
+            try:
+                image = extract_icon_image(key[0], self.size)
+            except Exception as e:
+                print(f"Failed to extract icon from {key[0]}: {e}")
+                image = None
+            if image is not None:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    image.save(path, "PNG")
+                except OSError as e:
+                    print(f"Failed to write icon cache {path}: {e}")
+
+        with self._lock:
+            self._pending.discard(key)
+            if image is not None:
+                self._ready[key] = image
+            else:
+                self._failed.add(key)
+
+    def shutdown(self):
+        """Stop the extraction worker."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,272 @@
+import collections
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+BUCKETS_PER_OCTAVE = 4  # Histogram resolution, about 19% per bucket
+MIN_SECONDS = 1e-7  # Durations below this share the first bucket
+BUCKET_COUNT = 40 * BUCKETS_PER_OCTAVE  # Up to about 30 hours
+TRACE_CAPACITY = 100000  # Spans kept for the Chrome trace export
+SLOW_CALL_CAPACITY = 256
+
+_recorder = None  # The active Recorder, or None while instrumentation is off
+_deferred = []  # (function, wrapper) of functions decorated while off, bound in by enable()
+
+
+class Histogram:
+    """Latency histogram with log-spaced buckets; constant memory, approximate percentiles."""
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min = math.inf
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > MIN_SECONDS:
+            self.buckets[min(int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_OCTAVE), BUCKET_COUNT - 1)] += 1
+        else:
+            self.buckets[0] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls, capped at the max seen."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(MIN_SECONDS * 2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Recorder:
+    """Collects timed spans: a histogram per name, budget overruns and a bounded trace."""
+
+    def __init__(self, trace=True, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.histograms = collections.defaultdict(Histogram)
+        self.budgets = {}  # Name -> budget in seconds
+        self.overruns = collections.Counter()
+        self.slow_calls = collections.deque(maxlen=SLOW_CALL_CAPACITY)
+        self.trace = collections.deque(maxlen=TRACE_CAPACITY) if trace else None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def begin(self, name):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [name, self.clock(), None, 0.0]  # name, start, slowest child, its duration
+        stack.append(frame)
+        return frame
+
+    def end(self, frame, budget=None):
+        end = self.clock()
+        name, start, slowest_child, slowest_duration = frame
+        duration = end - start
+        stack = self._local.stack
+        stack.pop()
+        if stack and duration > stack[-1][3]:
+            stack[-1][2], stack[-1][3] = name, duration
+
+        with self._lock:
+            self.histograms[name].record(duration)
+            if budget is not None:
+                self.budgets[name] = budget
+                if duration > budget:
+                    self.overruns[name] += 1
+                    self.slow_calls.append((name, start - self.started, duration, slowest_child, slowest_duration))
+            if self.trace is not None:
+                self.trace.append((name, start, duration, threading.get_ident()))
+
+    def snapshot(self):
+        """Per-name latency summaries in seconds, with budget and overrun counts where set."""
+        with self._lock:
+            result = {}
+            for name, histogram in self.histograms.items():
+                summary = histogram.summary()
+                if name in self.budgets:
+                    summary["budget"] = self.budgets[name]
+                    summary["overruns"] = self.overruns[name]
+                result[name] = summary
+            return result
+
+    def slow(self):
+        """Calls that overran their budget, as dicts, oldest first."""
+        with self._lock:
+            return [
+                {"name": name, "at": at, "duration": duration, "slowest_child": child, "child_duration": child_duration}
+                for name, at, duration, child, child_duration in self.slow_calls
+            ]
+
+    def chrome_trace(self):
+        """The recorded spans in Chrome trace event format (chrome://tracing, Perfetto)."""
+        with self._lock:
+            spans = list(self.trace or ())
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {"name": name, "ph": "X", "ts": (start - self.started) * 1e6, "dur": duration * 1e6,
+                 "pid": pid, "tid": tid}
+                for name, start, duration, tid in spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+
+class _Span:
+    __slots__ = ("name", "budget", "frame")
+
+    def __init__(self, name, budget):
+        self.name = name
+        self.budget = budget
+        self.frame = None
+
+    def __enter__(self):
+        recorder = _recorder
+        if recorder is not None:
+            self.frame = (recorder, recorder.begin(self.name))
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.frame is not None:
+            recorder, frame = self.frame
+            self.frame = None
+            recorder.end(frame, self.budget)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(trace=True):
+    """Start recording, discarding anything recorded before. Returns the recorder."""
+    global _recorder
+    _recorder = Recorder(trace=trace)
+    for function, wrapper in _deferred:
+        _rebind(function, wrapper)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+    for function, wrapper in _deferred:
+        _rebind(wrapper, function)
+
+
+def _rebind(current, replacement):
+    """Replace current where it is bound under its qualified name, in its module or class."""
+    owner = sys.modules.get(current.__module__)
+    *path, attr = current.__qualname__.split(".")
+    for part in path:
+        owner = getattr(owner, part, None)
+    if owner is not None and vars(owner).get(attr) is current:
+        setattr(owner, attr, replacement)
+
+
+def recorder():
+    """The active recorder, or None when instrumentation is off."""
+    return _recorder
+
+
+def span(name, budget_ms=None):
+    """Context manager timing a block under name; costs one global lookup when disabled."""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _Span(name, budget_ms / 1000 if budget_ms is not None else None)
+
+
+def timed(name=None, budget_ms=None):
+    """Decorator timing every call of a function, optionally against a per-call budget.
+
+    The name defaults to the function's qualified name. Decorated while
+    instrumentation is off, as everything decorated at import is, the
+    function itself is returned so calls cost nothing; enable() then binds
+    the timing wrapper in its place in its module or class, and disable()
+    puts it back. Calls through references taken in between, such as
+    bound methods connected to signals, keep going to the wrapper, which
+    only checks a global and calls through while off. Functions defined
+    inside other functions cannot be rebound, so they are always wrapped.
+    """
+    def decorate(function):
+        label = name or function.__qualname__
+        budget = budget_ms / 1000 if budget_ms is not None else None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return function(*args, **kwargs)
+            frame = recorder.begin(label)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                recorder.end(frame, budget)
+
+        if _recorder is None and "<locals>" not in function.__qualname__:
+            _deferred.append((function, wrapper))
+            return function
+        return wrapper
+    return decorate
+
+
+def peak_memory_bytes():
+    """Peak resident memory of this process so far, or None where it cannot be read."""
+    if sys.platform == "win32":
+        try:
+            import psutil  # Comes with pycaw
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+
+def export_json(path):
+    """Write latency summaries and budget overruns to a JSON file."""
+    if _recorder is None:
+        return
+    with open(path, "w") as f:
+        json.dump({"calls": _recorder.snapshot(), "slow": _recorder.slow()}, f, indent=2)
+
+
+def export_chrome_trace(path):
+    """Write the recorded spans as a Chrome trace file."""
+    if _recorder is None:
+        return
+    with open(path, "w") as f:
+        json.dump(_recorder.chrome_trace(), f)
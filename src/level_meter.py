@@ -0,0 +1,147 @@
+import math
+import time
+
+from PyQt6.QtCore import QObject, QRect, Qt, QTimer
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QWidget
+
+BACKGROUND = QColor("#222")
+BORDER = QColor("#666")
+HOLD_COLOR = QColor("white")
+# (upper bound of the zone as a fraction of the meter, color)
+ZONES = ((0.7, QColor("green")), (0.9, QColor("yellow")), (1.0, QColor("red")))
+
+
+class MeterClock(QObject):
+    """A single timer that animates every level meter that is still moving.
+
+    The timer only runs while at least one meter is animating, so idle
+    meters cost nothing between level updates.
+    """
+
+    def __init__(self, interval_ms=16):
+        super().__init__()
+        self._active = set()
+        self._last_tick = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def activate(self, meter):
+        self._active.add(meter)
+        if not self._timer.isActive():
+            self._last_tick = time.perf_counter()
+            self._timer.start()
+
+    def _tick(self):
+        now = time.perf_counter()
+        dt = now - self._last_tick
+        self._last_tick = now
+        for meter in list(self._active):
+            try:
+                still_moving = meter.advance(dt)
+            except RuntimeError:
+                still_moving = False  # The widget was deleted with its channel strip
+            if not still_moving:
+                self._active.discard(meter)
+        if not self._active:
+            self._timer.stop()
+
+
+_clock = None
+
+
+def meter_clock():
+    """The animation clock shared by all meters."""
+    global _clock
+    if _clock is None:
+        _clock = MeterClock()
+    return _clock
+
+
+class LevelMeter(QWidget):
+    """Vertical peak meter painted with QPainter.
+
+    Levels are 0.0-1.0 scalars. With db_scale the bar is laid out in dB
+    between floor_db and 0 dBFS instead of linearly. Only the rows between
+    the old and new bar top, and around the hold line, are repainted.
+    """
+
+    def __init__(self, parent=None, db_scale=False, floor_db=-60.0, smoothing=0.04):
+        super().__init__(parent)
+        self.db_scale = db_scale
+        self.floor_db = floor_db
+        self.smoothing = smoothing  # Time constant in seconds of the bar animation
+        self._target = 0.0
+        self._level = 0.0
+        self._hold = 0.0
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setFixedWidth(8)
+
+    def level(self):
+        return self._target
+
+    def setLevel(self, level, hold=None):
+        """Set the new level and optionally the peak-hold position."""
+        self._target = min(max(level, 0.0), 1.0)
+        if hold is not None and hold != self._hold:
+            old_y = self._y_for(self._hold)
+            self._hold = min(max(hold, 0.0), 1.0)
+            self._update_rows(old_y, old_y)
+            new_y = self._y_for(self._hold)
+            self._update_rows(new_y, new_y)
+        if self._target != self._level:
+            meter_clock().activate(self)
+
+    def advance(self, dt):
+        """Move the bar towards its target; returns False once it has arrived."""
+        old_y = self._y_for(self._level)
+        step = 1.0 - math.exp(-dt / self.smoothing) if self.smoothing > 0 else 1.0
+        self._level += (self._target - self._level) * step
+        new_y = self._y_for(self._level)
+        if abs(new_y - self._y_for(self._target)) <= 1:
+            self._level = self._target
+            new_y = self._y_for(self._level)
+        if new_y != old_y:
+            self._update_rows(old_y, new_y)
+        return self._level != self._target
+
+    def _fraction(self, level):
+        if not self.db_scale:
+            return level
+        if level <= 0.0:
+            return 0.0
+        return min(max(1.0 - 20 * math.log10(level) / self.floor_db, 0.0), 1.0)
+
+    def _y_for(self, level):
+        inner = self.height() - 2
+        return 1 + inner - round(self._fraction(level) * inner)
+
+    def _update_rows(self, y1, y2):
+        top = min(y1, y2) - 1
+        self.update(QRect(0, top, self.width(), abs(y2 - y1) + 3))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setClipRect(event.rect())
+        width = self.width()
+        height = self.height()
+        inner = height - 2
+
+        painter.fillRect(self.rect(), BACKGROUND)
+
+        # Fill the bar zone by zone, bottom up
+        bar_top = self._y_for(self._level)
+        zone_bottom = 1 + inner
+        for upper, color in ZONES:
+            zone_top = 1 + inner - round(upper * inner)
+            top = max(zone_top, bar_top)
+            if top < zone_bottom:
+                painter.fillRect(1, top, width - 2, zone_bottom - top, color)
+            zone_bottom = zone_top
+
+        if self._hold > 0.0:
+            painter.fillRect(1, self._y_for(self._hold), width - 2, 1, HOLD_COLOR)
+
+        painter.setPen(BORDER)
+        painter.drawRect(0, 0, width - 1, height - 1)
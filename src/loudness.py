@@ -0,0 +1,310 @@
+import math
+import queue
+
+import numpy as np
+
+ABSOLUTE_GATE = -70.0  # LUFS, BS.1770 absolute gate for integrated loudness
+RELATIVE_GATE = -10.0  # LU below the abs-gated loudness
+HISTOGRAM_STEP = 0.1  # LU per bin of the gating histogram
+HISTOGRAM_TOP = 5.0  # LUFS, louder blocks share the top bin
+STEPS_PER_SECOND = 10  # Gating blocks start every 100 ms
+MOMENTARY_STEPS = 4  # 400 ms window
+SHORT_TERM_STEPS = 30  # 3 s window
+TRUE_PEAK_TAPS = 12  # Interpolation filter taps per phase
+LOOPBACK_NAMES = ("stereo mix", "loopback", "what u hear", "wave out mix", "monitor of")
+
+
+def k_weighting(sample_rate):
+    """The BS.1770 K-weighting filter at a sample rate, as two second-order sections.
+
+    The pre-filter (a high shelf modelling the head) and the RLB high-pass
+    are designed from their analog prototypes, so any rate is supported;
+    at 48 kHz the result matches the coefficients tabulated in BS.1770.
+    """
+    k = math.tan(math.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0,
+             1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    k = math.tan(math.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+    return np.array([shelf, highpass])
+
+
+def true_peak_filter(oversampling, taps=TRUE_PEAK_TAPS):
+    """Polyphase interpolation filter as a (taps, oversampling) matrix, newest sample last."""
+    n = np.arange(taps * oversampling)
+    h = np.sinc((n - (len(n) - 1) / 2) / oversampling) * np.kaiser(len(n), 8.0)
+    phases = h.reshape(taps, oversampling)  # Column p holds phase p
+    return phases / phases.sum(axis=0)  # Unity gain at DC for every phase
+
+
+def to_lufs(energy):
+    """Loudness of a channel-weighted mean square."""
+    return -0.691 + 10 * math.log10(energy) if energy > 0 else -math.inf
+
+
+class LoudnessMeter:
+    """Streaming BS.1770 loudness of one audio stream.
+
+    Feed it blocks of float audio with process(). The K-weighted power of
+    each block is folded into 100 ms steps, from which momentary (400 ms)
+    and short-term (3 s) loudness are read. Integrated loudness keeps a
+    fixed-size histogram of gating-block loudness instead of every block,
+    so memory and per-block cost stay the same however long the stream
+    runs. True-peak comes from polyphase oversampling of every block.
+    """
+
+    def __init__(self, channels=2, sample_rate=48000, channel_weights=None):
+        # Deferred like the EQ engine's, scipy.signal is slow to import
+        from scipy.signal import sosfilt
+        self._sosfilt = sosfilt
+        self.channels = channels
+        self.sample_rate = sample_rate
+        # L, R and C count fully; BS.1770 weights the surround channels by 1.41
+        self.weights = np.array(channel_weights or [1.0] * channels, dtype=np.float64)
+        self.step_size = sample_rate // STEPS_PER_SECOND
+
+        self._sos = k_weighting(sample_rate)
+        self.oversampling = 4 if sample_rate < 96000 else 2 if sample_rate < 192000 else 1
+        self._interpolator = true_peak_filter(self.oversampling)
+        self._histogram_size = int(round((HISTOGRAM_TOP - ABSOLUTE_GATE) / HISTOGRAM_STEP)) + 1
+        self.reset()
+
+    def reset(self):
+        """Forget everything measured so far."""
+        self._zi = np.zeros((len(self._sos), 2, self.channels))
+        self._tail = np.zeros((TRUE_PEAK_TAPS - 1, self.channels))
+        self._steps = np.zeros(SHORT_TERM_STEPS)  # Mean K-weighted power of the last completed steps
+        self._raw_steps = np.zeros(SHORT_TERM_STEPS)  # Same, unweighted, for RMS
+        self._step_count = 0
+        self._partial = 0.0
+        self._raw_partial = 0.0
+        self._fill = 0
+        self._hist_count = np.zeros(self._histogram_size, dtype=np.int64)
+        self._hist_energy = np.zeros(self._histogram_size)
+        self._true_peak = 0.0
+        self._sample_peak = 0.0
+        self.frames = 0
+
+    def process(self, block):
+        """Measure a block, either (frames, channels) or interleaved. The block is not modified."""
+        frames = np.asarray(block, dtype=np.float64).reshape(-1, self.channels)
+        if not len(frames):
+            return
+        self.frames += len(frames)
+        self._measure_peaks(frames)
+
+        weighted, self._zi = self._sosfilt(self._sos, frames, axis=0, zi=self._zi)
+        power = np.square(weighted) @ self.weights
+        raw_power = np.square(frames).mean(axis=1)
+        self._accumulate(power, raw_power)
+
+    def _measure_peaks(self, frames):
+        self._sample_peak = max(self._sample_peak, float(np.abs(frames).max()))
+        if self.oversampling == 1:
+            self._true_peak = max(self._true_peak, self._sample_peak)
+            return
+        extended = np.concatenate((self._tail, frames))
+        self._tail = extended[-(TRUE_PEAK_TAPS - 1):]
+        windows = np.lib.stride_tricks.sliding_window_view(extended, TRUE_PEAK_TAPS, axis=0)
+        # One contiguous (frames * channels, taps) matrix makes this a single BLAS product
+        interpolated = np.ascontiguousarray(windows).reshape(-1, TRUE_PEAK_TAPS) @ self._interpolator
+        self._true_peak = max(self._true_peak, float(np.abs(interpolated).max()))
+
+    def _accumulate(self, power, raw_power):
+        # Top up the step in progress, then fold whole steps at once
+        need = self.step_size - self._fill
+        if len(power) < need:
+            self._partial += power.sum()
+            self._raw_partial += raw_power.sum()
+            self._fill += len(power)
+            return
+
+        whole = (len(power) - need) // self.step_size
+        end = need + whole * self.step_size
+        sums = np.empty(whole + 1)
+        raw_sums = np.empty(whole + 1)
+        sums[0] = self._partial + power[:need].sum()
+        raw_sums[0] = self._raw_partial + raw_power[:need].sum()
+        sums[1:] = power[need:end].reshape(whole, self.step_size).sum(axis=1)
+        raw_sums[1:] = raw_power[need:end].reshape(whole, self.step_size).sum(axis=1)
+        self._partial = power[end:].sum()
+        self._raw_partial = raw_power[end:].sum()
+        self._fill = len(power) - end
+
+        for energy, raw_energy in zip(sums / self.step_size, raw_sums / self.step_size):
+            self._push_step(energy, raw_energy)
+
+    def _push_step(self, energy, raw_energy):
+        slot = self._step_count % SHORT_TERM_STEPS
+        self._steps[slot] = energy
+        self._raw_steps[slot] = raw_energy
+        self._step_count += 1
+        if self._step_count >= MOMENTARY_STEPS:
+            # Every completed step closes a 400 ms gating block overlapping the last by 75%
+            block_energy = self._window_mean(self._steps, MOMENTARY_STEPS)
+            loudness = to_lufs(block_energy)
+            if loudness > ABSOLUTE_GATE:
+                index = min(int((loudness - ABSOLUTE_GATE) / HISTOGRAM_STEP), self._histogram_size - 1)
+                self._hist_count[index] += 1
+                self._hist_energy[index] += block_energy
+
+    def _window_mean(self, steps, length):
+        length = min(length, self._step_count)
+        if not length:
+            return 0.0
+        end = self._step_count % SHORT_TERM_STEPS
+        return float(np.take(steps, range(end - length, end), mode="wrap").mean())
+
+    def momentary(self):
+        """Momentary loudness in LUFS, over the last 400 ms."""
+        if self._step_count < MOMENTARY_STEPS:
+            return -math.inf
+        return to_lufs(self._window_mean(self._steps, MOMENTARY_STEPS))
+
+    def short_term(self):
+        """Short-term loudness in LUFS, over the last 3 s (or all of it, if shorter)."""
+        return to_lufs(self._window_mean(self._steps, SHORT_TERM_STEPS))
+
+    def integrated(self):
+        """Gated integrated loudness in LUFS since the last reset."""
+        count = self._hist_count.sum()
+        if not count:
+            return -math.inf
+        threshold = to_lufs(self._hist_energy.sum() / count) + RELATIVE_GATE
+        # A bin counts if its loudness range lies above the relative gate
+        first = max(int(math.ceil((threshold - ABSOLUTE_GATE) / HISTOGRAM_STEP)), 0)
+        count = self._hist_count[first:].sum()
+        return to_lufs(self._hist_energy[first:].sum() / count) if count else -math.inf
+
+    def rms(self):
+        """Unweighted RMS in dBFS over the last 400 ms, averaged over channels."""
+        energy = self._window_mean(self._raw_steps, MOMENTARY_STEPS)
+        return 10 * math.log10(energy) if energy > 0 else -math.inf
+
+    def true_peak(self):
+        """Highest oversampled peak since the last reset, in dBTP."""
+        return 20 * math.log10(self._true_peak) if self._true_peak > 0 else -math.inf
+
+    def sample_peak(self):
+        """Highest sample peak since the last reset, in dBFS."""
+        return 20 * math.log10(self._sample_peak) if self._sample_peak > 0 else -math.inf
+
+    def readings(self):
+        """All current readings, keyed by name."""
+        return {
+            "momentary": self.momentary(),
+            "short_term": self.short_term(),
+            "integrated": self.integrated(),
+            "rms": self.rms(),
+            "true_peak": self.true_peak(),
+            "sample_peak": self.sample_peak(),
+        }
+
+    def feed(self, source):
+        """Measure every block a source yields, until it is exhausted or closed."""
+        for block in source:
+            self.process(block)
+
+
+class SyntheticSource:
+    """Blocks of test tones, for measuring without an audio device.
+
+    segments is a list of (level in dBFS, seconds) or (level, seconds,
+    frequency) tuples played back to back on every channel; the level is
+    the sine's peak, as in EBU Tech 3341.
+    """
+
+    def __init__(self, segments, channels=2, sample_rate=48000, block_size=1024, frequency=1000.0):
+        self.segments = segments
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.frequency = frequency
+
+    def signal(self):
+        """The whole signal as one (frames, channels) float32 array."""
+        parts = []
+        start = 0
+        for segment in self.segments:
+            level, seconds = segment[:2]
+            frequency = segment[2] if len(segment) > 2 else self.frequency
+            n = np.arange(start, start + int(round(seconds * self.sample_rate)))
+            parts.append(10 ** (level / 20) * np.sin(2 * np.pi * frequency * n / self.sample_rate))
+            start = n[-1] + 1 if len(n) else start
+        mono = np.concatenate(parts).astype(np.float32)
+        return np.repeat(mono[:, None], self.channels, axis=1)
+
+    def __iter__(self):
+        signal = self.signal()
+        for start in range(0, len(signal), self.block_size):
+            yield signal[start:start + self.block_size]
+
+
+def parse_device(spec):
+    """A --loudness argument as a sounddevice index or name; empty for the first loopback device."""
+    return int(spec) if spec.isdigit() else spec or None
+
+
+def find_loopback_device():
+    """Index of the first input device that records the system output, or None."""
+    import sounddevice
+    for index, device in enumerate(sounddevice.query_devices()):
+        name = device["name"].lower()
+        if device["max_input_channels"] > 0 and any(loopback in name for loopback in LOOPBACK_NAMES):
+            return index
+    return None
+
+
+class CaptureSource:
+    """Blocks recorded from an input device, such as a WASAPI loopback device.
+
+    Windows does not expose a single application's output stream, so to
+    meter what is playing point this at a loopback or "Stereo Mix" device.
+    Blocks are queued by the audio callback and yielded to the caller's
+    thread; iteration ends after close(). sample_rate None takes the
+    device's own rate, which shared-mode devices insist on.
+    """
+
+    def __init__(self, device=None, channels=2, sample_rate=48000, block_size=1024, max_queued=64):
+        import sounddevice
+        if sample_rate is None:
+            sample_rate = int(sounddevice.query_devices(device, "input")["default_samplerate"])
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._stream = sounddevice.InputStream(
+            device=device, channels=channels, samplerate=sample_rate, blocksize=block_size,
+            dtype="float32", callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, data, frames, time_info, status):
+        try:
+            self._queue.put_nowait(data.copy())
+        except queue.Full:
+            self.dropped += 1  # The consumer fell behind; drop rather than block the audio thread
+
+    def __iter__(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            yield block
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            self._queue.get_nowait()
+            self._queue.put_nowait(None)
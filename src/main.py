@@ -1,13 +1,59 @@
-from PyQt6.QtWidgets import (
+import time
+
+IMPORT_STARTED = time.perf_counter()  # For --profile-startup
+
+import argparse  # noqa: E402
+import math  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+
+from PyQt6.QtWidgets import (  # noqa: E402
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
-    QWidget, QSlider, QLabel, QPushButton, QFrame, QProgressBar, QInputDialog, QMessageBox
+    QWidget, QSlider, QLabel, QPushButton, QFrame, QInputDialog, QMessageBox
 )
-from PyQt6.QtGui import QIcon, QPixmap
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation
-from audio_manager import AudioManager
+from PyQt6.QtGui import QIcon, QKeySequence, QPixmap, QShortcut  # noqa: E402
+from PyQt6.QtCore import Qt, QEvent, QObject, QTimer, pyqtSignal  # noqa: E402
+from audio_manager import AudioManager  # noqa: E402
+from backends import MUTE_CHANGED, SESSION_CREATED, SESSION_EXPIRED, VOLUME_CHANGED, create_backend  # noqa: E402
+from channel_area import STRIP_WIDTH, ChannelArea  # noqa: E402
+from eq_engine import EQ_LABELS  # noqa: E402
+from eq_route import parse_route  # noqa: E402
+import instrumentation  # noqa: E402
+from icon_cache import ICON_SIZE, IconCache  # noqa: E402
+from level_meter import LevelMeter  # noqa: E402
+from peak_sampler import PeakSampler  # noqa: E402
+from session_index import SessionIndex  # noqa: E402
+from spectrum import OCTAVE, THIRD_OCTAVE  # noqa: E402
+from spectrum_view import SpectrumView  # noqa: E402
+from timing_overlay import TimingOverlay  # noqa: E402
+
+IMPORTS_DONE = time.perf_counter()
+
+POLL_INTERVAL_MS = 1000  # Session poll when the backend cannot push events
+FALLBACK_POLL_INTERVAL_MS = 15000  # Safety reconcile alongside push notifications
+PEAK_SAMPLE_RATE = 100  # Hz, meters are sampled off the GUI thread
+METER_REFRESH_MS = 33  # The GUI repaints meters from the latest sampled frame
+SPECTRUM_REFRESH_MS = 16  # 60 fps while an EQ panel is open
+LOUDNESS_REFRESH_MS = 250  # Loudness readings move on 100 ms gating steps
+VOLUME_ECHO_MS = 500  # Volume events this soon after a slider write are taken for echoes of it
+ICON_RETRY_MS = 250
+ICON_MAX_RETRIES = 40  # Stop waiting for icons that cannot be extracted
+PROFILE_TIMEOUT_MS = 30000
+DEFERRED_MODULES = ("scipy.signal", "sounddevice", "win32gui")  # Must not load before the window shows
+
+
+class SessionEventBridge(QObject):
+    """Carries AudioManager session events from backend threads to the GUI thread."""
+    session_event = pyqtSignal(str, object, object)
+    sessions_listed = pyqtSignal(object)  # Result of a background enumeration
+    scene_recalled = pyqtSignal(object)  # What a scene recall on the writer thread changed
+
 
 class AudioPilot(QMainWindow):
-    def __init__(self):
+    sessions_populated = pyqtSignal(int)  # Emitted with the session count after each enumeration
+
+    def __init__(self, audio_manager=None, icon_cache=None):
         super().__init__()
         self.setWindowTitle("AudioPilot - Mixer")
         self.setGeometry(100, 100, 800, 600)
@@ -16,9 +62,17 @@ class AudioPilot(QMainWindow):
         self.setWindowIcon(QIcon('src/assets/audiopilot.ico'))
 
         # Initialize the audio manager and sessions
-        self.audio_manager = AudioManager()
-        self.audio_sessions = self.audio_manager.get_audio_sessions()
-        self.hidden_channels = []  # Tracks hidden channels
+        self.audio_manager = audio_manager or AudioManager()
+        self.session_index = SessionIndex()  # Filled in by a background enumeration once the window is up
+        self.enumerating = False
+        self.enumerate_again = False
+        self.hidden_channels = set()  # Keys of hidden channels
+        self.requested_volumes = {}  # Session key -> (last volume the slider asked for, when)
+        self.icon_cache = icon_cache or IconCache()  # Icons are QPixmaps, so they are kept here rather than in the Qt-free core
+        self.icon_retry_scheduled = False
+        self.eq_session = None  # Session whose EQ panel is open
+        self.eq_panel = None
+        self.peak_sampler = PeakSampler(self.audio_manager.backend, rate=PEAK_SAMPLE_RATE)
 
         # Main layout
         self.main_layout = QVBoxLayout()
@@ -46,6 +100,13 @@ class AudioPilot(QMainWindow):
         master_layout.addWidget(self.master_slider, alignment=Qt.AlignmentFlag.AlignCenter)
         master_layout.addWidget(self.master_value_label, alignment=Qt.AlignmentFlag.AlignCenter)
 
+        # Loudness of the system mix, shown once the loopback capture runs
+        self.loudness_label = QLabel(self)
+        self.loudness_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.loudness_label.setStyleSheet("color: white; font-size: 12px;")
+        self.loudness_label.hide()
+        master_layout.addWidget(self.loudness_label, alignment=Qt.AlignmentFlag.AlignCenter)
+
         self.main_layout.addLayout(master_layout)
 
         # Divider
@@ -61,17 +122,31 @@ class AudioPilot(QMainWindow):
         self.app_title.setStyleSheet("font-size: 16px; color: white; margin-top: 5px;")
         self.main_layout.addWidget(self.app_title)
 
-        # Reset button
+        # Scene and reset buttons
+        buttons_layout = QHBoxLayout()
+        save_scene_button = QPushButton("Save Scene", self)
+        save_scene_button.setStyleSheet("font-size: 12px; padding: 7px;")
+        save_scene_button.clicked.connect(self.save_scene)
+        buttons_layout.addWidget(save_scene_button)
+        recall_scene_button = QPushButton("Recall Scene", self)
+        recall_scene_button.setStyleSheet("font-size: 12px; padding: 7px;")
+        recall_scene_button.clicked.connect(self.recall_scene)
+        buttons_layout.addWidget(recall_scene_button)
+        buttons_layout.addStretch()
         reset_button = QPushButton("Show All Channels", self)
         reset_button.setStyleSheet("font-size: 12px; padding: 7px;")
         reset_button.clicked.connect(self.reset_hidden_channels)
-        self.main_layout.addWidget(reset_button, alignment=Qt.AlignmentFlag.AlignRight)
+        buttons_layout.addWidget(reset_button)
+        self.main_layout.addLayout(buttons_layout)
 
-        # Layout for sliders
-        self.sliders_layout = QHBoxLayout()
+        # Channel strips, realized only while they are scrolled into view
+        self.channel_area = ChannelArea(self.create_vertical_slider, self.release_channel, self)
+        self.main_layout.addWidget(self.channel_area)
         self.update_sliders()
 
-        self.main_layout.addLayout(self.sliders_layout)
+        # EQ panel of the selected channel, built on demand
+        self.eq_layout = QVBoxLayout()
+        self.main_layout.addLayout(self.eq_layout)
 
         # Footer
         footer = QLabel("AudioPilot v1.0.2 by GitHixy", self)
@@ -84,44 +159,150 @@ class AudioPilot(QMainWindow):
         central_widget.setLayout(self.main_layout)
         self.setCentralWidget(central_widget)
 
-        # Timer to dynamically check for new or closed sessions
+        # Session changes are pushed by the backend; queue them onto the GUI thread
+        self.session_events = SessionEventBridge()
+        self.session_events.session_event.connect(self.on_session_event, Qt.ConnectionType.QueuedConnection)
+        self.session_events.sessions_listed.connect(self.on_sessions_listed, Qt.ConnectionType.QueuedConnection)
+        self.session_events.scene_recalled.connect(self.on_scene_recalled, Qt.ConnectionType.QueuedConnection)
+        self.audio_manager.subscribe(self.session_events.session_event.emit)
+        push_notifications = self.audio_manager.start_notifications()
+
+        # Timer to reconcile sessions, only a slow safety net when events are pushed
         self.timer = QTimer()
         self.timer.timeout.connect(self.check_new_sessions)
-        self.timer.timeout.connect(self.update_level_bars)
-        self.timer.start(1000)
-
+        self.timer.start(FALLBACK_POLL_INTERVAL_MS if push_notifications else POLL_INTERVAL_MS)
+
+        # Timer to repaint the level meters from the sampler
+        self.peak_sampler.start()
+        self.meter_timer = QTimer()
+        self.meter_timer.timeout.connect(self.update_level_bars)
+        self.meter_timer.start(METER_REFRESH_MS)
+
+        self.loudness_timer = QTimer()
+        self.loudness_timer.timeout.connect(self.update_loudness)
+
+        # Timer to redraw the spectrum of the open EQ panel
+        self.spectrum_timer = QTimer()
+        self.spectrum_timer.timeout.connect(self.update_spectrum)
+
+        # Timing overlay, toggled with F12 while instrumentation is on
+        self.timing_overlay = TimingOverlay(central_widget)
+        self.timing_overlay.hide()
+        QShortcut(QKeySequence("F12"), self, activated=self.toggle_timing_overlay)
+
+        # Channel strips fill in as soon as the first enumeration comes back
+        self.check_new_sessions()
+
+    def toggle_timing_overlay(self):
+        self.timing_overlay.setVisible(not self.timing_overlay.isVisible())
+
+    def closeEvent(self, event):
+        self.audio_manager.stop_notifications()
+        self.audio_manager.stop_capture()
+        self.audio_manager.stop_eq_routes()
+        self.peak_sampler.stop()
+        self.audio_manager.volume_writer.stop()
+        self.audio_manager.ducking.stop()
+        self.icon_cache.shutdown()
+        super().closeEvent(event)
+
+    @instrumentation.timed()
+    def on_session_event(self, event, key, value):
+        """Apply a pushed session event to the mixer."""
+        if event == SESSION_CREATED:
+            if key not in self.session_index:
+                self.check_new_sessions()
+        elif event == SESSION_EXPIRED:
+            session = self.session_index.remove(key)
+            self.requested_volumes.pop(key, None)
+            if session:
+                self.forget_channel(session)
+                self.update_sliders()
+        elif event == VOLUME_CHANGED:
+            if self.is_volume_echo(key, value):
+                return
+            session = self.session_index.get(key)
+            if session:
+                session["volume"] = value  # Strips scrolled back into view are built from this
+            # Skip while the user drags, or queued writes would yank the slider back
+            if session and "volume_slider" in session and not session["volume_slider"].isSliderDown():
+                volume = int(round(value))
+                session["volume_slider"].blockSignals(True)  # Don't write the volume straight back
+                session["volume_slider"].setValue(volume)
+                session["volume_slider"].blockSignals(False)
+                session["volume_label"].setText(f"{volume}%")
+        elif event == MUTE_CHANGED:
+            session = self.session_index.get(key)
+            if session and "mute_button" in session:
+                session["mute_button"].setChecked(value)
+
+    def is_volume_echo(self, key, value):
+        """Whether a volume event is the backend reporting back one of our own queued writes.
+
+        Writes are coalesced, so the echoes of earlier slider positions can
+        arrive after the slider has moved on; they are ignored until the
+        echo of the last requested volume comes in, or for VOLUME_ECHO_MS
+        if it never does. Later events are changes made elsewhere.
+        """
+        requested = self.requested_volumes.get(key)
+        if requested is None:
+            return False
+        volume, requested_at = requested
+        if time.perf_counter() - requested_at > VOLUME_ECHO_MS / 1000:
+            del self.requested_volumes[key]
+            return False
+        if int(round(value)) == volume:
+            del self.requested_volumes[key]  # Our last write landed; the slider already shows it
+        return True
+
+    @instrumentation.timed()
     def update_sliders(self):
-        """Update the slider layout to reflect current sessions."""
-        for i in reversed(range(self.sliders_layout.count())):
-            widget = self.sliders_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        visible_sessions = [session for session in self.audio_sessions if session["name"] not in self.hidden_channels]
-        for session in visible_sessions:
-            slider_widget = self.create_vertical_slider(session)
-            self.sliders_layout.addWidget(slider_widget)
-
-        if visible_sessions:
+        """Hand the visible sessions to the channel area, which realizes the strips in view."""
+        self.channel_area.set_sessions(
+            [session for session in self.session_index.values() if session["key"] not in self.hidden_channels]
+        )
+        self.update_app_title()
+        self.refresh_pending_icons()
+
+    def release_channel(self, session):
+        """Drop references to a strip that the channel area is about to delete."""
+        self.peak_sampler.remove_session(session["key"])
+        for widget_key in ("widget", "icon_label", "volume_slider", "volume_label", "level_bar",
+                           "mute_button", "eq_button"):
+            session.pop(widget_key, None)
+
+    def forget_channel(self, session):
+        """Clean up after a session that went away."""
+        self.hidden_channels.discard(session["key"])
+        if self.eq_session is session:
+            self.close_eq()
+
+    def update_app_title(self):
+        if self.channel_area.sessions():
             self.app_title.show()
         else:
             self.app_title.hide()
 
+    @instrumentation.timed()
     def create_vertical_slider(self, session):
         """Create a vertical slider with associated controls."""
         layout = QVBoxLayout()
 
-        if session["icon"]:
-            icon_label = QLabel(self)
-            pixmap = session["icon"]
-            if isinstance(pixmap, QPixmap):
-                icon_label.setPixmap(pixmap.scaled(32, 32, Qt.AspectRatioMode.KeepAspectRatio))
-            else:
-                icon_label.setText("No Icon")
-            icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(icon_label, alignment=Qt.AlignmentFlag.AlignHCenter)
-
-        label = QLabel(session["name"], self)
+        # Icons arrive lazily from the icon cache, already at display size
+        icon_label = QLabel(self)
+        icon_label.setFixedSize(ICON_SIZE, ICON_SIZE)
+        if session.get("icon") is None:
+            session["icon"] = self.get_process_icon(session["session"])  # Starts the extraction on a miss
+        if isinstance(session.get("icon"), QPixmap):
+            icon_label.setPixmap(session["icon"])
+        elif session["session"].exe_path:
+            self.schedule_icon_retry(0)
+        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        session["icon_label"] = icon_label
+        layout.addWidget(icon_label, alignment=Qt.AlignmentFlag.AlignHCenter)
+
+        label = QLabel(self)
+        label.setText(label.fontMetrics().elidedText(session["name"], Qt.TextElideMode.ElideRight, STRIP_WIDTH - 10))
         label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(label, alignment=Qt.AlignmentFlag.AlignHCenter)
 
@@ -130,12 +311,13 @@ class AudioPilot(QMainWindow):
         slider = QSlider(Qt.Orientation.Vertical, self)
         slider.setMinimum(0)
         slider.setMaximum(100)
-        slider.setValue(int(session["volume"]))
+        slider.setValue(int(round(session["volume"])))  # Kept current by slider moves and volume events
         slider.setFixedHeight(150)  # Set a fixed height for alignment
         slider.valueChanged.connect(lambda value, s=session: self.slider_value_changed(value, s))
+        session["volume_slider"] = slider
         slider_and_bar_layout.addWidget(slider)
 
-        session["volume_label"] = QLabel(f"{session['volume']}%", self)
+        session["volume_label"] = QLabel(f"{slider.value()}%", self)
         session["volume_label"].setAlignment(Qt.AlignmentFlag.AlignCenter)
         session["volume_label"].setStyleSheet("color: white; font-size: 12px;")
         layout.addWidget(session["volume_label"], alignment=Qt.AlignmentFlag.AlignHCenter)
@@ -148,28 +330,97 @@ class AudioPilot(QMainWindow):
 
         mute_button = QPushButton("Mute", self)
         mute_button.setCheckable(True)
-        mute_button.clicked.connect(lambda _, s=session["session"], b=mute_button, sl=slider: self.mute_channel(s, b, sl))
+        mute_button.setChecked(self.audio_manager.get_session_mute(session["session"]))
+        mute_button.clicked.connect(lambda checked, s=session["session"]: self.mute_channel(s, checked))
+        session["mute_button"] = mute_button
         layout.addWidget(mute_button, alignment=Qt.AlignmentFlag.AlignHCenter)
 
         hide_button = QPushButton("Hide Channel", self)
-        hide_button.clicked.connect(lambda _, name=session["name"]: self.hide_channel(name))
+        hide_button.clicked.connect(lambda _, key=session["key"]: self.hide_channel(key))
         layout.addWidget(hide_button, alignment=Qt.AlignmentFlag.AlignHCenter)
 
+        eq_button = QPushButton("EQ", self)
+        eq_button.setCheckable(True)
+        eq_button.setChecked(self.eq_session is session)
+        eq_button.clicked.connect(lambda checked, s=session: self.toggle_eq(s, checked))
+        session["eq_button"] = eq_button
+        layout.addWidget(eq_button, alignment=Qt.AlignmentFlag.AlignHCenter)
+
+        slider_widget = QWidget()
+        slider_widget.setLayout(layout)
+        session["widget"] = slider_widget  # Store reference to widget for safe deletion
+        self.peak_sampler.add_session(session["session"])
+        return slider_widget
+
+    def toggle_eq(self, session, checked):
+        """Open the EQ panel for a channel, or close it if it is already open."""
+        self.close_eq()
+        if checked:
+            self.audio_manager.preload_eq()
+            self.eq_panel = self.create_eq_panel(session)
+            self.eq_layout.addWidget(self.eq_panel)
+            self.eq_session = session
+            if "spectrum_view" in session:
+                self.spectrum_timer.start(SPECTRUM_REFRESH_MS)
+
+    def close_eq(self):
+        self.spectrum_timer.stop()
+        if self.eq_panel is not None:
+            self.eq_layout.removeWidget(self.eq_panel)
+            self.eq_panel.deleteLater()
+            self.eq_panel = None
+        if self.eq_session is not None:
+            if "eq_button" in self.eq_session:
+                self.eq_session["eq_button"].setChecked(False)
+            self.eq_session.pop("eq_sliders", None)
+            self.eq_session.pop("spectrum_view", None)
+            self.eq_session = None
+
+    def create_eq_panel(self, session):
+        """Create the EQ sliders and preset buttons for one session."""
+        layout = QVBoxLayout()
+
+        title = QLabel(f"EQ - {session['name']}", self)
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setStyleSheet("color: white; font-size: 12px;")
+        layout.addWidget(title)
+
+        # Windows offers no hook into an app's own stream, so say so unless its audio is routed through the EQ
+        if not self.audio_manager.is_eq_applied(session["name"]):
+            eq_note = QLabel("EQ not applied: Windows does not let AudioPilot filter an app's audio. "
+                             "Route it through the EQ with --eq-route to hear it.", self)
+            eq_note.setWordWrap(True)
+            eq_note.setStyleSheet("color: gray; font-size: 10px;")
+            layout.addWidget(eq_note)
+
+        # Spectrum of the system mix, only when the loopback capture feeds one
+        analyzer = self.audio_manager.spectrum_analyzer
+        if analyzer is not None:
+            spectrum_view = SpectrumView(self, floor_db=analyzer.floor_db)
+            spectrum_view.setBands(analyzer.frequencies)
+            session["spectrum_view"] = spectrum_view
+            layout.addWidget(spectrum_view)
+
+            third_octave_button = QPushButton("1/3 Octave", self)
+            third_octave_button.setCheckable(True)
+            third_octave_button.setChecked(analyzer.resolution == THIRD_OCTAVE)
+            third_octave_button.clicked.connect(lambda checked, s=session: self.set_spectrum_resolution(s, checked))
+            layout.addWidget(third_octave_button, alignment=Qt.AlignmentFlag.AlignRight)
+
         # Add EQ sliders
         eq_layout = QHBoxLayout()
-        frequencies = ["32Hz", "64Hz", "125Hz", "250Hz", "500Hz", "1kHz", "2kHz", "4kHz", "8kHz", "16kHz"]
         session["eq_sliders"] = []
         for band in range(10):
             eq_slider_layout = QVBoxLayout()
             eq_slider = QSlider(Qt.Orientation.Vertical, self)
             eq_slider.setMinimum(-10)
             eq_slider.setMaximum(10)
-            eq_slider.setValue(self.audio_manager.get_eq(session["name"])[band])
+            eq_slider.setValue(round(self.audio_manager.get_eq(session["name"])[band]))
             eq_slider.setFixedHeight(100)  # Set a fixed height for alignment
             eq_slider.valueChanged.connect(lambda value, s=session, b=band: self.eq_slider_changed(value, s, b))
             eq_slider_layout.addWidget(eq_slider)
 
-            freq_label = QLabel(frequencies[band], self)
+            freq_label = QLabel(EQ_LABELS[band], self)
             freq_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             freq_label.setStyleSheet("color: white; font-size: 10px;")
             eq_slider_layout.addWidget(freq_label)
@@ -189,10 +440,22 @@ class AudioPilot(QMainWindow):
         preset_layout.addWidget(load_preset_button)
         layout.addLayout(preset_layout)
 
-        slider_widget = QWidget()
-        slider_widget.setLayout(layout)
-        session["widget"] = slider_widget  # Store reference to widget for safe deletion
-        return slider_widget
+        panel = QWidget()
+        panel.setLayout(layout)
+        return panel
+
+    def set_spectrum_resolution(self, session, third_octave):
+        self.audio_manager.set_spectrum_resolution(THIRD_OCTAVE if third_octave else OCTAVE)
+        session["spectrum_view"].setBands(self.audio_manager.spectrum_analyzer.frequencies)
+
+    @instrumentation.timed(budget_ms=SPECTRUM_REFRESH_MS)
+    def update_spectrum(self):
+        """Redraw the spectrum of the system mix in the open EQ panel."""
+        if self.eq_session is None or "spectrum_view" not in self.eq_session:
+            return
+        levels = self.audio_manager.get_spectrum(SPECTRUM_REFRESH_MS / 1000)
+        if levels is not None:
+            self.eq_session["spectrum_view"].setLevels(levels)
 
     def eq_slider_changed(self, value, session, band):
         self.audio_manager.set_eq(session["name"], band, value)
@@ -215,123 +478,286 @@ class AudioPilot(QMainWindow):
             self.update_eq_sliders(session)  # Refresh sliders to reflect loaded preset
             self.audio_manager.apply_eq(session["name"])
 
+    def save_scene(self):
+        scene_name, ok = QInputDialog.getText(self, "Save Scene", "Enter scene name:")
+        if ok and scene_name:
+            self.audio_manager.save_scene(scene_name)
+
+    def recall_scene(self):
+        scenes = self.audio_manager.list_scenes()
+        if not scenes:
+            QMessageBox.information(self, "Recall Scene", "No scenes saved.")
+            return
+
+        scene_name, ok = QInputDialog.getItem(self, "Recall Scene", "Select scene:", scenes, 0, False)
+        if ok and scene_name:
+            # Applied on the writer thread; the sliders follow once it is done
+            self.audio_manager.recall_scene(scene_name, done=self.session_events.scene_recalled.emit)
+
+    def on_scene_recalled(self, result):
+        """Move the controls to what a scene recall changed."""
+        for key, volume in result["volumes"].items():
+            self.requested_volumes.pop(key, None)  # The scene overrides what the slider last asked for
+            self.on_session_event(VOLUME_CHANGED, key, volume)
+        for key, muted in result["mutes"].items():
+            self.on_session_event(MUTE_CHANGED, key, muted)
+        if result["master"] is not None:
+            master_value = int(round(result["master"]))
+            self.master_slider.blockSignals(True)
+            self.master_slider.setValue(master_value)
+            self.master_slider.blockSignals(False)
+            self.master_value_label.setText(f"{master_value}%")
+        if self.eq_session is not None and self.eq_session["name"] in result["eq"]:
+            self.update_eq_sliders(self.eq_session)
+
     def update_eq_sliders(self, session):
         eq_values = self.audio_manager.get_eq(session["name"])
         for i, eq_slider in enumerate(session["eq_sliders"]):
-            eq_slider.setValue(eq_values[i])
+            # Sliders move in whole dB; don't let them round off fractional preset gains
+            eq_slider.blockSignals(True)
+            eq_slider.setValue(round(eq_values[i]))
+            eq_slider.blockSignals(False)
 
     def create_output_level_bar(self):
         """Create a bar to show audio output level."""
-        level_bar = QProgressBar(self)
-        level_bar.setOrientation(Qt.Orientation.Vertical)
-        level_bar.setMinimum(0)
-        level_bar.setMaximum(100)
-        level_bar.setValue(0)
-        level_bar.setStyleSheet("""
-                    QProgressBar {
-                        border: 1px solid #666;
-                        background: #222;
-                        border-radius: 3px;
-                    }
-                    QProgressBar::chunk {
-                        background-color: green;
-                    }
-                """)
-        level_bar.setFixedWidth(8)
-        level_bar.setTextVisible(False)  # Hide numeric value
-        level_bar.animation = QPropertyAnimation(level_bar, b"value")  
-        level_bar.animation.setDuration(150)  
-        return level_bar
+        return LevelMeter(self)
 
     def slider_value_changed(self, value, session):
-        session["session"].SimpleAudioVolume.SetMasterVolume(value / 100, None)
+        self.requested_volumes[session["key"]] = (value, time.perf_counter())
+        session["volume"] = value
+        self.audio_manager.queue_session_volume(session["session"], value)
         session["volume_label"].setText(f"{value}%")
 
-    def mute_channel(self, session, button, slider):
-        if not hasattr(session, "previous_volume"):
-            session.previous_volume = session.SimpleAudioVolume.GetMasterVolume()
+    def mute_channel(self, session, muted):
+        self.audio_manager.set_session_mute(session, muted)
 
-        if button.isChecked():
-            session.SimpleAudioVolume.SetMasterVolume(0, None)
-            slider.setValue(0)
-        else:
-            previous_volume = session.previous_volume * 100
-            session.SimpleAudioVolume.SetMasterVolume(previous_volume / 100, None)
-            slider.setValue(int(previous_volume))
-
-    def hide_channel(self, name):
-        session_to_hide = next((s for s in self.audio_sessions if s["name"] == name), None)
+    def hide_channel(self, key):
+        session_to_hide = self.session_index.get(key)
         if session_to_hide:
-            self.hidden_channels.append(name)
-            if "widget" in session_to_hide:
-                session_to_hide["widget"].deleteLater()  # Safely delete the widget
+            self.hidden_channels.add(key)
+            if self.eq_session is session_to_hide:
+                self.close_eq()
             self.update_sliders()
 
     def reset_hidden_channels(self):
-        self.hidden_channels = []
+        self.hidden_channels.clear()
         self.update_sliders()
 
+    @instrumentation.timed()
     def check_new_sessions(self):
-        current_sessions = self.audio_manager.get_audio_sessions()
-        new_sessions = [
-            session for session in current_sessions
-            if session["name"].lower() not in [s["name"].lower() for s in self.audio_sessions]
-        ]
-        closed_sessions = [
-            session for session in self.audio_sessions
-            if session["name"].lower() not in [s["name"].lower() for s in current_sessions]
-        ]
-        if new_sessions or closed_sessions:
-            self.audio_sessions = [session for session in current_sessions]
-            self.update_sliders()
-
+        """Enumerate sessions on a worker thread; the result is reconciled on the GUI thread."""
+        if self.enumerating:
+            self.enumerate_again = True  # Changes may have landed after that enumeration started
+            return
+        self.enumerating = True
+        threading.Thread(target=self.enumerate_sessions, name="session-enumerator", daemon=True).start()
+
+    @instrumentation.timed()
+    def enumerate_sessions(self):
+        backend = self.audio_manager.backend
+        backend.thread_init()
+        try:
+            sessions = self.audio_manager.get_audio_sessions()
+        except Exception as e:
+            print(f"Failed to enumerate audio sessions: {e}")
+            sessions = None
+        finally:
+            backend.thread_exit()
+        self.session_events.sessions_listed.emit(sessions)
+
+    @instrumentation.timed()
+    def on_sessions_listed(self, sessions):
+        self.enumerating = False
+        if sessions is not None:
+            added, removed = self.session_index.reconcile(sessions)
+            for session in removed:
+                self.forget_channel(session)
+            if added or removed:
+                self.update_sliders()
+            self.sessions_populated.emit(len(self.session_index))
+        if self.enumerate_again:
+            self.enumerate_again = False
+            self.check_new_sessions()
+
+    @instrumentation.timed()
+    def refresh_pending_icons(self, attempt=0):
+        """Show icons that finished extracting after their channel was built."""
+        pending = False
+        for session in self.session_index.values():
+            if session.get("icon") is None and "icon_label" in session and session["session"].exe_path:
+                session["icon"] = self.get_process_icon(session["session"])
+                if session["icon"] is None:
+                    pending = True
+                else:
+                    session["icon_label"].setPixmap(session["icon"])
+        if pending and attempt < ICON_MAX_RETRIES:
+            self.schedule_icon_retry(attempt + 1)
+
+    def schedule_icon_retry(self, attempt):
+        """Look for finished icons again in ICON_RETRY_MS, unless a retry is already on its way."""
+        if not self.icon_retry_scheduled:
+            self.icon_retry_scheduled = True
+            QTimer.singleShot(ICON_RETRY_MS, lambda: self.retry_pending_icons(attempt))
+
+    @instrumentation.timed()
+    def get_process_icon(self, session):
+        """Retrieve the process icon, or None while it is still being extracted."""
+        if not session.exe_path:
+            return None
+        try:
+            return self.icon_cache.get(session.exe_path)
+        except Exception as e:
+            print(f"Failed to get icon for {session.name}: {e}")
+        return None
+
+    def retry_pending_icons(self, attempt):
+        self.icon_retry_scheduled = False
+        self.refresh_pending_icons(attempt)
+
+    @instrumentation.timed(budget_ms=METER_REFRESH_MS)
     def update_level_bars(self):
         """Update the output level bars for all visible sessions."""
-        for session in self.audio_sessions:
-            if "level_bar" in session and isinstance(session["level_bar"], QProgressBar):
-                level_bar = session["level_bar"]
-
+        levels, holds = self.peak_sampler.latest()
+        for session in self.session_index.values():
+            if "level_bar" in session:
+                row = self.peak_sampler.row(session["key"])
+                if row is None:
+                    continue
                 try:
-                    # Get the current audio level
-                    current_level = self.audio_manager.get_session_level(session["session"])
-
-                    # Smooth animation for value change
-                    level_bar.animation.stop()  
-                    level_bar.animation.setStartValue(level_bar.value())  
-                    level_bar.animation.setEndValue(current_level)  
-                    level_bar.animation.start()  
-
-                    # Dynamically update only the chunk color
-                    if current_level > 90:
-                        color = "red"
-                    elif current_level > 70:
-                        color = "yellow"
-                    else:
-                        color = "green"
-
-                    # Apply the chunk color dynamically
-                    level_bar.setStyleSheet(f"""
-                    QProgressBar {{
-                        border: 1px solid #666;
-                        background: #222;
-                        border-radius: 3px;
-                    }}
-                    QProgressBar::chunk {{
-                        border-radius: 3px;
-                        background-color: {color};
-                    }}
-                """)
+                    session["level_bar"].setLevel(float(levels[row]), float(holds[row]))
                 except RuntimeError:
                     continue
 
+    def start_loudness(self, device=None):
+        """Measure the system mix from a loopback device; its loudness shows under the master volume, its spectrum in the EQ panel."""
+        if self.audio_manager.start_capture(device):
+            self.loudness_label.show()
+            self.update_loudness()
+            self.loudness_timer.start(LOUDNESS_REFRESH_MS)
+
+    def update_loudness(self):
+        readings = self.audio_manager.get_loudness()
+        if readings is None:
+            return
+
+        def lufs(value):
+            return f"{value:.1f}" if math.isfinite(value) else "-inf"
+
+        self.loudness_label.setText(f"Short-term {lufs(readings['short_term'])} LUFS  "
+                                    f"Integrated {lufs(readings['integrated'])} LUFS  "
+                                    f"True peak {lufs(readings['true_peak'])} dBTP")
 
     def master_slider_changed(self):
         master_value = self.master_slider.value()
-        self.audio_manager.set_master_volume(master_value)
+        self.audio_manager.queue_master_volume(master_value)
         self.master_value_label.setText(f"{master_value}%")
 
+class StartupProfiler(QObject):
+    """Reports how long the mixer takes to import, paint and list sessions, then quits."""
+
+    def __init__(self, app, window, window_started):
+        super().__init__()
+        self.app = app
+        self.window = window
+        self.window_started = window_started
+        self.first_paint = None
+        self.populated = None
+        window.installEventFilter(self)
+        window.sessions_populated.connect(self.on_populated)
+        QTimer.singleShot(PROFILE_TIMEOUT_MS, self.report)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and self.first_paint is None:
+            self.first_paint = time.perf_counter()
+            # Report once this paint has gone through
+            QTimer.singleShot(0, self.maybe_report)
+        return False
+
+    def on_populated(self, count):
+        if self.populated is None:
+            self.populated = (time.perf_counter(), count)
+            self.maybe_report()
+
+    def maybe_report(self):
+        if self.first_paint is not None and self.populated is not None:
+            self.report()
+
+    def report(self):
+        def since_start(mark):
+            return f"{(mark - IMPORT_STARTED) * 1e3:8.1f} ms" if mark is not None else "     n/a"
+
+        print(f"imports         {since_start(IMPORTS_DONE)}")
+        print(f"window built    {since_start(self.window_started)}")
+        print(f"first paint     {since_start(self.first_paint)}")
+        populated, count = self.populated or (None, 0)
+        print(f"sessions shown  {since_start(populated)} ({count} sessions)")
+        memory = instrumentation.peak_memory_bytes()
+        print(f"peak memory     {memory / 2 ** 20:8.1f} MB" if memory else "peak memory          n/a")
+        print(f"modules loaded  {len(sys.modules):8d}")
+        loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+        print(f"deferred loaded {', '.join(loaded) or 'none'}")
+        self.window.close()
+        self.app.quit()
+
+
 if __name__ == "__main__":
-    app = QApplication([])
-    main_window = AudioPilot()
+    parser = argparse.ArgumentParser(description="AudioPilot mixer")
+    parser.add_argument("--backend", choices=("pycaw", "simulated"), default="pycaw", help="audio backend")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import time and time to first paint, then exit")
+    parser.add_argument("--loudness", nargs="?", const="", metavar="DEVICE",
+                        help="show the loudness and spectrum of the system mix from a loopback device, "
+                             "by default the first one found")
+    parser.add_argument("--eq-route", type=parse_route, action="append", default=[], metavar="APP=INPUT[:OUTPUT]",
+                        help="play an input device, such as a virtual cable APP outputs to, through APP's EQ "
+                             "to an output device (the default one if omitted)")
+    parser.add_argument("--data-dir", metavar="DIR",
+                        help="keep presets and scenes in DIR instead of the user data directory")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time hot paths; F12 shows the timing overlay")
+    parser.add_argument("--overlay", action="store_true", help="instrument and show the timing overlay")
+    parser.add_argument("--trace", metavar="PATH", help="instrument and write a Chrome trace on exit")
+    parser.add_argument("--stats", metavar="PATH", help="instrument and write latency summaries as JSON on exit")
+    parser.add_argument("--control", action="store_true", help="serve the local control API")
+    parser.add_argument("--control-port", type=int, metavar="PORT",
+                        help="serve the local control API on this localhost port")
+    args = parser.parse_args()
+
+    if args.instrument or args.overlay or args.trace or args.stats:
+        instrumentation.enable(trace=bool(args.trace))
+
+    app = QApplication(sys.argv[:1])
+    stores = {}
+    if args.data_dir:
+        from preset_store import PresetStore
+        from scenes import SceneStore
+        stores = {"preset_store": PresetStore(os.path.join(args.data_dir, "presets.json")),
+                  "scene_store": SceneStore(os.path.join(args.data_dir, "scenes.json"))}
+    main_window = AudioPilot(AudioManager(create_backend(args.backend), **stores))
+    control_server = None
+    if args.control or args.control_port is not None:
+        from control_api import DEFAULT_PORT, ControlServer
+        port = DEFAULT_PORT if args.control_port is None else args.control_port
+        control_server = ControlServer(main_window.audio_manager, port=port)
+        if not control_server.start():
+            control_server = None
+    if args.profile_startup:
+        profiler = StartupProfiler(app, main_window, time.perf_counter())
     main_window.show()
+    if args.loudness is not None:
+        from loudness import parse_device
+        main_window.start_loudness(parse_device(args.loudness))
+    for app, input_device, output_device in args.eq_route:
+        main_window.audio_manager.start_eq_route(main_window.audio_manager.capitalize_name(app),
+                                                 input_device, output_device)
+    if args.overlay:
+        main_window.timing_overlay.show()
     app.exec()
+
+    if control_server is not None:
+        control_server.stop()
+
+    if args.trace:
+        instrumentation.export_chrome_trace(args.trace)
+    if args.stats:
+        instrumentation.export_json(args.stats)
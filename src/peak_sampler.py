@@ -0,0 +1,172 @@
+import threading
+import time
+
+import numpy as np
+
+import instrumentation
+
+
+class PeakSampler:
+    """Samples the peak meters of all registered sessions on a background thread.
+
+    Every sample is written into a preallocated (max_sessions x history) ring
+    buffer, and the decaying level and peak-hold of all sessions are updated
+    in one vectorized step. The GUI thread only calls latest() at its own
+    repaint rate, so its cost does not grow with the sampling rate.
+    """
+
+    def __init__(self, backend, rate=100, max_sessions=256, history=256,
+                 hold_time=1.0, decay_db_per_second=24.0, clock=time.perf_counter):
+        self.backend = backend
+        self.rate = rate
+        self.hold_time = hold_time
+        self.decay_db_per_second = decay_db_per_second
+        self.clock = clock
+
+        self.ring = np.zeros((max_sessions, history), dtype=np.float32)
+        self.levels = np.zeros(max_sessions, dtype=np.float32)
+        self.holds = np.zeros(max_sessions, dtype=np.float32)
+        self._hold_age = np.zeros(max_sessions, dtype=np.float32)
+        self._peaks = np.zeros(max_sessions, dtype=np.float32)
+        self._rising = np.zeros(max_sessions, dtype=bool)
+        self._falling = np.zeros(max_sessions, dtype=bool)
+        self._column = 0
+        self._last_sample = None
+
+        self._sessions = [None] * max_sessions  # Row -> BackendSession
+        self._rows = {}  # Session key -> row
+        self._free_rows = list(range(max_sessions - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        self._intervals = np.zeros(1024, dtype=np.float64)  # Recent sample intervals, for jitter
+        self._interval_count = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_session(self, session):
+        """Start sampling a session. Returns its row, or None if the buffer is full."""
+        with self._lock:
+            if session.key in self._rows:
+                return self._rows[session.key]
+            if not self._free_rows:
+                return None
+            row = self._free_rows.pop()
+            self.ring[row].fill(0.0)
+            self.levels[row] = self.holds[row] = self._hold_age[row] = 0.0
+            self._sessions[row] = session
+            self._rows[session.key] = row
+            return row
+
+    def remove_session(self, key):
+        """Stop sampling a session."""
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is not None:
+                self._sessions[row] = None
+                self.levels[row] = self.holds[row] = 0.0
+                self._free_rows.append(row)
+
+    def row(self, key):
+        """Row of a session in the buffers, or None if it is not sampled."""
+        return self._rows.get(key)
+
+    def sample_once(self):
+        """Read all peaks once and fold them into the ring buffer, levels and holds."""
+        with self._lock:
+            rows = list(self._rows.values())
+            sessions = [self._sessions[row] for row in rows]
+
+        peaks = self.backend.get_session_peaks(sessions) if sessions else []
+        now = self.clock()
+        dt = 0.0 if self._last_sample is None else now - self._last_sample
+        self._last_sample = now
+        decay = np.float32(10 ** (-self.decay_db_per_second * dt / 20))
+
+        with self._lock:
+            self._peaks.fill(0.0)
+            for row, session, peak in zip(rows, sessions, peaks):
+                if self._sessions[row] is session:  # Skip rows reassigned while reading
+                    self._peaks[row] = peak
+
+            self.ring[:, self._column] = self._peaks
+            self._column = (self._column + 1) % self.ring.shape[1]
+
+            # Levels fall at a fixed dB rate unless a new peak pushes them up
+            np.multiply(self.levels, decay, out=self.levels)
+            np.maximum(self.levels, self._peaks, out=self.levels)
+
+            # Holds stay put for hold_time, then fall like the levels
+            self._hold_age += dt
+            np.greater_equal(self._peaks, self.holds, out=self._rising)
+            np.copyto(self.holds, self._peaks, where=self._rising)
+            np.copyto(self._hold_age, 0.0, where=self._rising)
+            np.greater(self._hold_age, self.hold_time, out=self._falling)
+            np.multiply(self.holds, decay, out=self.holds, where=self._falling)
+
+    def latest(self):
+        """Copies of the current (levels, holds) arrays, indexed by row."""
+        with self._lock:
+            return self.levels.copy(), self.holds.copy()
+
+    def history(self, key):
+        """The ring buffer row of a session, oldest sample first."""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            return np.roll(self.ring[row], -self._column)
+
+    def start(self):
+        """Start the sampling thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="peak-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        self.backend.thread_init()
+        try:
+            period = 1.0 / self.rate
+            previous = None
+            deadline = time.perf_counter()
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                if previous is not None:
+                    self._intervals[self._interval_count % len(self._intervals)] = started - previous
+                    self._interval_count += 1
+                previous = started
+
+                try:
+                    with instrumentation.span("PeakSampler.sample_once", 1000 * period):
+                        self.sample_once()
+                except Exception as e:
+                    print(f"Peak sampling failed: {e}")
+
+                # Schedule against absolute deadlines so timing errors don't accumulate
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    deadline = time.perf_counter()  # Running late: drop the missed samples
+        finally:
+            self.backend.thread_exit()
+
+    def intervals(self):
+        """Copy of the recent sample intervals, in seconds, in no particular order."""
+        return self._intervals[:min(self._interval_count, len(self._intervals))].copy()
+
+    def jitter(self):
+        """Mean, standard deviation and worst-case deviation of the sample interval, in seconds."""
+        intervals = self.intervals()
+        if not len(intervals):
+            return 0.0, 0.0, 0.0
+        deviation = intervals - 1.0 / self.rate
+        return float(deviation.mean()), float(deviation.std()), float(np.abs(deviation).max())
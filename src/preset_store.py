@@ -0,0 +1,168 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from eq_engine import DEFAULT_Q, EQ_FREQUENCIES
+
+STORE_VERSION = 1
+
+
+def default_data_dir():
+    """Per-user directory for AudioPilot data."""
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_DATA_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "AudioPilot")
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON through a temporary file, so readers see either the old or the new file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    prefix = "." + os.path.splitext(os.path.basename(path))[0] + "-"
+    fd, tmp_path = tempfile.mkstemp(prefix=prefix, suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def move_aside(path):
+    """Rename an unreadable data file out of the way, keeping it for recovery. Returns the new path, or None."""
+    aside = f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+    try:
+        os.replace(path, aside)
+    except OSError as e:
+        print(f"Failed to move {path} aside: {e}")
+        return None
+    return aside
+
+
+class PresetStore:
+    """EQ presets of every session in a single JSON file.
+
+    The file is read once into an in-memory index of
+    session -> preset name -> {"gains", "q", "frequencies"}, so listing and
+    loading presets never touch the disk. Every save rewrites the file
+    atomically; wrap bulk changes in batch() to write once at the end.
+
+    A file that does not parse is moved aside as presets.json.corrupt-<time>
+    and the store starts empty; if it cannot be moved, or cannot be read at
+    all, the store refuses to write so the file is never replaced. The
+    store is used from the GUI and control server threads, so every read
+    and change holds a lock.
+    """
+
+    def __init__(self, path=None, legacy_dir=None):
+        self.path = path or os.path.join(default_data_dir(), "presets.json")
+        self._presets = {}
+        self._batch_depth = 0
+        self._dirty = False
+        self._writable = True
+        self._lock = threading.RLock()
+
+        if os.path.exists(self.path):
+            self._read()
+        elif legacy_dir:
+            # First run with the store: bring over the old per-file presets
+            self.import_legacy(legacy_dir)
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get("presets", {}), dict):
+                raise ValueError("not a preset store")
+            self._presets = data.get("presets", {})
+        except OSError as e:
+            print(f"Failed to read presets from {self.path}, not saving changes: {e}")
+            self._writable = False
+        except ValueError as e:
+            aside = move_aside(self.path)
+            print(f"Failed to read presets from {self.path}: {e}; "
+                  + (f"moved it to {aside}" if aside else "not saving changes"))
+            self._writable = aside is not None
+
+    def _write(self):
+        if self._batch_depth:
+            self._dirty = True
+            return
+        if not self._writable:
+            print(f"Not saving presets, {self.path} could not be read")
+            return
+        write_json_atomic(self.path, {"version": STORE_VERSION, "presets": self._presets})
+
+    @contextmanager
+    def batch(self):
+        """Defer writes until the outermost batch ends."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._dirty = False
+                    self._write()
+
+    def list(self, session_name):
+        """Names of the presets saved for a session."""
+        with self._lock:
+            return sorted(self._presets.get(session_name, {}))
+
+    def get(self, session_name, preset_name):
+        """The preset record, or None if there is no such preset."""
+        with self._lock:
+            return self._presets.get(session_name, {}).get(preset_name)
+
+    def save(self, session_name, preset_name, gains, q=DEFAULT_Q, frequencies=EQ_FREQUENCIES):
+        """Store EQ gains in dB along with the band layout they were made for."""
+        record = {"gains": [float(gain) for gain in gains], "q": float(q), "frequencies": list(frequencies)}
+        with self._lock:
+            self._presets.setdefault(session_name, {})[preset_name] = record
+            self._write()
+
+    def delete(self, session_name, preset_name):
+        """Remove a preset; returns False if it did not exist."""
+        with self._lock:
+            presets = self._presets.get(session_name, {})
+            if presets.pop(preset_name, None) is None:
+                return False
+            if not presets:
+                del self._presets[session_name]
+            self._write()
+            return True
+
+    def import_legacy(self, directory):
+        """Import {session}_{preset}.eq files from a directory; returns how many were imported.
+
+        Existing presets are not overwritten. The old format cannot tell an
+        underscore in the session name from the separator, so the name is
+        split at the first underscore.
+        """
+        imported = 0
+        with self.batch():
+            for path in glob.glob(os.path.join(glob.escape(directory), "*_*.eq")):
+                session_name, _, preset_name = os.path.basename(path)[:-3].partition("_")
+                if not session_name or not preset_name or self.get(session_name, preset_name):
+                    continue
+                try:
+                    with open(path, "r") as f:
+                        gains = [float(value) for value in f.read().split(",")]
+                except (OSError, ValueError) as e:
+                    print(f"Skipping legacy preset {path}: {e}")
+                    continue
+                if len(gains) != len(EQ_FREQUENCIES):
+                    print(f"Skipping legacy preset {path}: expected {len(EQ_FREQUENCIES)} bands")
+                    continue
+                self.save(session_name, preset_name, gains)
+                imported += 1
+        return imported
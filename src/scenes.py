@@ -0,0 +1,208 @@
+import json
+import math
+import os
+import threading
+import time
+
+from preset_store import default_data_dir, move_aside, write_json_atomic
+
+SCENE_VERSION = 2  # Version 1 kept one volume and mute per app
+VOLUME_TOLERANCE = 0.05  # Percent; closer volumes count as equal, covering the backend's float32 round trip
+
+
+def sessions_by_app(sessions):
+    """Session dicts grouped by display name, each app's in a stable order (process id, then key)."""
+    apps = {}
+    for session in sorted(sessions, key=lambda session: (session["session"].pid, str(session["key"]))):
+        apps.setdefault(session["name"], []).append(session)
+    return apps
+
+
+def scene_targets(scene, sessions):
+    """(session dict, stored state) for each live session of an app in the scene.
+
+    The n-th session of an app gets the app's n-th stored state; sessions
+    beyond those stored get the last one.
+    """
+    for name, app_sessions in sessions_by_app(sessions).items():
+        states = scene["apps"].get(name)
+        if states:
+            for ordinal, session in enumerate(app_sessions):
+                yield session, states[min(ordinal, len(states) - 1)]
+
+
+def upgrade_scene(scene):
+    """A scene in the current format; version 1 scenes had a single state per app."""
+    if scene.get("version", 1) < 2:
+        scene = dict(scene, version=SCENE_VERSION, apps={name: [app] for name, app in scene["apps"].items()})
+    return scene
+
+
+def undo_ducking(audio_manager, sessions):
+    """Session dicts with the volume of ducked sessions replaced by the one they return to.
+
+    Scenes hold what the user set, not the level ducking lowered it to.
+    """
+    undone = []
+    for session in sessions:
+        base = audio_manager.ducking.base_volume(session["key"])
+        undone.append(session if base is None else dict(session, volume=base * 100))
+    return undone
+
+
+def capture_scene(audio_manager):
+    """Snapshot the live mixer as a scene.
+
+    A scene holds the master volume, the volume and mute of every session
+    and the EQ gains from AudioManager.eq_settings. Sessions are stored per
+    app display name, in the order of sessions_by_app, rather than by
+    session key, so a scene still applies after the apps restart and two
+    sessions of one app keep their own settings. Volumes are in percent; a
+    ducked session is captured at the volume it returns to.
+    """
+    backend = audio_manager.backend
+    sessions = undo_ducking(audio_manager, audio_manager.get_audio_sessions())
+    apps = {
+        name: [{"volume": session["volume"], "muted": backend.get_session_mute(session["session"])}
+               for session in app_sessions]
+        for name, app_sessions in sessions_by_app(sessions).items()
+    }
+    return {
+        "version": SCENE_VERSION,
+        "master": audio_manager.get_master_volume(),
+        "apps": apps,
+        "eq": {name: [float(gain) for gain in gains] for name, gains in audio_manager.eq_settings.items()},
+    }
+
+
+def diff_scene(scene, master, sessions, mutes, eq_settings):
+    """The changes that take the live state to a scene.
+
+    master is the live master volume, sessions the live session dicts from
+    AudioManager.get_audio_sessions (with their volume, the base volume for
+    ducked sessions; see undo_ducking), mutes maps session
+    keys to their live mute state and eq_settings is AudioManager's. Only
+    sessions of apps in the scene are touched, each compared with its own
+    stored state (see scene_targets). Returns a dict of "master" (None if
+    unchanged), "volumes" and "mutes" as lists of (session dict, value) and
+    "eq" as {app name: gains}.
+    """
+    changes = {"master": None, "volumes": [], "mutes": [], "eq": {}}
+    if not math.isclose(scene["master"], master, abs_tol=VOLUME_TOLERANCE):
+        changes["master"] = scene["master"]
+    for session, state in scene_targets(scene, sessions):
+        if not math.isclose(state["volume"], session["volume"], abs_tol=VOLUME_TOLERANCE):
+            changes["volumes"].append((session, state["volume"]))
+        if state["muted"] != mutes[session["key"]]:
+            changes["mutes"].append((session, state["muted"]))
+    for name, gains in scene["eq"].items():
+        if list(eq_settings.get(name, ())) != gains:
+            changes["eq"][name] = gains
+    return changes
+
+
+def apply_scene(audio_manager, scene, naive=False):
+    """Bring the mixer to a scene, issuing only the writes that change something.
+
+    Reads the live state of the scene's apps, diffs it against the scene
+    and applies the difference: the volumes as one backend batch, then the
+    mutes, the master volume and the EQ gains. With naive=True every value
+    is written without reading first, for comparison. Call it on a thread
+    that did backend.thread_init(). Returns what was done: the changes
+    applied (as in diff_scene, with session keys in place of session
+    dicts), the number of backend writes and the seconds it took.
+    """
+    started = time.perf_counter()
+    backend = audio_manager.backend
+    sessions = undo_ducking(audio_manager, [session for session in audio_manager.get_audio_sessions()
+                                            if session["name"] in scene["apps"]])
+    if naive:
+        targets = list(scene_targets(scene, sessions))
+        changes = {
+            "master": scene["master"],
+            "volumes": [(session, state["volume"]) for session, state in targets],
+            "mutes": [(session, state["muted"]) for session, state in targets],
+            "eq": dict(scene["eq"]),
+        }
+    else:
+        # The live volumes come with the enumeration
+        mutes = {session["key"]: backend.get_session_mute(session["session"]) for session in sessions}
+        changes = diff_scene(scene, audio_manager.get_master_volume(), sessions, mutes,
+                             audio_manager.eq_settings)
+
+    if changes["volumes"]:
+        audio_manager.set_session_volumes([(session["session"], level) for session, level in changes["volumes"]])
+    for session, muted in changes["mutes"]:
+        try:
+            audio_manager.set_session_mute(session["session"], muted)
+        except Exception as e:
+            print(f"Failed to mute {session['name']}: {e}")
+    if changes["master"] is not None:
+        audio_manager.set_master_volume(changes["master"])
+    for name, gains in changes["eq"].items():
+        audio_manager.set_eq_gains(name, gains)
+
+    return {
+        "master": changes["master"],
+        "volumes": {session["key"]: level for session, level in changes["volumes"]},
+        "mutes": {session["key"]: muted for session, muted in changes["mutes"]},
+        "eq": changes["eq"],
+        "writes": len(changes["volumes"]) + len(changes["mutes"]) + (changes["master"] is not None),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+class SceneStore:
+    """Named mixer scenes in a single JSON file, rewritten atomically on every change.
+
+    Like PresetStore, a file that does not parse is moved aside rather than
+    overwritten, and access is locked: scenes are saved on the volume
+    writer thread and listed from the GUI and control server threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_data_dir(), "scenes.json")
+        self._scenes = {}
+        self._writable = True
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    scenes = json.load(f).get("scenes", {})
+                self._scenes = {name: upgrade_scene(scene) for name, scene in scenes.items()}
+            except OSError as e:
+                print(f"Failed to read scenes from {self.path}, not saving changes: {e}")
+                self._writable = False
+            except (AttributeError, KeyError, ValueError) as e:
+                aside = move_aside(self.path)
+                print(f"Failed to read scenes from {self.path}: {e}; "
+                      + (f"moved it to {aside}" if aside else "not saving changes"))
+                self._writable = aside is not None
+
+    def _write(self):
+        if not self._writable:
+            print(f"Not saving scenes, {self.path} could not be read")
+            return
+        write_json_atomic(self.path, {"version": SCENE_VERSION, "scenes": self._scenes})
+
+    def list(self):
+        with self._lock:
+            return sorted(self._scenes)
+
+    def get(self, name):
+        """The scene, or None if there is no scene of that name."""
+        with self._lock:
+            return self._scenes.get(name)
+
+    def save(self, name, scene):
+        with self._lock:
+            self._scenes[name] = scene
+            self._write()
+
+    def delete(self, name):
+        """Remove a scene; returns False if it did not exist."""
+        with self._lock:
+            if self._scenes.pop(name, None) is None:
+                return False
+            self._write()
+            return True
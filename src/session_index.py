@@ -0,0 +1,49 @@
+class SessionIndex:
+    """Audio sessions keyed by their stable identity, in discovery order.
+
+    Each entry is a session dict from AudioManager.get_audio_sessions. An
+    entry that is still alive keeps its original dict across polls, so the
+    widgets stored on it stay valid.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+
+    def reconcile(self, current_sessions):
+        """Bring the index in line with a fresh enumeration.
+
+        Returns the (added, removed) session dicts. Cost is linear in the
+        number of sessions.
+        """
+        current = {session["key"]: session for session in current_sessions}
+        removed_keys = [key for key in self._sessions if key not in current]
+        removed = [self._sessions.pop(key) for key in removed_keys]
+        added = []
+        for key, session in current.items():
+            if key not in self._sessions:
+                self._sessions[key] = session
+                added.append(session)
+        return added, removed
+
+    def add(self, session):
+        """Add a single session; returns False if its key is already indexed."""
+        if session["key"] in self._sessions:
+            return False
+        self._sessions[session["key"]] = session
+        return True
+
+    def remove(self, key):
+        """Remove a session by key and return it, or None if it was not indexed."""
+        return self._sessions.pop(key, None)
+
+    def get(self, key):
+        return self._sessions.get(key)
+
+    def values(self):
+        return self._sessions.values()
+
+    def __contains__(self, key):
+        return key in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+
+from eq_engine import EQ_FREQUENCIES
+
+OCTAVE = "octave"
+THIRD_OCTAVE = "third"
+# Nominal 1/3-octave centres from 25 Hz to 20 kHz
+THIRD_OCTAVE_FREQUENCIES = tuple(1000 * 2 ** (k / 3) for k in range(-16, 14))
+
+
+def band_frequencies(resolution):
+    """Centre frequencies of the bands of a resolution."""
+    return EQ_FREQUENCIES if resolution == OCTAVE else THIRD_OCTAVE_FREQUENCIES
+
+
+def band_edges(frequencies, fraction, fft_size, sample_rate):
+    """First and one-past-last rfft bin of every band, each band at least one bin wide.
+
+    Low bands can be narrower than a bin; they fall back to the bin nearest
+    their centre so they still show something.
+    """
+    bin_width = sample_rate / fft_size
+    bins = fft_size // 2 + 1
+    lo = np.empty(len(frequencies), dtype=np.intp)
+    hi = np.empty(len(frequencies), dtype=np.intp)
+    for band, centre in enumerate(frequencies):
+        lo[band] = min(math.ceil(centre * 2 ** (-fraction / 2) / bin_width), bins - 1)
+        hi[band] = min(math.ceil(centre * 2 ** (fraction / 2) / bin_width), bins)
+        if hi[band] <= lo[band]:
+            nearest = min(round(centre / bin_width), bins - 1)
+            lo[band], hi[band] = nearest, nearest + 1
+    return lo, hi
+
+
+class SpectrumAnalyzer:
+    """Band levels of an audio stream for display, aligned to the EQ bands.
+
+    process() keeps the most recent fft_size mono samples in a mirrored ring
+    buffer, so the analysis window is always one contiguous slice.
+    analyze() windows it, runs rfft and sums the power of each band, all into
+    buffers allocated up front; a frame allocates no arrays. Band levels in
+    dB are smoothed with separate attack and release time constants.
+    """
+
+    def __init__(self, fft_size=4096, sample_rate=48000, channels=2, resolution=OCTAVE,
+                 attack=0.01, release=0.3, floor_db=-90.0):
+        self.fft_size = fft_size
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.attack = attack
+        self.release = release
+        self.floor_db = floor_db
+
+        self._ring = np.zeros(2 * fft_size)  # Every sample is written twice, fft_size apart
+        self._position = 0
+        self._mono = np.empty(fft_size)
+        self._window = np.hanning(fft_size)
+        self._frame = np.empty(fft_size)
+        self._bins = np.empty(fft_size // 2 + 1, dtype=np.complex128)
+        self._power = np.empty(fft_size // 2 + 1)
+        self._cumulative = np.zeros(fft_size // 2 + 2)
+        # By Parseval, this makes a full-scale sine read 0 dB in its band whatever the window leaks
+        self._scale = 4.0 / (fft_size * np.square(self._window).sum())
+        self.set_resolution(resolution)
+
+    def set_resolution(self, resolution):
+        """Switch between the 10 EQ octave bands and 30 third-octave bands."""
+        self.resolution = resolution
+        self.frequencies = band_frequencies(resolution)
+        fraction = 1.0 if resolution == OCTAVE else 1 / 3
+        self._lo, self._hi = band_edges(self.frequencies, fraction, self.fft_size, self.sample_rate)
+        self._bands = np.empty(len(self.frequencies))
+        self._lower = np.empty(len(self.frequencies))
+        self._rising = np.empty(len(self.frequencies), dtype=bool)
+        self._coefficients = np.empty(len(self.frequencies))
+        self.levels = np.full(len(self.frequencies), self.floor_db)
+
+    def process(self, block):
+        """Add a block of audio, either (frames, channels) or interleaved."""
+        frames = np.asarray(block).reshape(-1, self.channels)[-self.fft_size:]
+        count = len(frames)
+        # Downmix channel by channel; np.mean would allocate a cast copy of float32 input
+        mono = self._mono[:count]
+        np.copyto(mono, frames[:, 0])
+        for channel in range(1, self.channels):
+            np.add(mono, frames[:, channel], out=mono)
+        if self.channels > 1:
+            np.multiply(mono, 1.0 / self.channels, out=mono)
+
+        # Write the block at the ring position and again one fft_size later, wrapping once at most
+        start = self._position
+        first = min(count, self.fft_size - start)
+        for offset in (0, self.fft_size):
+            self._ring[offset + start:offset + start + first] = mono[:first]
+            self._ring[offset:offset + count - first] = mono[first:]
+        self._position = (start + count) % self.fft_size
+
+    def analyze(self, dt=1 / 60):
+        """Update and return the smoothed band levels in dB; dt is the time since the last call."""
+        window = self._ring[self._position:self._position + self.fft_size]
+        np.multiply(window, self._window, out=self._frame)
+        np.fft.rfft(self._frame, out=self._bins)
+        np.abs(self._bins, out=self._power)
+        np.square(self._power, out=self._power)
+
+        np.cumsum(self._power, out=self._cumulative[1:])
+        bands = self._bands
+        np.take(self._cumulative, self._hi, out=bands)
+        np.take(self._cumulative, self._lo, out=self._lower)
+        np.subtract(bands, self._lower, out=bands)
+        np.multiply(bands, self._scale, out=bands)
+        np.maximum(bands, 10 ** (self.floor_db / 10), out=bands)
+        np.log10(bands, out=bands)
+        np.multiply(bands, 10.0, out=bands)
+
+        # One-pole smoothing towards the new levels, fast on the way up and slow on the way down
+        np.greater(bands, self.levels, out=self._rising)
+        coefficients = self._coefficients
+        coefficients.fill(1.0 - math.exp(-dt / self.release) if self.release > 0 else 1.0)
+        np.copyto(coefficients, 1.0 - math.exp(-dt / self.attack) if self.attack > 0 else 1.0, where=self._rising)
+        np.subtract(bands, self.levels, out=bands)
+        np.multiply(bands, coefficients, out=bands)
+        np.add(self.levels, bands, out=self.levels)
+        return self.levels
+
+    def reset(self):
+        """Clear the buffered audio and drop the levels to the floor."""
+        self._ring.fill(0.0)
+        self._position = 0
+        self.levels.fill(self.floor_db)
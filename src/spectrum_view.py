@@ -0,0 +1,105 @@
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtGui import QColor, QPainter, QPixmap
+from PyQt6.QtWidgets import QWidget
+
+BACKGROUND = QColor("#222")
+BORDER = QColor("#666")
+GRID_COLOR = QColor("#333")
+BAR_COLOR = QColor("#3a9")
+LABEL_COLOR = QColor("#aaa")
+LABEL_HEIGHT = 14
+GRID_STEP_DB = 12
+
+
+def frequency_label(frequency):
+    return f"{frequency / 1000:g}k" if frequency >= 1000 else f"{frequency:.0f}"
+
+
+class SpectrumView(QWidget):
+    """Band levels of a SpectrumAnalyzer drawn as bars in one painted widget.
+
+    Levels are in dB between floor_db and 0. Every band is painted by this
+    widget itself, so a frame costs one paint event however many bands
+    there are. The grid, labels and border only change with the size or the
+    bands, so they are drawn once into a pixmap and blitted under the bars.
+    """
+
+    def __init__(self, parent=None, floor_db=-90.0):
+        super().__init__(parent)
+        self.floor_db = floor_db
+        self._levels = []
+        self._labels = []
+        self._backdrop = None
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setMinimumHeight(80)
+
+    def setBands(self, frequencies):
+        """Set the centre frequencies of the bands to show."""
+        self._labels = [frequency_label(frequency) for frequency in frequencies]
+        self._levels = [self.floor_db] * len(frequencies)
+        self._backdrop = None
+        self.update()
+
+    def setLevels(self, levels):
+        """Show new band levels in dB."""
+        self._levels = [float(level) for level in levels]
+        self.update()
+
+    def resizeEvent(self, event):
+        self._backdrop = None
+        super().resizeEvent(event)
+
+    def _slots(self):
+        """Left and right edge of every band's bar."""
+        count = len(self._levels)
+        slot = (self.width() - 2) / count
+        gap = 1 if slot > 4 else 0
+        return [(1 + round(band * slot), 1 + round((band + 1) * slot) - gap) for band in range(count)]
+
+    def _plot_height(self):
+        return self.height() - LABEL_HEIGHT - 2
+
+    def _draw_backdrop(self):
+        width = self.width()
+        height = self.height()
+        plot_height = self._plot_height()
+        pixmap = QPixmap(self.size())
+        pixmap.fill(BACKGROUND)
+        painter = QPainter(pixmap)
+
+        for db in range(-GRID_STEP_DB, int(self.floor_db), -GRID_STEP_DB):
+            y = 1 + round(db / self.floor_db * plot_height)
+            painter.fillRect(1, y, width - 2, 1, GRID_COLOR)
+
+        if self._levels:
+            slots = self._slots()
+            # Skip labels that would overlap when the bands are narrow
+            label_every = max(1, round(28 / ((width - 2) / len(slots))))
+            painter.setPen(LABEL_COLOR)
+            font = painter.font()
+            font.setPixelSize(9)
+            painter.setFont(font)
+            for band, (left, right) in enumerate(slots):
+                if band % label_every == 0 and band < len(self._labels):
+                    painter.drawText(QRect(left - 10, height - LABEL_HEIGHT, right - left + 20, LABEL_HEIGHT),
+                                     Qt.AlignmentFlag.AlignCenter, self._labels[band])
+
+        painter.setPen(BORDER)
+        painter.drawRect(0, 0, width - 1, height - 1)
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self._backdrop is None or self._backdrop.size() != self.size():
+            self._backdrop = self._draw_backdrop()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._backdrop)
+        if not self._levels:
+            return
+
+        plot_height = self._plot_height()
+        for (left, right), level in zip(self._slots(), self._levels):
+            fraction = min(max(1.0 - level / self.floor_db, 0.0), 1.0)
+            bar = round(fraction * plot_height)
+            if bar:
+                painter.fillRect(left, 1 + plot_height - bar, right - left, bar, BAR_COLOR)
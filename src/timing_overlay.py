@@ -0,0 +1,68 @@
+from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtGui import QColor, QFont, QPainter
+from PyQt6.QtWidgets import QWidget
+
+import instrumentation
+
+BACKGROUND = QColor(0, 0, 0, 190)
+TEXT_COLOR = QColor("#ddd")
+OVERRUN_COLOR = QColor("#f66")
+REFRESH_MS = 500
+MAX_ROWS = 16
+LINE_HEIGHT = 14
+
+
+class TimingOverlay(QWidget):
+    """Translucent table of the slowest instrumented calls, drawn over the mixer.
+
+    Shows p50/p95/max per call name and budget overruns, refreshed twice a
+    second from the active recorder. It ignores the mouse, so the mixer
+    underneath stays usable.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self._rows = []
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self._font = QFont("monospace")
+        self._font.setStyleHint(QFont.StyleHint.Monospace)
+        self._font.setPixelSize(11)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self._timer.start(REFRESH_MS)
+        self.refresh()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        recorder = instrumentation.recorder()
+        calls = recorder.snapshot() if recorder else {}
+        ranked = sorted(calls.items(), key=lambda item: item[1]["p95"], reverse=True)[:MAX_ROWS]
+        self._rows = [(f"{'call':<34}{'p50':>8}{'p95':>8}{'max':>8}{'n':>7}{'over':>6}", False)]
+        for name, summary in ranked:
+            overruns = summary.get("overruns", 0)
+            self._rows.append((
+                f"{name[-34:]:<34}{summary['p50'] * 1e3:>8.2f}{summary['p95'] * 1e3:>8.2f}"
+                f"{summary['max'] * 1e3:>8.2f}{summary['count']:>7}{overruns if 'budget' in summary else '':>6}",
+                overruns > 0,
+            ))
+        if recorder is None:
+            self._rows.append(("instrumentation is off", False))
+        self.resize(self._font.pixelSize() * 45, LINE_HEIGHT * len(self._rows) + 8)
+        if self.parentWidget():
+            self.move(self.parentWidget().width() - self.width() - 8, 8)
+        self.raise_()
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+        painter.setFont(self._font)
+        for row, (text, overrun) in enumerate(self._rows):
+            painter.setPen(OVERRUN_COLOR if overrun else TEXT_COLOR)
+            painter.drawText(6, 4 + LINE_HEIGHT * (row + 1) - 3, text)
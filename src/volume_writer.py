@@ -0,0 +1,97 @@
+import threading
+import time
+
+from instrumentation import timed
+
+
+class VolumeWriter:
+    """Coalesces volume writes and issues them from a worker thread.
+
+    Each target keeps only its latest pending value, so a slider drag that
+    fires hundreds of valueChanged signals turns into at most one write per
+    target per flush interval. The value a drag ends on is always written,
+    because a pending value is only ever replaced by a newer one.
+    """
+
+    def __init__(self, backend, max_rate=30, clock=time.perf_counter):
+        self.backend = backend
+        self.interval = 1.0 / max_rate
+        self.clock = clock
+        self.requested = 0
+        self.issued = 0
+        self._pending = {}  # Target -> (write function, value)
+        self._condition = threading.Condition()
+        self._last_flush = None
+        self._thread = None
+        self._running = False
+
+    def submit(self, target, write, value):
+        """Queue write(value) for target, replacing any write still pending for it."""
+        with self._condition:
+            self.requested += 1
+            self._pending[target] = (write, value)
+            self._condition.notify()
+
+    def set_master_volume(self, level):
+        """Queue a master volume write, level in 0.0-1.0."""
+        self.submit("master", self.backend.set_master_volume, level)
+
+    def set_session_volume(self, session, level):
+        """Queue a session volume write, level in 0.0-1.0."""
+        self.submit(session.key, lambda value: self.backend.set_session_volume(session, value), level)
+
+    @timed()
+    def flush(self):
+        """Issue all pending writes now, on the calling thread."""
+        with self._condition:
+            pending = self._pending
+            self._pending = {}
+            self._last_flush = self.clock()
+        for target, (write, value) in pending.items():
+            try:
+                write(value)
+            except Exception as e:
+                print(f"Failed to write volume for {target}: {e}")
+        with self._condition:
+            self.issued += len(pending)
+
+    def start(self):
+        """Start flushing from the worker thread."""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="volume-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Flush what is still pending and stop the worker thread."""
+        if self._thread is not None:
+            with self._condition:
+                self._running = False
+                self._condition.notify()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        self.backend.thread_init()
+        try:
+            while True:
+                with self._condition:
+                    while self._running and not self._pending:
+                        self._condition.wait()
+                    if not self._running:
+                        break
+                    # Hold back until a full interval has passed since the last flush
+                    if self._last_flush is not None:
+                        delay = self._last_flush + self.interval - self.clock()
+                        if delay > 0:
+                            self._condition.wait(delay)
+                            continue
+                self.flush()
+        finally:
+            self.backend.thread_exit()
+
+    def stats(self):
+        """Writes requested by callers and writes actually issued."""
+        with self._condition:
+            return {"requested": self.requested, "issued": self.issued, "pending": len(self._pending)}
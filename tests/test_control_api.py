@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from audio_manager import AudioManager
+from backends.simulated import SimulatedBackend
+from control_api import ControlClient, ControlServer, encode_json, read_frame
+from preset_store import PresetStore
+from scenes import SceneStore
+
+
+@pytest.fixture
+def server(tmp_path):
+    manager = AudioManager(SimulatedBackend(session_count=4),
+                           preset_store=PresetStore(os.path.join(tmp_path, "presets.json")),
+                           scene_store=SceneStore(os.path.join(tmp_path, "scenes.json")))
+    server = ControlServer(manager, port=0)
+    assert server.start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("message", [
+    {"commands": 5},
+    {"commands": "list_sessions"},
+    {"commands": [{"op": "list_sessions"}, 3]},
+    [{"op": "list_sessions"}],
+])
+def test_malformed_messages_are_rejected_and_the_connection_survives(server, message):
+    async def exchange():
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        replies = []
+        for sent in (message, {"id": 1, "commands": [{"op": "list_sessions"}]}):
+            writer.write(encode_json(sent))
+            kind, payload = await asyncio.wait_for(read_frame(reader), 5.0)
+            replies.append(json.loads(payload))
+        writer.close()
+        return replies
+
+    rejected, listing = asyncio.run(exchange())
+    assert rejected["error"].startswith("Malformed message")
+    assert listing["results"][0]["ok"] and len(listing["results"][0]["sessions"]) == 4
+
+
+class SlowReadBackend(SimulatedBackend):
+    """Simulated backend whose volume reads block, like a COM call into a hung session."""
+
+    def get_session_volume(self, session):
+        time.sleep(0.05)
+        return super().get_session_volume(session)
+
+
+def test_slow_backend_calls_do_not_hold_up_meter_frames(tmp_path):
+    manager = AudioManager(SlowReadBackend(session_count=20),
+                           preset_store=PresetStore(os.path.join(tmp_path, "presets.json")),
+                           scene_store=SceneStore(os.path.join(tmp_path, "scenes.json")))
+    server = ControlServer(manager, port=0)
+    assert server.start()
+
+    async def exchange():
+        watcher = await ControlClient.connect(port=server.port)
+        await watcher.request({"op": "subscribe_meters", "rate": 50})
+        frames = watcher.meters()
+        await frames.__anext__()
+        caller = await ControlClient.connect(port=server.port)
+        listing = asyncio.create_task(caller.request({"op": "list_sessions"}))  # About a second of reads
+        received = 0
+        while not listing.done():
+            await asyncio.wait_for(frames.__anext__(), 1.0)
+            received += 1
+        await caller.close()
+        await watcher.close()
+        return received, listing.result()
+
+    try:
+        received, [result] = asyncio.run(exchange())
+    finally:
+        server.stop()
+    assert result["ok"] and len(result["sessions"]) == 20
+    assert received >= 10
@@ -0,0 +1,107 @@
+import math
+
+import pytest
+
+from backends import VOLUME_CHANGED
+from backends.simulated import SimulatedBackend
+from ducking import DuckingEngine, DuckingRule
+
+RATE = 200
+LOUD = 0.1  # -20 dBFS, above the rule's -30 dBFS threshold
+BASE_VOLUME = 0.8
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Mixer:
+    """Discord ducking Spotify by 12 dB, with bystanders, stepped by hand at RATE."""
+
+    def __init__(self, backend_class=SimulatedBackend):
+        self.clock = Clock()
+        self.backend = backend_class(session_count=0)
+        self.discord = self.backend.add_session("discord.exe")
+        self.spotify = self.backend.add_session("spotify.exe")
+        self.bystanders = [self.backend.add_session("chrome.exe") for _ in range(4)]
+        for session in self.bystanders:
+            self.backend.hold_level(session, 0.5)
+        self.backend.hold_level(self.discord, 0.0)
+        self.spotify.native.volume = BASE_VOLUME
+        self.engine = DuckingEngine(self.backend, rate=RATE, clock=self.clock)
+        self.engine.set_sessions(self.backend.sessions)
+        self.engine.add_rule(DuckingRule("Discord", "Spotify", threshold_db=-30, depth_db=12, attack=0.05,
+                                         release=0.5, hold=0.1))
+
+    def advance(self, seconds):
+        for _ in range(round(seconds * RATE)):
+            self.clock.now += 1 / RATE
+            self.engine.step()
+
+    def gain_db(self):
+        return 20 * math.log10(self.spotify.native.volume / BASE_VOLUME)
+
+
+def test_gain_follows_the_attack_hold_and_release_ramps():
+    mixer = Mixer()
+    mixer.advance(0.1)
+    assert mixer.gain_db() == pytest.approx(0.0, abs=0.01)
+    mixer.backend.hold_level(mixer.discord, LOUD)
+    mixer.advance(0.025)
+    assert mixer.gain_db() == pytest.approx(-6.0, abs=0.01)
+    mixer.advance(0.025)
+    assert mixer.gain_db() == pytest.approx(-12.0, abs=0.01)
+    mixer.backend.hold_level(mixer.discord, 0.0)
+    mixer.advance(0.095)
+    assert mixer.gain_db() == pytest.approx(-12.0, abs=0.01)
+    mixer.advance(0.25)  # The release starts on the tick the hold runs out
+    assert mixer.gain_db() == pytest.approx(-6.0, abs=0.01)
+    mixer.advance(0.25)
+    assert mixer.spotify.native.volume == pytest.approx(BASE_VOLUME)
+    assert all(session.native.volume == 1.0 for session in mixer.bystanders)
+
+
+def test_a_base_volume_set_while_ducked_is_restored_on_release():
+    mixer = Mixer()
+    mixer.backend.hold_level(mixer.discord, LOUD)
+    mixer.advance(0.1)
+    assert mixer.engine.set_base_volume(mixer.spotify, 0.5)
+    mixer.advance(0.01)
+    assert mixer.spotify.native.volume == pytest.approx(0.5 * 10 ** (-12 / 20))
+    mixer.backend.hold_level(mixer.discord, 0.0)
+    mixer.advance(1.0)
+    assert mixer.spotify.native.volume == pytest.approx(0.5)
+    assert not mixer.engine.set_base_volume(mixer.spotify, 0.6)  # Released, the caller writes it
+
+
+def test_a_stray_write_during_a_duck_is_overwritten():
+    mixer = Mixer()
+    mixer.backend.start_notifications(
+        lambda event, key, value: event == VOLUME_CHANGED and mixer.engine.on_volume_changed(key, value))
+    mixer.backend.hold_level(mixer.discord, LOUD)
+    mixer.advance(0.1)
+    ducked = mixer.spotify.native.volume
+
+    mixer.backend.set_session_volume(mixer.spotify, BASE_VOLUME)  # A write queued before the duck lands late
+    mixer.advance(0.01)
+    assert mixer.spotify.native.volume == pytest.approx(ducked)
+
+
+class WatchedBackend(SimulatedBackend):
+    engine = None
+
+    def get_session_volume(self, session):
+        assert not (self.engine and self.engine._lock.locked()), "volume read while holding the engine lock"
+        return super().get_session_volume(session)
+
+
+def test_base_volumes_are_read_outside_the_engine_lock():
+    mixer = Mixer(WatchedBackend)
+    mixer.backend.engine = mixer.engine
+    mixer.backend.hold_level(mixer.discord, LOUD)
+    mixer.advance(0.1)
+    assert mixer.gain_db() == pytest.approx(-12.0, abs=0.01)
@@ -0,0 +1,62 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from eq_engine import EQ_BANDS, CoefficientCache, EqualizerEngine, design_band
+
+
+def test_cache_returns_the_designed_section_and_evicts_the_oldest():
+    cache = CoefficientCache(maxsize=2)
+    np.testing.assert_array_equal(cache.get(3, 6.0, 1.41, 48000), design_band(3, 6.0, 1.41, 48000))
+    cache.get(4, 6.0, 1.41, 48000)
+    cache.get(3, 6.0, 1.41, 48000)  # Now the most recent
+    cache.get(5, 6.0, 1.41, 48000)
+    assert cache.stats() == {"hits": 1, "misses": 3, "size": 2}
+    cache.get(3, 6.0, 1.41, 48000)
+    assert cache.stats()["hits"] == 2
+
+
+def test_cache_is_safe_to_share_between_threads():
+    cache = CoefficientCache(maxsize=8)
+    errors = []
+
+    def hammer(offset):
+        try:
+            for i in range(2000):
+                cache.get(i % EQ_BANDS, float((i + offset) % 24 - 12), 1.41, 48000)
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=hammer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 4 * 2000
+    assert stats["size"] == 8
+
+
+def test_flat_engine_passes_audio_through_and_a_boost_raises_the_band():
+    pytest.importorskip("scipy")
+    engine = EqualizerEngine(cache=CoefficientCache())
+    t = np.arange(4800) / 48000
+    tone = np.repeat(np.sin(2 * np.pi * 1000 * t)[:, None], 2, axis=1).astype(np.float32) * 0.1
+    block = tone.copy()
+    engine.process(block)
+    np.testing.assert_array_equal(block, tone)
+
+    engine.set_band(5, 6.0)  # The 1 kHz band
+    for _ in range(3):
+        block = tone.copy()
+        engine.process(block)
+    gain_db = 20 * np.log10(np.abs(block[-1000:]).max() / 0.1)
+    assert gain_db == pytest.approx(6.0, abs=0.5)
@@ -0,0 +1,58 @@
+import argparse
+import os
+
+import numpy as np
+import pytest
+
+from audio_manager import AudioManager
+from backends.simulated import SimulatedBackend
+from eq_route import parse_route
+from preset_store import PresetStore
+from scenes import SceneStore
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("spotify=3", ("spotify", 3, None)),
+    ("spotify=3:5", ("spotify", 3, 5)),
+    ("vlc=CABLE Output:Speakers", ("vlc", "CABLE Output", "Speakers")),
+])
+def test_parse_route(spec, expected):
+    assert parse_route(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["spotify", "=3", "spotify=", "spotify=:5"])
+def test_parse_route_rejects_missing_parts(spec):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_route(spec)
+
+
+def test_eq_is_not_applied_without_a_route(tmp_path):
+    manager = AudioManager(SimulatedBackend(session_count=0),
+                           preset_store=PresetStore(os.path.join(tmp_path, "presets.json")),
+                           scene_store=SceneStore(os.path.join(tmp_path, "scenes.json")))
+    assert not manager.is_eq_applied("Spotify")
+    manager.volume_writer.stop()
+
+
+def test_route_plays_the_input_through_the_sessions_eq(tmp_path):
+    pytest.importorskip("scipy")
+    sounddevice = pytest.importorskip("sounddevice")
+    from eq_route import EqRoute
+
+    manager = AudioManager(SimulatedBackend(session_count=0),
+                           preset_store=PresetStore(os.path.join(tmp_path, "presets.json")),
+                           scene_store=SceneStore(os.path.join(tmp_path, "scenes.json")))
+    try:
+        route = EqRoute(manager.get_eq_engine("Spotify"), None)
+    except sounddevice.PortAudioError:
+        pytest.skip("no audio devices")
+    try:
+        manager.set_eq_gains("Spotify", [0] * 5 + [10] + [0] * 4)  # The slider reaches the routed engine
+        indata = np.tile(np.sin(2 * np.pi * 1000 * np.arange(4800) / 48000)[:, None], 2).astype(np.float32)
+        outdata = np.zeros_like(indata)
+        for _ in range(4):
+            route.process(indata, outdata)
+        assert np.abs(outdata).max() > 2 * np.abs(indata).max()
+    finally:
+        route.close()
+        manager.volume_writer.stop()
@@ -0,0 +1,65 @@
+import sys
+import time
+
+import pytest
+
+import instrumentation
+
+
+def double(x):
+    return 2 * x
+
+
+@instrumentation.timed("tests.tick", budget_ms=5)
+def tick(slow):
+    with instrumentation.span("tests.step"):
+        pass
+    icon(slow)
+
+
+@instrumentation.timed("tests.icon")
+def icon(slow):
+    time.sleep(0.02 if slow else 0.0)
+
+
+class Strip:
+    @instrumentation.timed()
+    def refresh(self):
+        return "refreshed"
+
+
+@pytest.fixture(autouse=True)
+def instrumentation_off():
+    instrumentation.disable()
+    yield
+    instrumentation.disable()
+
+
+def test_decorating_while_off_returns_the_function_itself():
+    assert instrumentation.timed()(double) is double
+    assert not hasattr(vars(Strip)["refresh"], "__wrapped__")
+
+
+def test_enable_binds_the_timing_wrappers_and_disable_restores_the_functions():
+    module = sys.modules[__name__]
+    original_tick, original_refresh = module.tick, vars(Strip)["refresh"]
+
+    recorder = instrumentation.enable(trace=False)
+    assert module.tick is not original_tick and module.tick.__wrapped__ is original_tick
+    assert Strip().refresh() == "refreshed"
+    tick(slow=False)
+    calls = recorder.snapshot()
+    assert calls["Strip.refresh"]["count"] == 1
+    assert calls["tests.tick"]["count"] == calls["tests.icon"]["count"] == 1
+
+    instrumentation.disable()
+    assert module.tick is original_tick and vars(Strip)["refresh"] is original_refresh
+
+
+def test_an_overrun_names_its_slowest_child():
+    recorder = instrumentation.enable(trace=False)
+    for i in range(5):
+        tick(slow=i == 3)
+    assert recorder.snapshot()["tests.tick"]["overruns"] == 1
+    [slow] = recorder.slow()
+    assert slow["name"] == "tests.tick" and slow["slowest_child"] == "tests.icon"
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from loudness import LoudnessMeter, SyntheticSource
+
+SAMPLE_RATE = 48000
+
+
+def measure(segments):
+    meter = LoudnessMeter(sample_rate=SAMPLE_RATE)
+    meter.feed(SyntheticSource(segments, sample_rate=SAMPLE_RATE))
+    return meter.readings()
+
+
+# EBU Tech 3341 reference signals: stereo 1 kHz tones of known loudness, as (dBFS, seconds) segments
+@pytest.mark.parametrize("segments, reading, expected", [
+    ([(-23, 20)], "momentary", -23.0),
+    ([(-23, 20)], "short_term", -23.0),
+    ([(-23, 20)], "integrated", -23.0),
+    ([(-33, 20)], "integrated", -33.0),
+    ([(-36, 10), (-23, 60), (-36, 10)], "integrated", -23.0),
+    ([(-72, 10), (-36, 10), (-23, 60), (-36, 10), (-72, 10)], "integrated", -23.0),
+    ([(-26, 20), (-20, 20.1), (-26, 20)], "integrated", -23.0),
+], ids=["case 1 momentary", "case 1 short-term", "case 1", "case 2", "case 3", "case 4", "case 5"])
+def test_ebu_3341_reference_loudness(segments, reading, expected):
+    assert measure(segments)[reading] == pytest.approx(expected, abs=0.1)
+
+
+def test_true_peak_finds_the_peak_between_samples():
+    # Samples at +-0.707 of an fs/4 tone at 45 degrees, whose waveform peaks at 1.0 between them
+    n = np.arange(SAMPLE_RATE)
+    tone = np.sin(np.pi * n / 2 + np.pi / 4)
+    meter = LoudnessMeter(sample_rate=SAMPLE_RATE)
+    meter.process(np.repeat(tone[:, None], 2, axis=1))
+    assert -0.4 <= meter.readings()["true_peak"] <= 0.2
+
+
+def test_block_size_does_not_change_the_reading():
+    signal = SyntheticSource([(-30, 5), (-20, 5)], sample_rate=SAMPLE_RATE).signal()
+    readings = []
+    for block_size in (64, 1000, 4096):
+        meter = LoudnessMeter(sample_rate=SAMPLE_RATE)
+        for start in range(0, len(signal), block_size):
+            meter.process(signal[start:start + block_size])
+        readings.append(meter.readings()["integrated"])
+    assert readings == pytest.approx([readings[0]] * 3, abs=1e-6)
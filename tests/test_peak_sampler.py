@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from backends.simulated import SimulatedBackend
+from peak_sampler import PeakSampler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def mixer():
+    clock = Clock()
+    backend = SimulatedBackend(session_count=0, clock=clock)
+    sampler = PeakSampler(backend, history=4, hold_time=1.0, decay_db_per_second=20.0, clock=clock)
+    session = backend.add_session(level=0.5)
+    backend.hold_level(session, 0.5)
+    sampler.add_session(session)
+    return clock, backend, sampler, session
+
+
+def step(clock, sampler, seconds=0.1):
+    clock.now += seconds
+    sampler.sample_once()
+
+
+def test_history_is_oldest_first_and_wraps(mixer):
+    clock, backend, sampler, session = mixer
+    for level in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6):
+        backend.hold_level(session, level)
+        step(clock, sampler)
+    np.testing.assert_allclose(sampler.history(session.key), [0.3, 0.4, 0.5, 0.6], rtol=1e-6)
+
+
+def test_level_follows_peaks_up_and_decays_at_the_set_rate(mixer):
+    clock, backend, sampler, session = mixer
+    step(clock, sampler)
+    row = sampler.row(session.key)
+    assert sampler.latest()[0][row] == pytest.approx(0.5)
+
+    backend.hold_level(session, 0.0)
+    step(clock, sampler, 1.0)
+    assert sampler.latest()[0][row] == pytest.approx(0.05, rel=1e-5)  # 20 dB down after a second
+
+
+def test_hold_stays_for_hold_time_then_decays(mixer):
+    clock, backend, sampler, session = mixer
+    step(clock, sampler)
+    row = sampler.row(session.key)
+    backend.hold_level(session, 0.0)
+    step(clock, sampler, 0.5)
+    step(clock, sampler, 0.4)
+    assert sampler.latest()[1][row] == pytest.approx(0.5)
+
+    step(clock, sampler, 0.5)  # 1.4 s after the peak, past the hold time
+    assert sampler.latest()[1][row] == pytest.approx(0.5 * 10 ** (-20 * 0.5 / 20), rel=1e-5)
+
+
+def test_muted_and_removed_sessions_read_zero(mixer):
+    clock, backend, sampler, session = mixer
+    step(clock, sampler)
+    row = sampler.row(session.key)
+    backend.set_session_mute(session, True)
+    step(clock, sampler, 10.0)
+    assert sampler.latest()[0][row] == pytest.approx(0.0, abs=1e-6)
+
+    sampler.remove_session(session.key)
+    assert sampler.row(session.key) is None
+    assert sampler.history(session.key) is None
+    other = backend.add_session(level=0.2)
+    assert sampler.add_session(other) == row  # The freed row is reused, cleared
+    assert sampler.latest()[1][row] == 0.0
@@ -0,0 +1,53 @@
+import glob
+import json
+import os
+import threading
+
+from eq_engine import EQ_BANDS
+from preset_store import PresetStore
+
+GAINS = [1.0] * EQ_BANDS
+
+
+def test_presets_survive_a_reload(tmp_path):
+    path = os.path.join(tmp_path, "presets.json")
+    PresetStore(path).save("Spotify", "Bass", GAINS)
+    assert PresetStore(path).get("Spotify", "Bass")["gains"] == GAINS
+
+
+def test_a_corrupt_file_is_moved_aside_before_saving(tmp_path):
+    path = os.path.join(tmp_path, "presets.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"presets": {"Spotify": {"Bass": ')
+    store = PresetStore(path)
+    store.save("Vlc", "Flat", GAINS)
+
+    [aside] = glob.glob(path + ".corrupt-*")
+    with open(aside, encoding="utf-8") as f:
+        assert f.read() == '{"presets": {"Spotify": {"Bass": '
+    assert PresetStore(path).list("Vlc") == ["Flat"]
+
+
+def test_an_unreadable_file_is_never_replaced(tmp_path):
+    path = os.path.join(tmp_path, "presets.json")
+    os.mkdir(path)  # Exists but cannot be opened as a file
+    PresetStore(path).save("Vlc", "Flat", GAINS)
+    assert os.path.isdir(path)
+
+
+def test_concurrent_saves_all_land(tmp_path):
+    path = os.path.join(tmp_path, "presets.json")
+    store = PresetStore(path)
+
+    def save_many(app):
+        for i in range(50):
+            store.save(app, f"preset{i}", GAINS)
+
+    threads = [threading.Thread(target=save_many, args=(f"App{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)["presets"]
+    assert all(len(saved[f"App{n}"]) == 50 for n in range(4))
@@ -0,0 +1,96 @@
+import os
+import threading
+
+import pytest
+
+from audio_manager import AudioManager
+from backends.simulated import SimulatedBackend
+from ducking import DuckingEngine, DuckingRule
+from preset_store import PresetStore
+from scenes import SceneStore, apply_scene, capture_scene
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def manager(tmp_path):
+    backend = SimulatedBackend(session_count=0)
+    manager = AudioManager(backend, preset_store=PresetStore(os.path.join(tmp_path, "presets.json")),
+                           scene_store=SceneStore(os.path.join(tmp_path, "scenes.json")))
+    yield manager
+    manager.volume_writer.stop()
+
+
+def duck(manager, clock):
+    """Duck Spotify by 12 dB under Discord, stepping the engine by hand."""
+    backend = manager.backend
+    discord = backend.add_session("discord.exe")
+    spotify = backend.add_session("spotify.exe")
+    backend.set_session_volume(spotify, 0.8)
+    backend.hold_level(discord, 0.1)
+    manager.ducking = DuckingEngine(backend, clock=clock)
+    manager.ducking.add_rule(DuckingRule("Discord", "Spotify", depth_db=12, attack=0.05))
+    manager.get_audio_sessions()  # Hands the sessions to the engine
+    for _ in range(40):
+        clock.now += 0.005
+        manager.ducking.step()
+    assert spotify.native.volume == pytest.approx(0.8 * 10 ** (-12 / 20))
+    return spotify
+
+
+def test_a_scene_saved_during_a_duck_keeps_the_undocked_volume(manager):
+    spotify = duck(manager, Clock())
+    scene = capture_scene(manager)
+    assert scene["apps"]["Spotify"][0]["volume"] == pytest.approx(80.0)
+
+    manager.backend.writes = 0
+    apply_scene(manager, scene)
+    assert manager.backend.writes == 0  # The ducked level is not taken for a change
+    assert spotify.native.volume == pytest.approx(0.8 * 10 ** (-12 / 20))
+
+
+def test_recalling_during_a_duck_moves_the_base(manager):
+    spotify = duck(manager, Clock())
+    scene = capture_scene(manager)
+    scene["apps"]["Spotify"][0]["volume"] = 50.0
+    apply_scene(manager, scene)
+    assert manager.ducking.base_volume(spotify.key) == pytest.approx(0.5)
+
+
+def test_two_sessions_of_one_app_keep_their_own_volume(manager):
+    players = [manager.backend.add_session("vlc.exe"), manager.backend.add_session("vlc.exe")]
+    manager.set_session_volume(players[0], 30)
+    manager.set_session_volume(players[1], 80)
+    scene = capture_scene(manager)
+    for player in players:
+        manager.set_session_volume(player, 50)
+    apply_scene(manager, scene)
+    assert [round(player.native.volume * 100) for player in players] == [30, 80]
+
+
+def test_scenes_are_saved_on_the_writer_thread(manager):
+    manager.backend.add_session("vlc.exe")
+    saved = []
+    done = threading.Event()
+    manager.save_scene("Evening", done=lambda scene: (saved.append((threading.current_thread(), scene)),
+                                                        done.set()))
+    assert done.wait(5)
+    thread, scene = saved[0]
+    assert thread is not threading.current_thread()
+    assert scene["apps"]["Vlc"][0]["volume"] == pytest.approx(100.0)
+    assert manager.list_scenes() == ["Evening"]
+
+
+def test_a_corrupt_scene_file_is_moved_aside(tmp_path):
+    path = os.path.join(tmp_path, "scenes.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+    SceneStore(path).save("Evening", {"version": 2, "master": 50.0, "apps": {}, "eq": {}})
+    assert [name for name in os.listdir(tmp_path) if name.startswith("scenes.json.corrupt-")]
+    assert SceneStore(path).list() == ["Evening"]
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6")
+from PyQt6.QtGui import QColor, QImage  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from audio_manager import AudioManager  # noqa: E402
+from backends.simulated import SimulatedBackend  # noqa: E402
+from icon_cache import ICON_SIZE, IconCache  # noqa: E402
+from main import AudioPilot  # noqa: E402
+from preset_store import PresetStore  # noqa: E402
+from scenes import SceneStore  # noqa: E402
+
+SESSIONS = 40  # More than fit in the window, so some strips start unbuilt
+TIMEOUT_S = 5.0
+
+
+def wait_for(app, condition, timeout=TIMEOUT_S):
+    """Process events until condition() holds; returns whether it did."""
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            return False
+        app.processEvents()
+    return True
+
+
+def pump(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+
+
+def strip_keys(window):
+    return {session["key"] for session in window.channel_area.sessions()}
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(app, tmp_path):
+    backend = SimulatedBackend(session_count=0)
+    for _ in range(SESSIONS):
+        backend.add_session(exe_path=sys.executable)
+    # An icon already rendered on disk, so strips get theirs without the shell
+    icon_cache = IconCache(cache_dir=os.path.join(tmp_path, "icons"))
+    image = QImage(ICON_SIZE, ICON_SIZE, QImage.Format.Format_ARGB32)
+    image.fill(QColor("orange"))
+    os.makedirs(icon_cache.cache_dir, exist_ok=True)
+    image.save(icon_cache._disk_path((sys.executable, os.stat(sys.executable).st_mtime_ns)), "PNG")
+    manager = AudioManager(backend, preset_store=PresetStore(os.path.join(tmp_path, "presets.json")),
+                           scene_store=SceneStore(os.path.join(tmp_path, "scenes.json")))
+    window = AudioPilot(manager, icon_cache=icon_cache)
+    window.show()
+    assert wait_for(app, lambda: len(window.session_index) == SESSIONS)
+    yield window
+    window.close()
+
+
+def test_strips_follow_pushed_session_events(app, window):
+    backend = window.audio_manager.backend
+    for round_ in range(3):
+        source = backend.add_session(name="eventcheck.exe")
+        assert wait_for(app, lambda: source.key in strip_keys(window))
+        session = window.session_index.get(source.key)
+        # New sessions go last; scroll there so the strip is built
+        scroll_bar = window.channel_area.horizontalScrollBar()
+        assert wait_for(app, lambda: scroll_bar.setValue(scroll_bar.maximum()) or "volume_slider" in session)
+
+        volume = 30 + round_ * 7
+        backend.set_session_volume(session["session"], volume / 100)
+        assert wait_for(app, lambda: session["volume_slider"].value() == volume
+                        and session["volume_label"].text() == f"{volume}%")
+        for muted in (True, False):
+            backend.set_session_mute(session["session"], muted)
+            assert wait_for(app, lambda: session["mute_button"].isChecked() == muted)
+
+        backend.remove_session(source)
+        assert wait_for(app, lambda: source.key not in window.session_index
+                        and source.key not in strip_keys(window))
+    assert len(window.session_index) == SESSIONS
+
+
+def test_echoes_of_keyboard_steps_do_not_pull_the_slider_back(app, window):
+    """Arrow keys do not hold the slider down, and slow writes make the writer coalesce,
+    so echoes of earlier steps arrive while newer ones are still queued."""
+    backend = window.audio_manager.backend
+    session = window.channel_area.sessions()[0]
+    slider = session["volume_slider"]
+    backend.write_cost = 0.010
+    try:
+        for value in range(20, 60):
+            slider.setValue(value)
+            assert not wait_for(app, lambda: slider.value() != value, timeout=0.005), \
+                f"an echo moved the slider from {value} to {slider.value()}"
+        assert wait_for(app, lambda: round(backend.get_session_volume(session["session"]) * 100) == 59)
+        pump(app, 0.2)  # Let the last echoes in
+        assert slider.value() == 59 and session["volume_label"].text() == "59%"
+    finally:
+        backend.write_cost = 0.0
+    # A change made elsewhere afterwards still shows
+    backend.set_session_volume(session["session"], 0.33)
+    assert wait_for(app, lambda: slider.value() == 33)
+
+
+def test_strips_rebuilt_by_scrolling_show_the_current_volume_and_icon(app, window):
+    backend = window.audio_manager.backend
+    scroll_bar = window.channel_area.horizontalScrollBar()
+    sessions = window.channel_area.sessions()
+    first, middle, last = sessions[0], sessions[len(sessions) // 2], sessions[-1]
+    assert "volume_slider" not in last
+
+    first["volume_slider"].setValue(20)
+    backend.set_session_volume(last["session"], 0.45)  # Changed elsewhere while scrolled out of view
+    assert wait_for(app, lambda: round(backend.get_session_volume(first["session"]) * 100) == 20)
+    pump(app, 0.05)  # Deliver the queued volume events
+
+    def realized_with_icons():
+        realized = [session for session in window.channel_area.sessions() if "icon_label" in session]
+        return realized and all(session["icon_label"].pixmap() is not None
+                                and not session["icon_label"].pixmap().isNull() for session in realized)
+
+    # The middle strips were never built before, so their icons must be requested as they are
+    for position, session, volume in ((scroll_bar.maximum(), last, 45),
+                                      (scroll_bar.maximum() // 2, middle, 100),
+                                      (0, first, 20)):
+        scroll_bar.setValue(position)
+        assert wait_for(app, lambda: "volume_slider" in session)
+        assert session["volume_slider"].value() == volume
+        assert session["volume_label"].text() == f"{volume}%"
+        assert wait_for(app, realized_with_icons)